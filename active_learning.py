@@ -0,0 +1,356 @@
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import cv2
+from dotenv import load_dotenv
+
+from pose_metrics import oks_matrix, frame_agreement
+from label_io import result_pose_arrays as pose_arrays
+from review_scoring import model_identity
+from batch_label import find_videos, video_signature
+import dedup
+
+# Active learning: which unlabeled frames should be labeled next?
+#
+#   python active_learning.py                          # newest weights in TRAIN_PROJECT_DIR
+#   python active_learning.py --model best.pt --base Models/yolo26n-pose.pt --stride 15 --top 300
+#
+# Every `stride`-th frame of every imported video without a pose label is decoded
+# sequentially (plus the frame right after it) and scored by uncertainty:
+#   confidence   - 1 - mean keypoint confidence of the trained model
+#   instability  - 1 - OKS agreement between the frame and its neighbour (jittery predictions)
+#   disagreement - 1 - OKS agreement between the trained model and the base model
+# Scores are cached per video in RAW_DATA_DIR/<video>/pose/.active_scores.json (for the
+# exact weights, video and stride), so a re-run only scores new frames and an interrupted
+# run resumes. The pick is diversified by dHash (no two picks within DIVERSITY_BITS of
+# each other) and written, best first, to RAW_DATA_DIR/.to_label.json, which the GUI steps
+# through with "🎯 Next To-Label" (N).
+
+load_dotenv()
+
+# --- CONFIG ---
+RAW_DATA_DIR = os.path.abspath(os.getenv("RAW_DATA_DIR", "judo_datasetDONTDELETE"))
+STRIDE = 30               # Score every Nth frame (1 per second at 30 fps)
+ADJACENT = 1              # Offset of the neighbour frame used for the stability score
+JOB_FRAMES = 1800         # Frames of video per job (checkpoint granularity)
+BATCH_SIZE = 8            # Sampled frames per inference call
+KPT_CONF = 0.5            # Keypoints below this confidence don't count as reference joints
+WEIGHTS = {"confidence": 1.0, "instability": 1.0, "disagreement": 1.0}
+DIVERSITY_BITS = 10       # A frame within this many dHash bits of an already picked frame is skipped
+MIN_GAP = 15              # Never pick two frames of the same video closer than this
+TOP = 200
+SCORES_NAME = ".active_scores.json"
+LIST_NAME = ".to_label.json"
+
+
+def list_path(root=RAW_DATA_DIR):
+    return os.path.join(root, LIST_NAME)
+
+
+def newest_weights(project_dir):
+    """Most recently written best.pt (or last.pt) under TRAIN_PROJECT_DIR/<run>/weights/."""
+    found = glob.glob(os.path.join(project_dir, "*", "weights", "best.pt"))
+    found = found or glob.glob(os.path.join(project_dir, "*", "weights", "last.pt"))
+    return max(found, key=os.path.getmtime) if found else None
+
+
+def labeled_frames(video_name, root=RAW_DATA_DIR):
+    """Frame indices that already have a pose label."""
+    labels_dir = os.path.join(root, video_name, "pose", "labels")
+    prefix = f"{video_name}_"
+    frames = set()
+    try:
+        with os.scandir(labels_dir) as entries:
+            for entry in entries:
+                stem, ext = os.path.splitext(entry.name)
+                if ext == ".txt" and stem.startswith(prefix) and stem[len(prefix):].isdigit():
+                    frames.add(int(stem[len(prefix):]))
+    except OSError:
+        pass
+    return frames
+
+
+# --- SCORE CACHE ---
+def scores_path(video_name, root=RAW_DATA_DIR):
+    return os.path.join(root, video_name, "pose", SCORES_NAME)
+
+
+def cache_key(model_id, base_id, video_path, stride):
+    return {"model": model_id, "base": base_id, "video": video_signature(video_path), "stride": stride}
+
+
+def load_scores(video_name, key, root=RAW_DATA_DIR):
+    """{frame_index: score_dict} cached for this exact key, else {}."""
+    try:
+        with open(scores_path(video_name, root), "r") as f:
+            cache = json.load(f)
+        if all(cache.get(k) == v for k, v in key.items()):
+            return {int(idx): entry for idx, entry in cache["frames"].items()}
+    except (OSError, ValueError, KeyError):
+        pass
+    return {}
+
+
+def save_scores(video_name, key, frames, root=RAW_DATA_DIR):
+    path = scores_path(video_name, root)
+    tmp_path = path + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "w") as f:
+            json.dump(dict(key, frames={str(idx): entry for idx, entry in sorted(frames.items())}), f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️ Warning: Could not write active-learning scores: {e}")
+
+
+# --- SCORING ---
+def agreement(ref, other, image_size):
+    """OKS agreement of `other` with `ref`, using ref's confident keypoints as the reference joints."""
+    boxes, kpts = ref
+    gt = kpts.copy()
+    gt[..., 2] = (kpts[..., 2] >= KPT_CONF) * 2.0
+    return frame_agreement(oks_matrix(gt, boxes, other[1], image_size=image_size))
+
+
+def score_frame(main, neighbour, base, image_size):
+    """Uncertainty components of one sampled frame (each in [0, 1], higher = more worth labeling)."""
+    conf = main[1][..., 2]
+    # No detections at all is treated as zero confidence
+    return {"confidence": round(1.0 - float(conf.mean()) if conf.size else 1.0, 4),
+            "instability": round(1.0 - agreement(main, neighbour, image_size), 4) if neighbour else 0.0,
+            "disagreement": round(1.0 - agreement(main, base, image_size), 4) if base else 0.0}
+
+
+def priority(entry, weights=WEIGHTS):
+    return sum(w * entry.get(k, 0.0) for k, w in weights.items())
+
+
+# --- WORKERS ---
+_worker_models = None
+
+
+def _init_worker(model_path, base_path, threads):
+    global _worker_models
+    import torch
+    from ultralytics import YOLO
+    # Bound intra-op threads so N workers don't oversubscribe the CPU
+    torch.set_num_threads(threads)
+    _worker_models = (YOLO(model_path), YOLO(base_path) if base_path else None)
+
+
+def run_job(job):
+    """
+    Scores the listed frames of one video, decoding sequentially from a single seek
+    (frames in between are only grabbed). Returns (video_name, {frame: entry}, seconds).
+    """
+    name, path, frames, batch_size = job
+    model, base = _worker_models
+    t0 = time.perf_counter()
+    wanted = set(frames)
+    neighbours = {idx + ADJACENT: idx for idx in frames}
+    end = max(frames) + ADJACENT + 1
+
+    cap = cv2.VideoCapture(path)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, frames[0])
+    samples = {}   # idx -> [frame, neighbour_frame]
+    scores = {}
+
+    def flush(final=False):
+        # Only frames whose neighbour is decoded (or all of them at the end of the range)
+        ready = [idx for idx in sorted(samples) if final or samples[idx][1] is not None]
+        images = [samples[idx][0] for idx in ready]
+        pairs = [idx for idx in ready if samples[idx][1] is not None]
+        main_results = model(images + [samples[idx][1] for idx in pairs], verbose=False, device="cpu")
+        base_results = base(images, verbose=False, device="cpu") if base else [None] * len(ready)
+        adjacent = dict(zip(pairs, main_results[len(ready):]))
+        for i, idx in enumerate(ready):
+            h, w = images[i].shape[:2]
+            entry = score_frame(pose_arrays(main_results[i]),
+                                pose_arrays(adjacent[idx]) if idx in adjacent else None,
+                                pose_arrays(base_results[i]) if base else None, (w, h))
+            entry["hash"] = dedup.dhash_image(images[i])
+            scores[idx] = entry
+            del samples[idx]
+
+    for idx in range(frames[0], end):
+        if idx not in wanted and idx not in neighbours:
+            if not cap.grab():
+                break
+            continue
+        ok, frame = cap.read()
+        if not ok:
+            break
+        if idx in neighbours and neighbours[idx] in samples:
+            samples[neighbours[idx]][1] = frame
+        if idx in wanted:
+            samples[idx] = [frame, None]
+        if sum(1 for s in samples.values() if s[1] is not None) >= batch_size:
+            flush()
+    if samples:
+        flush(final=True)
+    cap.release()
+    return name, scores, time.perf_counter() - t0
+
+
+def plan_jobs(videos, stride, keys, job_frames=JOB_FRAMES, batch_size=BATCH_SIZE, root=RAW_DATA_DIR):
+    """Jobs of unlabeled, not yet scored sample frames; also returns the cached scores per video."""
+    jobs = []
+    cached = {}
+    for name, path in videos.items():
+        cap = cv2.VideoCapture(path)
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) if cap.isOpened() else 0
+        cap.release()
+        if total <= 0:
+            print(f"⚠️ Warning: Skipping unreadable video {path}")
+            continue
+        cached[name] = load_scores(name, keys[name], root)
+        labeled = labeled_frames(name, root)
+        todo = [idx for idx in range(0, total, stride) if idx not in labeled and idx not in cached[name]]
+        for start in range(0, total, job_frames):
+            frames = [idx for idx in todo if start <= idx < start + job_frames]
+            if frames:
+                jobs.append((name, path, frames, batch_size))
+    return jobs, cached
+
+
+# --- SELECTION ---
+def select_frames(scored, top=TOP, weights=WEIGHTS, diversity_bits=DIVERSITY_BITS, min_gap=MIN_GAP, root=RAW_DATA_DIR):
+    """
+    Ranks unlabeled frames by priority and picks greedily: a frame is skipped if its dHash
+    is within diversity_bits of a frame already picked (not of a whole transitive cluster,
+    which a static camera would chain into one), or if it is closer than min_gap frames
+    to a pick of the same video.
+    Args:
+        scored (dict): {video_name: {frame: entry}}
+    Returns:
+        List of entry dicts (video, frame, priority and the components), best first.
+    """
+    candidates = []
+    for name, frames in scored.items():
+        labeled = labeled_frames(name, root)
+        for idx, entry in frames.items():
+            if idx not in labeled:
+                candidates.append(dict(entry, video=name, frame=idx, priority=round(priority(entry, weights), 4)))
+    candidates.sort(key=lambda e: -e["priority"])
+
+    picked_hashes = dedup.BKTree()
+    taken = {}
+    picked = []
+    for entry in candidates:
+        h = entry.get("hash")
+        if h is not None and picked_hashes.query(h, diversity_bits):
+            continue
+        if any(abs(entry["frame"] - f) < min_gap for f in taken.get(entry["video"], ())):
+            continue
+        if h is not None:
+            picked_hashes.add(h, len(picked))
+        taken.setdefault(entry["video"], []).append(entry["frame"])
+        picked.append({k: entry[k] for k in ("video", "frame", "priority", *weights)})
+        if len(picked) >= top:
+            break
+    return picked
+
+
+def save_list(entries, model_path, base_path, root=RAW_DATA_DIR):
+    path = list_path(root)
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump({"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "model": model_path,
+                       "base": base_path, "entries": entries}, f, indent=1)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️ Warning: Could not write to-label list: {e}")
+
+
+def load_list(root=RAW_DATA_DIR):
+    """(created stamp, entries) of the to-label list; (None, []) if there is none."""
+    try:
+        with open(list_path(root), "r") as f:
+            data = json.load(f)
+        return data.get("created"), data.get("entries", [])
+    except (OSError, ValueError):
+        return None, []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank unlabeled video frames by model uncertainty (to-label list).")
+    parser.add_argument("--model", default=None, help="Trained weights (default: newest best.pt in TRAIN_PROJECT_DIR)")
+    parser.add_argument("--base", default="Models/yolo26n-pose.pt",
+                        help="Base model for the disagreement score ('' to skip)")
+    parser.add_argument("--stride", type=int, default=STRIDE, help="Score every Nth frame")
+    parser.add_argument("--top", type=int, default=TOP, help="Length of the to-label list")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: half the cores)")
+    parser.add_argument("--batch", type=int, default=BATCH_SIZE, help="Sampled frames per inference call")
+    parser.add_argument("--max-minutes", type=float, default=None,
+                        help="Stop scoring after this long and rank what is cached (a re-run continues)")
+    parser.add_argument("--videos", nargs="*", default=None, help="Only these video names")
+    args = parser.parse_args()
+
+    model_path = args.model or newest_weights(os.getenv("TRAIN_PROJECT_DIR", "Largest"))
+    if not model_path or not os.path.exists(model_path):
+        print(f"❌ Error: Model not found: {model_path or 'no weights in TRAIN_PROJECT_DIR'}")
+        sys.exit(1)
+    base_path = args.base if args.base and os.path.exists(args.base) else None
+    if args.base and not base_path:
+        print(f"⚠️ Warning: Base model {args.base} not found; skipping the disagreement score")
+
+    videos = find_videos()
+    if args.videos:
+        videos = {name: path for name, path in videos.items() if name in args.videos}
+    if not videos:
+        print(f"❌ Error: No videos found in {os.path.join(RAW_DATA_DIR, 'videos')}")
+        sys.exit(1)
+
+    stride = max(1, args.stride)
+    model_id, base_id = model_identity(model_path), model_identity(base_path) if base_path else None
+    keys = {name: cache_key(model_id, base_id, path, stride) for name, path in videos.items()}
+    jobs, scored = plan_jobs(videos, stride, keys, batch_size=args.batch)
+    todo = sum(len(job[2]) for job in jobs)
+    print(f"🚀 {len(videos)} videos | model {model_path} | {sum(map(len, scored.values()))} frames cached, "
+          f"{todo} to score (every {stride} frames)")
+
+    if jobs:
+        cpus = os.cpu_count() or 1
+        workers = args.workers or max(1, cpus // 2)
+        threads = max(1, cpus // workers)
+        deadline = time.monotonic() + args.max_minutes * 60 if args.max_minutes else None
+        wall_start = time.perf_counter()
+        done = 0
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                   initargs=(model_path, base_path, threads))
+        try:
+            futures = [pool.submit(run_job, job) for job in jobs]
+            for future in as_completed(futures):
+                try:
+                    name, scores, seconds = future.result()
+                except Exception as e:
+                    print(f"⚠️ Warning: Job failed: {e}")
+                    continue
+                scored[name].update(scores)
+                # Checkpoint, so an interrupted run keeps finished work
+                save_scores(name, keys[name], scored[name])
+                done += len(scores)
+                elapsed = time.perf_counter() - wall_start
+                rate = done / max(elapsed, 1e-9)
+                print(f"   {name}: {done}/{todo} frames | {rate:.1f} frames/sec | ETA {(todo - done) / max(rate, 1e-9) / 60:.1f} min")
+                if deadline and time.monotonic() > deadline:
+                    print("⚠️ Warning: Time budget reached; ranking what is scored so far")
+                    break
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    entries = select_frames(scored, top=args.top)
+    save_list(entries, model_path, base_path)
+    print(f"✅ Wrote {len(entries)} frames to {list_path()}:")
+    for e in entries[:20]:
+        print(f"   {e['priority']:.3f}  conf={e['confidence']:.3f}  unstable={e['instability']:.3f}  "
+              f"disagree={e['disagreement']:.3f}  {e['video']} #{e['frame']}")
+
+
+if __name__ == "__main__":
+    main()
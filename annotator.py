@@ -2,6 +2,9 @@ from PyQt6.QtWidgets import QLabel
 from PyQt6.QtCore import Qt, QPointF, QRectF
 from PyQt6.QtGui import QImage, QPixmap, QPainter, QPen, QColor, QBrush, QFont
 
+import perf_stats
+from edit_history import EditHistory
+
 # --- COCO SKELETON CONFIG ---
 KEYPOINT_NAMES = [
     "Nose", "L-Eye", "R-Eye", "L-Ear", "R-Ear", 
@@ -45,10 +48,19 @@ class AnnotationWidget(QLabel):
         self.dragging = False
         self.dragging_bbox = False
         self.bbox_handle_idx = -1 
+        self.drag_start = None # Delta of the drag in progress, completed on release
+
+        # Comparison overlay (not editable): base model skeletons and disagreeing keypoints
+        self.ghost_kpts = []    # Per person: [[x, y, conf], ...] normalized
+        self.diff_markers = []  # (main_x, main_y, base_x, base_y) normalized
+
+        # Undo/redo (per frame; see edit_history.py)
+        self.history = EditHistory()
         
         self.radius = 6
         self.handle_size = 8
 
+    @perf_stats.timed("paint.set_image")
     def set_image(self, numpy_img):
         h, w, ch = numpy_img.shape
         self.original_image_size = (w, h)
@@ -78,6 +90,7 @@ class AnnotationWidget(QLabel):
         self.update_display_geometry()
         super().resizeEvent(event)
 
+    @perf_stats.timed("paint.frame")
     def paintEvent(self, event):
         painter = QPainter(self)
         
@@ -87,7 +100,11 @@ class AnnotationWidget(QLabel):
             dest_h = int(self.original_image_size[1] * self.scale_factor)
             painter.drawPixmap(int(self.offset_x), int(self.offset_y), dest_w, dest_h, self.image_pixmap)
 
-        # 2. Draw Annotations
+        # 2. Ghost layer (base model), under the editable annotations
+        if self.ghost_kpts:
+            self.draw_ghost(painter)
+
+        # 3. Draw Annotations
         font = QFont("Arial", 10, QFont.Weight.Bold)
         painter.setFont(font)
 
@@ -143,6 +160,41 @@ class AnnotationWidget(QLabel):
                         text_rect = QRectF(screen_pos.x() - r, screen_pos.y() - r, r*2, r*2)
                         painter.drawText(text_rect, Qt.AlignmentFlag.AlignCenter, str(k_idx))
 
+        # 4. Disagreement markers on top: ring at the main position, line to the base position
+        if self.diff_markers:
+            painter.setBrush(Qt.BrushStyle.NoBrush)
+            painter.setPen(QPen(QColor(255, 0, 255), 2))
+            for mx, my, bx, by in self.diff_markers:
+                p_main = self.norm_to_screen(mx, my)
+                painter.drawLine(p_main, self.norm_to_screen(bx, by))
+                painter.drawEllipse(p_main, self.radius + 4, self.radius + 4)
+
+    def draw_ghost(self, painter, min_conf=0.5):
+        pen = QPen(QColor(255, 0, 255, 110), 2, Qt.PenStyle.DashLine)
+        brush = QBrush(QColor(255, 0, 255, 110))
+        for kpts in self.ghost_kpts:
+            painter.setPen(pen)
+            for i1, i2 in SKELETON_CONNECTIONS:
+                if kpts[i1][2] >= min_conf and kpts[i2][2] >= min_conf:
+                    painter.drawLine(self.norm_to_screen(kpts[i1][0], kpts[i1][1]),
+                                     self.norm_to_screen(kpts[i2][0], kpts[i2][1]))
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(brush)
+            for x, y, conf in kpts:
+                if conf >= min_conf:
+                    painter.drawEllipse(self.norm_to_screen(x, y), self.radius - 2, self.radius - 2)
+
+    def set_comparison(self, ghost_kpts, markers):
+        self.ghost_kpts = ghost_kpts
+        self.diff_markers = markers
+        self.update()
+
+    def clear_comparison(self):
+        if self.ghost_kpts or self.diff_markers:
+            self.ghost_kpts = []
+            self.diff_markers = []
+            self.update()
+
     def draw_bbox(self, painter, bbox_norm, is_selected, alpha, label_text=None):
         cx, cy, w, h = bbox_norm
         x_tl = cx - w/2
@@ -209,6 +261,7 @@ class AnnotationWidget(QLabel):
                     self.dragging_bbox = True
                     self.bbox_handle_idx = i
                     self.dragging = True 
+                    self.drag_start = ("bbox", self.selected_idx, tuple(bbox))
                     return
 
         # 2. Check Keypoints (Only for items with keypoints)
@@ -249,13 +302,18 @@ class AnnotationWidget(QLabel):
                 # If we clicked a keypoint
                 if self.selected_kpt_idx != -1:
                     kp = self.annotations[self.selected_idx]['keypoints'][self.selected_kpt_idx]
+                    old = tuple(kp)
                     kp[2] = 1 if kp[2] == 2 else (0 if kp[2] == 1 else 2)
+                    self.history.record(self.annotations, ("kpt", self.selected_idx, self.selected_kpt_idx, old, tuple(kp)))
                 # If we clicked a box (Detect Mode) - Maybe delete? 
                 # For now let's just leave right click for keypoints.
                 self.update()
                 
             elif event.button() == Qt.MouseButton.LeftButton:
                 self.dragging = True
+                if self.selected_kpt_idx != -1:
+                    kp = self.annotations[self.selected_idx]['keypoints'][self.selected_kpt_idx]
+                    self.drag_start = ("kpt", self.selected_idx, self.selected_kpt_idx, tuple(kp))
                 self.update()
         else:
             self.selected_idx = -1
@@ -305,11 +363,49 @@ class AnnotationWidget(QLabel):
             pass
 
     def mouseReleaseEvent(self, event):
+        # The whole drag becomes one undo entry
+        if self.drag_start:
+            if self.drag_start[0] == "kpt":
+                _, idx, k, old = self.drag_start
+                new = tuple(self.annotations[idx]['keypoints'][k])
+            else:
+                _, idx, old = self.drag_start
+                new = tuple(self.annotations[idx]['bbox'])
+            if new != old:
+                self.history.record(self.annotations, self.drag_start[:-1] + (old, new))
+            self.drag_start = None
         self.dragging = False
         self.dragging_bbox = False
         self.bbox_handle_idx = -1
         self.update()
 
+    # --- UNDO / REDO ---
+    def begin_frame(self, key):
+        """Call after loading a frame's annotations; switches to that frame's history."""
+        self.drag_start = None
+        self.dragging = False
+        self.history.switch(key, self.annotations)
+
+    def record_add(self, idx):
+        self.history.record(self.annotations, ("add", idx, self.annotations[idx]))
+
+    def record_delete(self, idx, item):
+        self.history.record(self.annotations, ("delete", idx, item))
+
+    def undo(self):
+        return self._after_step(self.history.undo(self.annotations))
+
+    def redo(self):
+        return self._after_step(self.history.redo(self.annotations))
+
+    def _after_step(self, idx):
+        if idx is None:
+            return False
+        self.selected_idx = idx if idx < len(self.annotations) else -1
+        self.selected_kpt_idx = -1
+        self.update()
+        return True
+
     def norm_to_screen(self, nx, ny):
         img_w, img_h = self.original_image_size
         sx = (nx * img_w * self.scale_factor) + self.offset_x
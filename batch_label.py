@@ -0,0 +1,232 @@
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import cv2
+from dotenv import load_dotenv
+
+from label_io import write_label_file, result_annotations
+from review_scoring import model_identity
+import video_import
+
+# Headless batch pre-labeling of every video in RAW_DATA_DIR/videos.
+#
+#   python batch_label.py --task pose --workers 4
+#
+# Videos are split into frame-range jobs that run in a pool of worker processes, each
+# with its own model and a bounded torch thread count. Predictions are written in the
+# label format, next to (not into) the human labels:
+#   RAW_DATA_DIR/<video>/<task>/predictions/<video>_<idx:06d>.txt
+# so they never count as reviewed data; the GUI shows them as the starting guess for a
+# frame without a saved label. Finished jobs are checkpointed in
+# RAW_DATA_DIR/.batch_label_state.json, so a killed run resumes where it stopped.
+
+load_dotenv()
+
+# --- CONFIG ---
+RAW_DATA_DIR = os.path.abspath(os.getenv("RAW_DATA_DIR", "judo_datasetDONTDELETE"))
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov")
+JOB_FRAMES = 600          # Frames per job (checkpoint granularity)
+BATCH_SIZE = 8            # Frames per inference call
+STATE_NAME = ".batch_label_state.json"
+
+
+def predictions_dir(video_name, task, root=RAW_DATA_DIR):
+    return os.path.join(root, video_name, task, "predictions")
+
+
+def find_videos(root=RAW_DATA_DIR):
+    """{video_name: path} for files in videos/ plus videos imported by reference."""
+    videos_dir = os.path.join(root, "videos")
+    found = {}
+    try:
+        with os.scandir(videos_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.lower().endswith(VIDEO_EXTENSIONS):
+                    found[os.path.splitext(entry.name)[0]] = entry.path
+    except OSError:
+        pass
+    for name, info in video_import.load_index(videos_dir).items():
+        if name not in found and os.path.exists(info.get("path", "")):
+            found[name] = info["path"]
+    return dict(sorted(found.items()))
+
+
+def video_signature(path):
+    st = os.stat(path)
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def plan_jobs(videos, job_frames=JOB_FRAMES, stride=1):
+    """Splits every video into (video_name, path, start, end) frame ranges (end exclusive)."""
+    jobs = []
+    for name, path in videos.items():
+        cap = cv2.VideoCapture(path)
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) if cap.isOpened() else 0
+        cap.release()
+        if total <= 0:
+            print(f"⚠️ Warning: Skipping unreadable video {path}")
+            continue
+        # Whole multiples of stride, so every job lands on the same global frame grid
+        span = -(-job_frames // stride) * stride
+        for start in range(0, total, span):
+            jobs.append((name, path, start, min(start + span, total)))
+    return jobs
+
+
+def job_key(name, path, start, end):
+    return f"{name}|{video_signature(path)}|{start}|{end}"
+
+
+# --- CHECKPOINT ---
+def load_state(root, model_id, task, stride):
+    """Finished jobs for this model/task/stride; anything else starts over."""
+    try:
+        with open(os.path.join(root, STATE_NAME), "r") as f:
+            state = json.load(f)
+        if (state.get("model") == model_id and state.get("task") == task
+                and state.get("stride") == stride):
+            return state
+    except (OSError, ValueError):
+        pass
+    return {"model": model_id, "task": task, "stride": stride, "jobs": {}}
+
+
+def save_state(root, state):
+    path = os.path.join(root, STATE_NAME)
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(state, f, indent=1)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️ Warning: Could not write checkpoint: {e}")
+
+
+# --- WORKERS ---
+_worker_model = None
+
+
+def _init_worker(model_path, threads):
+    global _worker_model
+    import torch
+    from ultralytics import YOLO
+    # Bound intra-op threads so N workers don't oversubscribe the CPU
+    torch.set_num_threads(threads)
+    _worker_model = YOLO(model_path)
+
+
+def run_job(job):
+    """
+    Predicts one frame range, decoding sequentially from a single seek.
+    Returns (job, frames_done, busy_seconds, pid).
+    """
+    name, path, start, end, task, stride, out_dir, batch_size = job
+    t0 = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    cap = cv2.VideoCapture(path)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+
+    done = 0
+    batch, indices = [], []
+
+    def flush():
+        results = _worker_model(batch, verbose=False, device="cpu")
+        for idx, result in zip(indices, results):
+            write_label_file(os.path.join(out_dir, f"{name}_{idx:06d}.txt"), result_annotations(result, task))
+        batch.clear()
+        indices.clear()
+
+    for idx in range(start, end):
+        if (idx - start) % stride:
+            if not cap.grab():
+                break
+            continue
+        ok, frame = cap.read()
+        if not ok:
+            break
+        batch.append(frame)
+        indices.append(idx)
+        done += 1
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    cap.release()
+    return job, done, time.perf_counter() - t0, os.getpid()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch pre-label every video in RAW_DATA_DIR/videos (resumable).")
+    parser.add_argument("--task", choices=["pose", "detect"], default="pose")
+    parser.add_argument("--model", default=None,
+                        help="Weights (.pt). Default: MODEL_NANO_PATH (pose) / NANO_OBJECT_PATH (detect)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: half the cores)")
+    parser.add_argument("--threads", type=int, default=None, help="Torch threads per worker (default: cores / workers)")
+    parser.add_argument("--job-frames", type=int, default=JOB_FRAMES, help="Frames per job")
+    parser.add_argument("--stride", type=int, default=1, help="Label every Nth frame")
+    parser.add_argument("--batch", type=int, default=BATCH_SIZE, help="Frames per inference call")
+    parser.add_argument("--videos", nargs="*", default=None, help="Only these video names")
+    args = parser.parse_args()
+
+    model_path = args.model or (os.getenv("MODEL_NANO_PATH", "yolo26n-pose.pt") if args.task == "pose"
+                                else os.getenv("NANO_OBJECT_PATH", "yolo26n.pt"))
+    if not os.path.exists(model_path):
+        print(f"❌ Error: Model not found: {model_path}")
+        sys.exit(1)
+
+    videos = find_videos()
+    if args.videos:
+        videos = {name: path for name, path in videos.items() if name in args.videos}
+    if not videos:
+        print(f"❌ Error: No videos found in {os.path.join(RAW_DATA_DIR, 'videos')}")
+        sys.exit(1)
+
+    stride = max(1, args.stride)
+    state = load_state(RAW_DATA_DIR, model_identity(model_path), args.task, stride)
+    jobs = plan_jobs(videos, args.job_frames, stride)
+    todo = [j for j in jobs if job_key(*j) not in state["jobs"]]
+    print(f"🚀 {len(videos)} videos, {len(jobs)} jobs, {len(jobs) - len(todo)} already done (resuming)")
+    if not todo:
+        print("✅ Nothing to do.")
+        return
+
+    cpus = os.cpu_count() or 1
+    workers = args.workers or max(1, cpus // 2)
+    threads = args.threads or max(1, cpus // workers)
+    wall_start = time.perf_counter()
+    frames = 0
+    busy = {}
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(model_path, threads)) as pool:
+        futures = [pool.submit(run_job, (name, path, start, end, args.task, stride,
+                                         predictions_dir(name, args.task), args.batch))
+                   for name, path, start, end in todo]
+        for n, future in enumerate(as_completed(futures), 1):
+            try:
+                job, done, seconds, pid = future.result()
+            except Exception as e:
+                print(f"⚠️ Warning: Job failed: {e}")
+                continue
+            name, path, start, end = job[:4]
+            state["jobs"][job_key(name, path, start, end)] = {"frames": done, "seconds": round(seconds, 2)}
+            save_state(RAW_DATA_DIR, state)
+            frames += done
+            busy[pid] = busy.get(pid, 0.0) + seconds
+            elapsed = time.perf_counter() - wall_start
+            print(f"   [{n}/{len(todo)}] {name} {start}-{end}: {done / max(seconds, 1e-9):.1f} fps "
+                  f"| total {frames / max(elapsed, 1e-9):.1f} fps")
+
+    elapsed = time.perf_counter() - wall_start
+    print(f"✅ Labeled {frames} frames in {elapsed:.1f}s ({frames / max(elapsed, 1e-9):.1f} frames/sec, "
+          f"{workers} workers x {threads} threads)")
+    for i, (pid, seconds) in enumerate(sorted(busy.items()), 1):
+        # Busy time counts jobs only, so model loading shows up as idle
+        print(f"   worker {i} (pid {pid}): busy {seconds:.1f}s, utilization {seconds / max(elapsed, 1e-9):.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import os
+import sys
+import time
+import glob
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import cv2
+
+# Compares dataloader image throughput of two dataset roots, e.g. the original split
+# vs. one produced with `datasplitter.py --imgsz 640`.
+#
+#   python benchmarks/bench_dataloader.py datasets/judo_pose datasets/judo_pose_640 --imgsz 640
+#
+# The per-image work mirrors ultralytics' BaseDataset.load_image: decode the JPEG, then
+# resize so the long side equals imgsz. That is the part pre-resizing removes; the
+# augmentations that follow cost the same for both layouts.
+
+
+def load_image(path, imgsz):
+    img = cv2.imread(path)
+    if img is None:
+        return 0
+    h, w = img.shape[:2]
+    r = imgsz / max(h, w)
+    if r != 1:
+        # ultralytics uses INTER_LINEAR whenever augment=True (our training setting)
+        img = cv2.resize(img, (min(round(w * r), imgsz), min(round(h * r), imgsz)), interpolation=cv2.INTER_LINEAR)
+    return img.shape[0] * img.shape[1]
+
+
+def _load_chunk(args):
+    paths, imgsz = args
+    for path in paths:
+        load_image(path, imgsz)
+    return len(paths)
+
+
+def measure(paths, imgsz, workers):
+    """Returns images/sec for loading every path once with the given number of processes."""
+    start = time.perf_counter()
+    if workers > 1:
+        chunks = [(paths[i::workers * 4], imgsz) for i in range(workers * 4)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            count = sum(pool.map(_load_chunk, chunks))
+    else:
+        count = _load_chunk((paths, imgsz))
+    return count / max(time.perf_counter() - start, 1e-9)
+
+
+def dataset_images(root, split, limit):
+    paths = sorted(glob.glob(os.path.join(root, split, "images", "*.jpg")))
+    return paths[:limit] if limit else paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dataloader images/sec: original vs pre-resized dataset.")
+    parser.add_argument("original", help="Dataset root with train/images (full-size)")
+    parser.add_argument("resized", help="Dataset root produced with datasplitter.py --imgsz")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--split", default="train")
+    parser.add_argument("--workers", type=int, default=4, help="Like the 'workers' training argument")
+    parser.add_argument("--limit", type=int, default=500, help="Images per dataset (0 = all)")
+    args = parser.parse_args()
+
+    results = {}
+    for name, root in [("original", args.original), ("resized", args.resized)]:
+        paths = dataset_images(root, args.split, args.limit)
+        if not paths:
+            print(f"❌ Error: No images in {os.path.join(root, args.split, 'images')}")
+            sys.exit(1)
+        # Warm the OS file cache so we measure decode cost, not the first disk read
+        _load_chunk((paths[:min(20, len(paths))], args.imgsz))
+        results[name] = measure(paths, args.imgsz, args.workers)
+        print(f"   {name:>8}: {results[name]:8.1f} images/sec ({len(paths)} images, {args.workers} workers)")
+
+    print(f"✅ Pre-resized set loads {results['resized'] / max(results['original'], 1e-9):.2f}x faster")
+
+
+if __name__ == "__main__":
+    main()
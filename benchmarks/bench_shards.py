@@ -0,0 +1,59 @@
+import os
+import sys
+import time
+import glob
+import argparse
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from label_io import load_label_arrays
+from shards import ShardDataset
+
+# Load throughput (image decode + labels) of the loose-file layout vs packed shards.
+#
+#   python datasplitter.py --shards datasets/judo_pose_shards
+#   python benchmarks/bench_shards.py datasets/judo_pose datasets/judo_pose_shards
+
+
+def loose_items(root, split):
+    for img in sorted(glob.glob(os.path.join(root, split, "images", "*.jpg"))):
+        yield img, os.path.join(root, split, "labels", os.path.basename(img)[:-4] + ".txt")
+
+
+def bench_loose(root, split, limit):
+    pairs = list(loose_items(root, split))[:limit or None]
+    start = time.perf_counter()
+    for img, lbl in pairs:
+        cv2.imread(img)
+        load_label_arrays(lbl)
+    return len(pairs), time.perf_counter() - start
+
+
+def bench_shards(shard_root, split, limit):
+    start = time.perf_counter()
+    dataset = ShardDataset(os.path.join(shard_root, split))
+    n = min(len(dataset), limit) if limit else len(dataset)
+    for i in range(n):
+        dataset[i]
+    return n, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Loose files vs packed shards load throughput.")
+    parser.add_argument("loose", help="Loose dataset root (<root>/<split>/images|labels)")
+    parser.add_argument("shards", help="Shard root written by datasplitter.py --shards")
+    parser.add_argument("--split", default="train")
+    parser.add_argument("--limit", type=int, default=0, help="Items to load (0 = all)")
+    args = parser.parse_args()
+
+    results = {}
+    for name, fn, root in [("loose", bench_loose, args.loose), ("shards", bench_shards, args.shards)]:
+        n, elapsed = fn(root, args.split, args.limit)
+        results[name] = n / max(elapsed, 1e-9)
+        print(f"   {name:>6}: {results[name]:8.1f} items/sec ({n} items in {elapsed:.2f}s)")
+
+    print(f"✅ Shards load {results['shards'] / max(results['loose'], 1e-9):.2f}x the loose-file rate")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,409 @@
+import os
+import sys
+import io
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import contextlib
+import numpy as np
+import cv2
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")   # Headless: no display needed
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import synthetic
+from label_io import read_label_file, write_label_file, load_label_arrays, format_label_line
+
+# Reproducible benchmark suite (synthetic, seeded inputs; CPU only; headless).
+#
+#   python benchmarks/run_benchmarks.py                       -> benchmarks/results/<time>_<commit>.json
+#   python benchmarks/run_benchmarks.py --quick               -> smaller inputs, fewer repeats
+#   python benchmarks/run_benchmarks.py --compare OLD.json    -> ratio vs an earlier run
+#
+# Each benchmark reports ops/sec and the median/min seconds over its repeats. Higher
+# ops/sec is better; the compare table flags changes beyond --tolerance.
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def measure(fn, ops, repeats, warmup=1):
+    """Times fn() `repeats` times (after warmup calls). fn performs `ops` operations."""
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    median = float(np.median(times))
+    return {"ops": ops, "repeats": repeats, "median_s": round(median, 6),
+            "min_s": round(min(times), 6), "ops_per_sec": round(ops / max(median, 1e-12), 2)}
+
+
+# --- BENCHMARKS ---
+def bench_video(videos, frames, repeats):
+    from video_engine import VideoEngine
+    results = {}
+    rng = np.random.default_rng(0)
+    for name, path in videos.items():
+        engine = VideoEngine(cache_frames=False)   # Measure decoding, not cache hits
+        total = engine.load_video(path)
+        n = min(frames, total)
+
+        def sequential():
+            for i in range(n):
+                engine.get_frame(i)
+
+        targets = rng.integers(0, total, n)
+
+        def random_seek():
+            for i in targets:
+                engine.get_frame(int(i))
+
+        results[f"video.sequential.{name}"] = measure(sequential, n, repeats)
+        results[f"video.random_seek.{name}"] = measure(random_seek, n, repeats)
+        engine.release()
+    return results
+
+
+def bench_labels(work_dir, count, repeats):
+    rng = np.random.default_rng(1)
+    folder = os.path.join(work_dir, "label_io")
+    os.makedirs(folder, exist_ok=True)
+    items = [synthetic.random_persons(rng, int(rng.integers(1, 6))) for _ in range(count)]
+    paths = [os.path.join(folder, f"{i:06d}.txt") for i in range(count)]
+
+    def serialize():
+        for path, persons in zip(paths, items):
+            write_label_file(path, persons)
+
+    def parse():
+        for path in paths:
+            read_label_file(path)
+
+    def parse_arrays():
+        for path in paths:
+            load_label_arrays(path)
+
+    def format_only():
+        for persons in items:
+            for p in persons:
+                format_label_line(p['class_id'], p['bbox'], p['keypoints'])
+
+    return {
+        "labels.serialize": measure(serialize, count, repeats),
+        "labels.parse": measure(parse, count, repeats),
+        "labels.parse_arrays": measure(parse_arrays, count, repeats),
+        "labels.format": measure(format_only, count, repeats),
+    }
+
+
+_app = None
+
+
+def _qt_app():
+    """One QApplication for the whole run (it must outlive every widget)."""
+    global _app
+    if _app is None:
+        from PyQt6.QtWidgets import QApplication
+        _app = QApplication.instance() or QApplication([])
+    return _app
+
+
+def bench_save_pair(work_dir, video, count, repeats):
+    app = _qt_app()
+    os.environ["RAW_DATA_DIR"] = os.path.join(work_dir, "app_raw")
+    import main as app_main
+    window = app_main.JudoAppQt()
+    window.engine.load_video(video)
+    window.current_video_name = "bench"
+    window.active_images_dir = os.path.join(work_dir, "save_pair", "images")
+    window.active_labels_dir = os.path.join(work_dir, "save_pair", "labels")
+    os.makedirs(window.active_images_dir, exist_ok=True)
+    os.makedirs(window.active_labels_dir, exist_ok=True)
+    window.current_frame_img = window.engine.get_frame(0)
+    window.annotator.annotations = synthetic.random_persons(np.random.default_rng(2), 3)
+
+    def save():
+        for i in range(count):
+            window.engine.current_frame_index = i
+            window.save_pair()
+
+    result = measure(save, count, repeats)
+    window.engine.release()
+    window.close()
+    app.processEvents()
+    return {"save_pair": result}
+
+
+def bench_annotator(persons_counts, repeats, size=(1280, 720)):
+    from PyQt6.QtCore import Qt, QPointF, QEvent
+    from PyQt6.QtGui import QMouseEvent
+    from annotator import AnnotationWidget
+    _qt_app()
+    widget = AnnotationWidget()
+    widget.resize(*size)
+    widget.set_image(np.zeros((size[1], size[0], 3), dtype=np.uint8))
+    rng = np.random.default_rng(3)
+    clicks = [QPointF(float(x), float(y)) for x, y in rng.uniform(0, 1, (200, 2)) * size]
+    results = {}
+    for n in persons_counts:
+        widget.annotations = synthetic.random_persons(rng, n)
+
+        def paint():
+            for _ in range(20):
+                widget.grab()
+
+        def hit_test():
+            for pos in clicks:
+                widget.selected_idx = -1
+                press = QMouseEvent(QEvent.Type.MouseButtonPress, pos, Qt.MouseButton.LeftButton,
+                                    Qt.MouseButton.LeftButton, Qt.KeyboardModifier.NoModifier)
+                widget.mousePressEvent(press)
+                widget.dragging = False
+
+        results[f"annotator.paint.{n}_persons"] = measure(paint, 20, repeats)
+        results[f"annotator.hit_test.{n}_persons"] = measure(hit_test, len(clicks), repeats)
+    return results
+
+
+def bench_datasplitter(work_dir, pairs, repeats):
+    import datasplitter
+    raw = os.path.join(work_dir, "split_raw")
+    if not os.path.exists(raw):
+        synthetic.make_label_corpus(raw, videos=4, frames_per_video=max(1, pairs // 4))
+    dest = os.path.join(work_dir, "split_out")
+    datasplitter.SOURCE_ROOT = raw
+    datasplitter.DEST_ROOT = dest
+    old_argv = sys.argv
+
+    def run(extra):
+        sys.argv = ["datasplitter.py", "--workers", "1"] + extra
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                datasplitter.main()
+        finally:
+            sys.argv = old_argv
+
+    def full():
+        run(["--rebuild"])
+
+    def incremental():
+        run([])
+
+    # datasplitter writes judo_pose.yaml to the working directory; keep it out of the repo
+    cwd = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        return {
+            "datasplitter.full": measure(full, pairs, repeats),
+            "datasplitter.incremental": measure(incremental, pairs, repeats),
+        }
+    finally:
+        os.chdir(cwd)
+
+
+def bench_memory(work_dir, video, frames, repeats, limit_mb=16):
+    """
+    Fills every budgeted cache (frames, thumbnails, predictions, undo history, a pinned
+    model) under a small budget and fails if the total ever ends up above it.
+    """
+    import memory_budget
+    from video_engine import VideoEngine
+    from thumbnails import ThumbnailCache
+    from edit_history import EditHistory
+    budget = memory_budget.default
+    old_limit = budget.limit_bytes
+    budget.limit_bytes = limit_mb * 2**20
+    rng = np.random.default_rng(4)
+    peak = 0
+
+    def check():
+        nonlocal peak
+        used = budget.used()
+        peak = max(peak, used)
+        if used > budget.limit_bytes:
+            raise AssertionError(f"memory budget exceeded: {used} > {budget.limit_bytes}\n{budget.format_table()}")
+
+    folder = os.path.join(work_dir, "memory_thumbs")
+    os.makedirs(folder, exist_ok=True)
+    images = []
+    for i in range(frames):
+        path = os.path.join(folder, f"{i:06d}.jpg")
+        cv2.imwrite(path, rng.integers(0, 255, (720, 1280, 3), dtype=np.uint8))
+        images.append(path)
+
+    engine = VideoEngine()
+    engine.load_video(video)
+    thumbs = ThumbnailCache(folder)
+    predictions = memory_budget.BudgetedLRU("predictions", memory_budget.PRIORITY_PREDICTIONS,
+                                            memory_budget.annotations_bytes)
+    history = EditHistory()
+    budget.register("model.main")
+    budget.set("model.main", 4 * 2**20)
+
+    def fill():
+        for i in range(engine.total_frames):
+            engine.get_frame(i)
+            check()
+            persons = synthetic.random_persons(rng, 5)
+            predictions.put(("bench", i), persons)
+            check()
+            history.switch(("bench", i), persons)
+            for p in range(len(persons)):
+                history.record(persons, ("delete", p, persons[p]))
+            check()
+        for path in images:
+            thumbs.request(path)
+        for future in list(thumbs.pending.values()):
+            future.result()
+        budget.enforce()   # Thumbnail workers only report; the GUI thread enforces
+        check()
+        for path in images:
+            thumbs.invalidate(path)
+
+    try:
+        result = measure(fill, engine.total_frames, repeats)
+    finally:
+        thumbs.close()
+        engine.release()
+        predictions.clear()
+        budget.set("model.main", 0)
+        budget.limit_bytes = old_limit
+    result["limit_mb"] = limit_mb
+    result["peak_mb"] = round(peak / 2**20, 2)
+    return {"memory_budget.fill": result}
+
+
+def bench_inference(model_path, video, frames, repeats):
+    """CPU inference with a tiny model, if ultralytics and the weights are available."""
+    try:
+        import model_pool
+        model = model_pool.yolo(model_path)
+    except Exception as e:
+        return {"inference.cpu": {"skipped": f"{type(e).__name__}: {e}"}}
+    cap = cv2.VideoCapture(video)
+    imgs = []
+    while len(imgs) < frames:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        imgs.append(frame)
+    cap.release()
+
+    def infer():
+        for img in imgs:
+            model(img, verbose=False, device="cpu")
+
+    return {"inference.cpu": measure(infer, len(imgs), repeats)}
+
+
+# --- RESULTS ---
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or "unknown"
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+
+
+def environment():
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "machine": platform.machine(), "cpus": os.cpu_count(),
+            "opencv": cv2.__version__, "numpy": np.__version__}
+
+
+def compare(current, old_path, tolerance):
+    with open(old_path, "r") as f:
+        old = json.load(f)
+    print(f"\n📊 vs {old.get('commit', '?')} ({os.path.basename(old_path)}):")
+    for name, result in current["results"].items():
+        before = old.get("results", {}).get(name, {})
+        if "ops_per_sec" not in result or "ops_per_sec" not in before:
+            continue
+        ratio = result["ops_per_sec"] / max(before["ops_per_sec"], 1e-12)
+        flag = "⚠️" if ratio < 1 - tolerance else ("🚀" if ratio > 1 + tolerance else "  ")
+        print(f"   {flag} {name:<42} {ratio:6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the synthetic benchmark suite.")
+    parser.add_argument("--quick", action="store_true", help="Small inputs, fewer repeats (smoke test)")
+    parser.add_argument("--only", nargs="*", default=None,
+                        choices=["video", "labels", "save_pair", "annotator", "datasplitter", "memory", "inference"])
+    parser.add_argument("--model", default=os.getenv("MODEL_NANO_PATH", "yolo26n-pose.pt"),
+                        help="Tiny model for the CPU inference benchmark (skipped if unavailable)")
+    parser.add_argument("--out", default=None, help="Results JSON (default: benchmarks/results/<time>_<commit>.json)")
+    parser.add_argument("--compare", default=None, help="Earlier results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Relative change flagged in --compare")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated work folder")
+    args = parser.parse_args()
+
+    quick = args.quick
+    repeats = 2 if quick else 5
+    frames = 30 if quick else 120
+    resolutions = synthetic.RESOLUTIONS[:1] if quick else synthetic.RESOLUTIONS
+    selected = set(args.only or ["video", "labels", "save_pair", "annotator", "datasplitter", "memory", "inference"])
+
+    work_dir = tempfile.mkdtemp(prefix="judo_bench_")
+    print(f"🚀 Benchmarks ({'quick' if quick else 'full'}) in {work_dir}")
+    results = {}
+    try:
+        videos = {}
+        for fourcc, ext in synthetic.CODECS:
+            for w, h in resolutions:
+                path = synthetic.make_video(os.path.join(work_dir, f"{w}x{h}_{fourcc}{ext}"), w, h, frames, fourcc)
+                if path:
+                    videos[f"{w}x{h}_{fourcc}"] = path
+                else:
+                    print(f"⚠️ Warning: OpenCV cannot write {fourcc} here, skipping")
+        if not videos:
+            print("❌ Error: Could not write any synthetic video")
+            sys.exit(1)
+        first_video = next(iter(videos.values()))
+
+        steps = [
+            ("video", lambda: bench_video(videos, frames, repeats)),
+            ("labels", lambda: bench_labels(work_dir, 200 if quick else 2000, repeats)),
+            ("save_pair", lambda: bench_save_pair(work_dir, first_video, 10 if quick else 50, repeats)),
+            ("annotator", lambda: bench_annotator([1, 10] if quick else [1, 10, 50], repeats)),
+            ("datasplitter", lambda: bench_datasplitter(work_dir, 40 if quick else 400, repeats)),
+            ("memory", lambda: bench_memory(work_dir, first_video, frames, repeats)),
+            ("inference", lambda: bench_inference(args.model, first_video, 5 if quick else 20, repeats)),
+        ]
+        for name, step in steps:
+            if name not in selected:
+                continue
+            start = time.perf_counter()
+            step_results = step()
+            results.update(step_results)
+            print(f"   ✅ {name} ({time.perf_counter() - start:.1f}s)")
+            for key, r in step_results.items():
+                if "ops_per_sec" in r:
+                    print(f"      {key:<42} {r['ops_per_sec']:10.1f} ops/sec")
+                else:
+                    print(f"      {key:<42} skipped ({r.get('skipped')})")
+    finally:
+        if not args.keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    commit = git_commit()
+    report = {"commit": commit, "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+              "quick": quick, "environment": environment(), "results": results}
+    out = args.out or os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d_%H%M%S')}_{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Results written to {out}")
+
+    if args.compare:
+        compare(report, args.compare, args.tolerance)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import os
+import sys
+import argparse
+import numpy as np
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from label_io import write_label_file, NUM_KEYPOINTS
+
+# Synthetic inputs for the benchmark suite. Everything is seeded, so two runs (or two
+# commits) benchmark byte-identical data.
+#
+#   python benchmarks/synthetic.py /tmp/synth          -> videos + a RAW_DATA_DIR-style corpus
+
+# (fourcc, extension) pairs; not every OpenCV build can write every codec
+CODECS = [("mp4v", ".mp4"), ("MJPG", ".avi")]
+RESOLUTIONS = [(640, 360), (1280, 720), (1920, 1080)]
+
+
+def make_video(path, width, height, frames, fourcc="mp4v", fps=30, seed=0):
+    """
+    Writes a video of moving blocks over a noisy gradient (enough texture that the codec
+    does real work). Returns the path, or None if this OpenCV build cannot write the codec.
+    """
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), fps, (width, height))
+    if not writer.isOpened():
+        return None
+    rng = np.random.default_rng(seed)
+    base = np.tile(np.linspace(40, 200, width, dtype=np.uint8), (height, 1))
+    base = cv2.merge([base, base[::-1], np.full_like(base, 90)])
+    noise = rng.integers(0, 25, (height, width, 3), dtype=np.uint8)
+    blocks = rng.uniform(0, 1, (6, 4))
+    for i in range(frames):
+        frame = cv2.add(base, np.roll(noise, i * 3, axis=1))
+        for b, (x, y, vx, vy) in enumerate(blocks):
+            cx = int(((x + vx * i / frames) % 1.0) * width)
+            cy = int(((y + vy * i / frames) % 1.0) * height)
+            color = (40 * b % 255, 255 - 30 * b, 60 + 25 * b)
+            cv2.rectangle(frame, (cx, cy), (cx + width // 10, cy + height // 6), color, -1)
+        cv2.putText(frame, str(i), (10, height - 10), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 2)
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+def random_persons(rng, count, num_kpts=NUM_KEYPOINTS):
+    """Annotator-style person dicts with plausible boxes and keypoints inside them."""
+    persons = []
+    for _ in range(count):
+        w, h = rng.uniform(0.05, 0.25), rng.uniform(0.2, 0.6)
+        cx, cy = rng.uniform(w / 2, 1 - w / 2), rng.uniform(h / 2, 1 - h / 2)
+        xs = rng.uniform(cx - w / 2, cx + w / 2, num_kpts)
+        ys = rng.uniform(cy - h / 2, cy + h / 2, num_kpts)
+        vis = rng.choice([0, 1, 2], num_kpts, p=[0.1, 0.2, 0.7])
+        kpts = [[float(x), float(y), int(v)] if v else [0.0, 0.0, 0] for x, y, v in zip(xs, ys, vis)]
+        persons.append({'type': 'person', 'class_id': 0,
+                        'bbox': [float(cx), float(cy), float(w), float(h)], 'keypoints': kpts})
+    return persons
+
+
+def make_label_corpus(root, videos=4, frames_per_video=50, persons=(1, 4), size=(640, 360), seed=0):
+    """
+    Writes a RAW_DATA_DIR-style tree: <root>/<video>/pose/images|labels/<video>_<idx>.jpg|txt.
+    Images are small random JPEGs so datasplitter has real files to link/copy/resize.
+    Returns the number of pairs written.
+    """
+    rng = np.random.default_rng(seed)
+    count = 0
+    for v in range(videos):
+        name = f"synth{v:02d}"
+        img_dir = os.path.join(root, name, "pose", "images")
+        lbl_dir = os.path.join(root, name, "pose", "labels")
+        os.makedirs(img_dir, exist_ok=True)
+        os.makedirs(lbl_dir, exist_ok=True)
+        for f in range(frames_per_video):
+            base = f"{name}_{f:06d}"
+            img = rng.integers(0, 255, (size[1] // 8, size[0] // 8, 3), dtype=np.uint8)
+            img = cv2.resize(img, size, interpolation=cv2.INTER_LINEAR)
+            cv2.imwrite(os.path.join(img_dir, base + ".jpg"), img)
+            write_label_file(os.path.join(lbl_dir, base + ".txt"),
+                             random_persons(rng, int(rng.integers(persons[0], persons[1] + 1))))
+            count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic benchmark videos and labels.")
+    parser.add_argument("out", help="Output folder")
+    parser.add_argument("--frames", type=int, default=120, help="Frames per video")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    for fourcc, ext in CODECS:
+        for w, h in RESOLUTIONS:
+            path = make_video(os.path.join(args.out, f"synth_{w}x{h}_{fourcc}{ext}"), w, h, args.frames, fourcc)
+            print(f"   {'✅' if path else '⚠️ skipped'} {fourcc} {w}x{h}")
+    n = make_label_corpus(os.path.join(args.out, "raw"))
+    print(f"✅ Wrote {n} synthetic label pairs to {os.path.join(args.out, 'raw')}")
+
+
+if __name__ == "__main__":
+    main()
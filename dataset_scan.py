@@ -0,0 +1,152 @@
+import os
+import json
+
+# --- CONFIG ---
+MANIFEST_NAME = ".review_manifest.json"
+MANIFEST_VERSION = 2
+IMAGE_EXT = ".jpg"
+LABEL_EXT = ".txt"
+
+
+def _iter_stems(directory, ext, mtimes=None):
+    """
+    Yields file stems with the given extension using a single os.scandir pass.
+    If mtimes is a dict, it is filled with {stem: mtime_ns} from the same pass.
+    """
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            name = entry.name
+            # DirEntry.is_file() uses the cached d_type, so this does not stat each file
+            if name.endswith(ext) and not name.startswith(".") and entry.is_file():
+                stem = name[:-len(ext)]
+                if mtimes is not None:
+                    # Free on Windows (scandir returns it); one stat per file elsewhere, once per scan
+                    try:
+                        mtimes[stem] = entry.stat().st_mtime_ns
+                    except OSError:
+                        continue   # Removed mid-scan
+                yield stem
+
+
+def _dir_signature(images_dir, labels_dir):
+    """Directory mtimes change whenever an entry is added, removed or renamed."""
+    return [os.stat(images_dir).st_mtime_ns, os.stat(labels_dir).st_mtime_ns]
+
+
+def _manifest_path(images_dir):
+    return os.path.join(os.path.dirname(os.path.abspath(images_dir)), MANIFEST_NAME)
+
+
+def _load(images_dir, labels_dir):
+    path = _manifest_path(images_dir)
+    try:
+        with open(path, "r") as f:
+            manifest = json.load(f)
+        if manifest.get("version") != MANIFEST_VERSION:
+            return None
+        if manifest.get("signature") != _dir_signature(images_dir, labels_dir):
+            return None
+        return manifest
+    except (OSError, ValueError):
+        return None
+
+
+def load_manifest(images_dir, labels_dir):
+    """
+    Returns the cached sorted list of stems if the manifest is still valid, else None.
+    Args:
+        images_dir (str): Folder containing the .jpg files.
+        labels_dir (str): Folder containing the .txt files.
+    """
+    manifest = _load(images_dir, labels_dir)
+    return manifest.get("stems") if manifest else None
+
+
+def load_label_mtimes(images_dir, labels_dir):
+    """
+    {stem: label mtime_ns} recorded by the last scan, or None if the manifest is stale.
+    Labels edited in place (which doesn't change the folder's mtime) keep their scan-time
+    mtime until the folder changes, so callers should update entries for files they write.
+    """
+    manifest = _load(images_dir, labels_dir)
+    return manifest.get("label_mtimes") if manifest else None
+
+
+def save_manifest(images_dir, signature, stems, label_mtimes=None):
+    """Writes the manifest atomically so an interrupted write never leaves a corrupt cache."""
+    path = _manifest_path(images_dir)
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump({"version": MANIFEST_VERSION, "signature": signature, "stems": stems,
+                       "label_mtimes": label_mtimes or {}}, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️ Warning: Could not write review manifest: {e}")
+
+
+def iter_review_pairs(images_dir, labels_dir, chunk_size=256):
+    """
+    Streams (image_path, label_path) pairs in chunks so the UI can show the first
+    image before the scan finishes. Both folders are read with one interleaved
+    os.scandir pass each and matched by set intersection. The same pass records label
+    mtimes in the manifest (see load_label_mtimes) so nothing stats them again later.
+    A valid cached manifest (same directory mtimes) skips the scan entirely.
+
+    Chunks from a fresh scan arrive in directory order; chunks from the manifest are sorted.
+
+    Args:
+        images_dir (str): Folder containing the .jpg files.
+        labels_dir (str): Folder containing the .txt files.
+        chunk_size (int): Number of pairs per yielded chunk.
+    """
+    def to_pair(stem):
+        return (os.path.join(images_dir, stem + IMAGE_EXT), os.path.join(labels_dir, stem + LABEL_EXT))
+
+    cached = load_manifest(images_dir, labels_dir)
+    if cached is not None:
+        for i in range(0, len(cached), chunk_size):
+            yield [to_pair(stem) for stem in cached[i:i + chunk_size]]
+        return
+
+    # Capture the signature BEFORE scanning: if the folder changes mid-scan the
+    # stored mtimes will be stale and the next open rescans.
+    signature = _dir_signature(images_dir, labels_dir)
+
+    label_mtimes = {}
+    iterators = [_iter_stems(images_dir, IMAGE_EXT), _iter_stems(labels_dir, LABEL_EXT, label_mtimes)]
+    unmatched = [set(), set()]  # stems seen only in images / only in labels so far
+    matched = []
+    chunk = []
+
+    try:
+        # Alternate between both folders so matches are emitted as soon as both halves are seen
+        while iterators[0] is not None or iterators[1] is not None:
+            for side in (0, 1):
+                it = iterators[side]
+                if it is None:
+                    continue
+                stem = next(it, None)
+                if stem is None:
+                    iterators[side] = None
+                    continue
+                other = unmatched[1 - side]
+                if stem in other:
+                    other.discard(stem)
+                    matched.append(stem)
+                    chunk.append(to_pair(stem))
+                    if len(chunk) >= chunk_size:
+                        yield chunk
+                        chunk = []
+                else:
+                    unmatched[side].add(stem)
+    finally:
+        for it in iterators:
+            if it is not None:
+                it.close()
+
+    if chunk:
+        yield chunk
+
+    matched.sort()
+    save_manifest(images_dir, signature, matched, {stem: label_mtimes[stem] for stem in matched})
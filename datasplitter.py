@@ -1,9 +1,23 @@
 import os
+import sys
+import math
+import time
 import shutil
-import random
-import glob
+import json
+import hashlib
+import argparse
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
 from dotenv import load_dotenv
 
+from label_io import NUM_KEYPOINTS
+from label_validation import shape_issue, validate_splits, save_report, format_issues, REPORT_NAME
+
+try:
+    from tqdm import tqdm
+except ImportError:  # tqdm is optional, fall back to plain progress prints
+    tqdm = None
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -12,6 +26,11 @@ load_dotenv()
 SOURCE_ROOT = os.getenv("RAW_DATA_DIR", "judo_datasetDONTDELETE")
 DEST_ROOT = os.getenv("PROCESSED_DATA_DIR", "datasets/judo_pose")
 TRAIN_RATIO = 0.8                       # 80% Training, 20% Validation
+LINK_MODES = ["copy", "hardlink", "symlink", "reflink"]
+FICLONE = 0x40049409                    # Linux ioctl for copy-on-write clones (btrfs, XFS)
+MANIFEST_NAME = "manifest.json"         # Lives in DEST_ROOT, records every materialized pair
+MANIFEST_VERSION = 1
+RESIZE_QUALITY = 95                     # JPEG quality for pre-resized images
 
 def clamp(val):
     """Restricts normalized coordinates to 0.0-1.0"""
@@ -21,13 +40,30 @@ def clean_and_copy(src_txt, dst_txt):
     """
     Reads a YOLO label file, clamps coordinates, 
     but PRESERVES visibility flags (0, 1, 2).
+    Lines that can't be used for training are DROPPED from the output (they used to
+    raise and abort the split): wrong number of values (not 5 or 5 + 3 * NUM_KEYPOINTS),
+    values that aren't numbers, and NaN/inf. Returns the number of dropped lines.
     """
     with open(src_txt, 'r') as f:
         lines = f.readlines()
     
     cleaned_lines = []
+    dropped = 0
     for line in lines:
-        parts = list(map(float, line.strip().split()))
+        tokens = line.split()
+        if not tokens:
+            continue
+        if shape_issue(len(tokens), NUM_KEYPOINTS):
+            dropped += 1
+            continue
+        try:
+            parts = list(map(float, tokens))
+        except ValueError:
+            dropped += 1
+            continue
+        if not all(map(math.isfinite, parts)):
+            dropped += 1
+            continue
         
         # 1. Class ID
         class_id = int(parts[0])
@@ -52,11 +88,273 @@ def clean_and_copy(src_txt, dst_txt):
         
     with open(dst_txt, 'w') as f:
         f.write("\n".join(cleaned_lines))
+    return dropped
+
+def _reflink(src, dst):
+    """Copy-on-write clone: shares data blocks until one side is modified."""
+    if sys.platform.startswith("linux"):
+        import fcntl
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+    elif sys.platform == "darwin":
+        # APFS clone via cp -c
+        subprocess.run(["cp", "-c", src, dst], check=True, capture_output=True)
+    else:
+        raise OSError("reflink not supported on this platform")
+
+def materialize(src, dst, mode="copy"):
+    """
+    Places src at dst using the requested strategy. Hardlink/reflink fall back to a
+    plain copy when the filesystem can't do it (e.g. across drives).
+    Returns the strategy that was actually used.
+    """
+    if os.path.lexists(dst):
+        os.remove(dst)
+    try:
+        if mode == "hardlink":
+            os.link(src, dst)
+            return mode
+        if mode == "symlink":
+            os.symlink(os.path.abspath(src), dst)
+            return mode
+        if mode == "reflink":
+            _reflink(src, dst)
+            return mode
+    except (OSError, subprocess.CalledProcessError):
+        if os.path.lexists(dst):
+            os.remove(dst)
+    shutil.copy(src, dst)
+    return "copy"
+
+def pair_hash(img, lbl):
+    """Content hash of an image/label pair (streamed, so large images don't load into RAM)."""
+    h = hashlib.blake2b(digest_size=16)
+    for path in (lbl, img):
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+    return h.hexdigest()
+
+def resize_image(src, dst, long_side, mode="copy"):
+    """
+    Writes src downscaled so its long side is at most long_side (aspect ratio kept,
+    no padding), so the normalized labels stay valid unchanged.
+    Images that are already small enough are placed as-is using mode. An image OpenCV
+    can't decode is placed as-is too (returns "unresized") instead of failing the whole run.
+    """
+    import cv2
+    img = cv2.imread(src)
+    if img is None:
+        print(f"⚠️ Warning: Could not read image {src}; using it unresized")
+        materialize(src, dst, mode)
+        return "unresized"
+    h, w = img.shape[:2]
+    scale = long_side / max(h, w)
+    if scale >= 1:
+        return materialize(src, dst, mode)
+    if os.path.lexists(dst):
+        os.remove(dst)
+    # INTER_AREA is the right filter for downscaling (no aliasing)
+    small = cv2.resize(img, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=cv2.INTER_AREA)
+    cv2.imwrite(dst, small, [cv2.IMWRITE_JPEG_QUALITY, RESIZE_QUALITY])
+    return "resized"
+
+def process_pair(job):
+    """
+    Worker task: materializes one image and cleans its label.
+    job = (img, lbl, dst_img, dst_lbl, mode, imgsz, old_hash)
+    imgsz > 0 writes a pre-resized image instead of linking/copying.
+    If the content hash matches old_hash and the outputs exist (e.g. the file was only
+    touched), nothing is rewritten. Returns (strategy used or "unchanged", hash, label lines dropped).
+    """
+    img, lbl, dst_img, dst_lbl, mode, imgsz, old_hash = job
+    digest = pair_hash(img, lbl)
+    if digest == old_hash and os.path.lexists(dst_img) and os.path.exists(dst_lbl):
+        return "unchanged", digest, 0
+    used = resize_image(img, dst_img, imgsz, mode) if imgsz else materialize(img, dst_img, mode)
+    dropped = clean_and_copy(lbl, dst_lbl)
+    return used, digest, dropped
+
+def run_jobs(jobs, workers=1, desc="Processing"):
+    """
+    Runs process_pair over all jobs, serially or in a process pool, with progress output.
+    Returns ({strategy: count}, [hash per job], label lines dropped).
+    """
+    counts = {}
+    hashes = []
+    dropped = 0
+    if not jobs:
+        return counts, hashes, dropped
+
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        # Large chunks keep IPC overhead negligible next to the file work
+        results = pool.map(process_pair, jobs, chunksize=max(1, min(256, len(jobs) // (workers * 8))))
+    else:
+        pool = None
+        results = map(process_pair, jobs)
+
+    if tqdm:
+        results = tqdm(results, total=len(jobs), desc=desc, unit="pair")
+    try:
+        for i, (used, digest, lines) in enumerate(results, 1):
+            counts[used] = counts.get(used, 0) + 1
+            hashes.append(digest)
+            dropped += lines
+            if not tqdm and (i % 1000 == 0 or i == len(jobs)):
+                print(f"   {desc}: {i}/{len(jobs)}")
+    finally:
+        if pool:
+            pool.shutdown()
+    return counts, hashes, dropped
+
+def split_for(key, train_ratio=TRAIN_RATIO):
+    """
+    Deterministic split assignment: the same key always lands in the same split,
+    independent of how many other pairs exist or the order they were found in.
+    """
+    bucket = int(hashlib.sha1(key.encode()).hexdigest()[:8], 16) / 0x100000000
+    return "train" if bucket < train_ratio else "val"
+
+def _scan_files(directory, ext):
+    """{stem: (path, size, mtime_ns)} from one os.scandir pass (stat is free on Windows)."""
+    found = {}
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(ext) and entry.is_file():
+                    st = entry.stat()
+                    found[entry.name[:-len(ext)]] = (entry.path, st.st_size, st.st_mtime_ns)
+    except OSError:
+        pass
+    return found
+
+def _subdirs(directory):
+    try:
+        with os.scandir(directory) as entries:
+            return [entry.path for entry in entries if entry.is_dir()]
+    except OSError:
+        return []
+
+def gather_pairs(source_root):
+    """
+    Finds image/label pairs.
+    Looks for: Root / VideoName / pose|detect / images / *.jpg
+    Falls back to the old shallow layout: Root / VideoName / images / *.jpg
+    Returns (pairs, image_count) where pairs maps a stable key (path relative to
+    source_root) to {"img", "lbl", "img_size", "img_mtime", "lbl_size", "lbl_mtime"}.
+    """
+    folders = [d for video in _subdirs(source_root) for d in _subdirs(video)
+               if os.path.isdir(os.path.join(d, "images"))]
+    if not folders:
+        folders = [d for d in _subdirs(source_root) if os.path.isdir(os.path.join(d, "images"))]
+
+    pairs = {}
+    image_count = 0
+    for folder in sorted(folders):
+        images = _scan_files(os.path.join(folder, "images"), ".jpg")
+        labels = _scan_files(os.path.join(folder, "labels"), ".txt")
+        image_count += len(images)
+        for stem, (img, img_size, img_mtime) in sorted(images.items()):
+            if stem not in labels:
+                print(f"⚠️ Warning: Missing label for {stem}.jpg")
+                continue
+            lbl, lbl_size, lbl_mtime = labels[stem]
+            key = os.path.relpath(img, source_root).replace("\\", "/")
+            pairs[key] = {"img": img, "lbl": lbl, "img_size": img_size, "img_mtime": img_mtime,
+                          "lbl_size": lbl_size, "lbl_mtime": lbl_mtime}
+    return pairs, image_count
+
+STAT_FIELDS = ("img_size", "img_mtime", "lbl_size", "lbl_mtime")
 
-def create_yaml(dest_root):
+def same_files(old, entry):
+    return bool(old) and all(old.get(f) == entry[f] for f in STAT_FIELDS)
+
+def dedup_stage(pairs, manifest, args):
+    """
+    Drops near-duplicate frames from pairs (in place) and returns {key: group_key} so
+    every member of a cluster lands in the same split. Perceptual hashes of unchanged
+    images are reused from the manifest. Writes dedup_report.json into DEST_ROOT.
+    """
+    from dedup import compute_hashes, dedup_pairs
+
+    cached = manifest.get("phash", {})
+    keys = list(pairs)
+    todo = [k for k in keys if k not in cached or cached[k][:2] != [pairs[k]["img_size"], pairs[k]["img_mtime"]]]
+    start = time.perf_counter()
+    for key, h in zip(todo, compute_hashes([pairs[k]["img"] for k in todo], workers=args.workers)):
+        cached[key] = [pairs[key]["img_size"], pairs[key]["img_mtime"], h]
+    manifest["phash"] = {k: cached[k] for k in keys}
+    print(f"🔎 Hashed {len(todo)} images ({len(keys) - len(todo)} cached) in {time.perf_counter() - start:.1f}s")
+
+    hashes = [cached[k][2] for k in keys]
+    weights = [pairs[k]["lbl_size"] for k in keys]
+    keep, groups = dedup_pairs(keys, hashes, weights, args.dedup, per_video=args.dedup_per_video)
+
+    sizes = {}
+    for group in groups.values():
+        sizes[group] = sizes.get(group, 0) + 1
+    removed = [k for k in keys if k not in keep]
+    for key in removed:
+        del pairs[key]
+
+    report = {
+        "threshold": args.dedup,
+        "per_video": args.dedup_per_video,
+        "total": len(keys),
+        "clusters": len(sizes),
+        "kept": len(keep),
+        "removed": len(removed),
+        "removed_percent": round(100.0 * len(removed) / max(len(keys), 1), 2),
+        "largest_clusters": sorted(([g, n] for g, n in sizes.items() if n > 1), key=lambda gn: -gn[1])[:20],
+        "removed_keys": removed,
+    }
+    with open(os.path.join(DEST_ROOT, "dedup_report.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"🧹 Dedup (≤{args.dedup} bits): {len(keys)} pairs -> {len(keep)} kept in {len(sizes)} clusters, "
+          f"removed {len(removed)} ({report['removed_percent']}%). Report: {os.path.join(DEST_ROOT, 'dedup_report.json')}")
+    return groups
+
+def split_signatures(pairs, imgsz):
+    """{split: hash of its manifest entries (key + content hash)}, so unchanged splits aren't repacked."""
+    hashers = {}
+    for key in sorted(pairs):
+        entry = pairs[key]
+        h = hashers.setdefault(entry["split"], hashlib.blake2b(f"imgsz={imgsz}".encode(), digest_size=16))
+        h.update(f"{key}\0{entry.get('hash')}\n".encode())
+    return {split: h.hexdigest() for split, h in hashers.items()}
+
+def load_manifest(dest_root):
+    try:
+        with open(os.path.join(dest_root, MANIFEST_NAME), "r") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == MANIFEST_VERSION:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return None
+
+def save_manifest(dest_root, manifest):
+    path = os.path.join(dest_root, MANIFEST_NAME)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f)
+    os.replace(path + ".tmp", path)
+
+def output_paths(dest_root, split, img):
+    fname = os.path.basename(img)
+    return (os.path.join(dest_root, split, 'images', fname),
+            os.path.join(dest_root, split, 'labels', fname.replace('.jpg', '.txt')))
+
+def remove_outputs(dest_root, split, img):
+    for path in output_paths(dest_root, split, img):
+        if os.path.lexists(path):
+            os.remove(path)
+
+def create_yaml(dest_root, imgsz=0):
     """Generates the YAML file pointing to the correct absolute path"""
     # Use forward slashes for paths to avoid Windows backslash escape issues in YAML
     abs_path = os.path.abspath(dest_root).replace('\\', '/')
+    resize_note = f"\n# Images were pre-resized by datasplitter.py (long side, aspect kept)\npreresized: {imgsz}\n" if imgsz else ""
     
     yaml_content = f"""
 path: {abs_path}  # Absolute path to dataset (Auto-Generated)
@@ -70,74 +368,175 @@ flip_idx: [0, 2, 1, 4, 3, 6, 5, 8, 7, 10, 9, 12, 11, 14, 13, 16, 15]
 # Classes
 names:
   0: person
-"""
+{resize_note}"""
     # Save the yaml in the current directory so training script finds it easily
     with open("judo_pose.yaml", "w") as f:
         f.write(yaml_content.strip())
     print(f"✅ Generated judo_pose.yaml pointing to: {abs_path}")
 
-def main():
+def parse_args():
+    parser = argparse.ArgumentParser(description="Split the raw dataset into YOLO train/val folders.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes for materializing pairs (1 = serial)")
+    parser.add_argument("--link", choices=LINK_MODES, default=os.getenv("SPLIT_LINK_MODE", "copy"),
+                        help="How images are placed in the split: copy, hardlink, symlink or reflink. "
+                             "Hardlinks/symlinks share data with RAW_DATA_DIR, so edits there show up in the split.")
+    parser.add_argument("--imgsz", type=int, default=0,
+                        help="Pre-resize images so the long side is at most this many pixels "
+                             "(e.g. 640 to match training). Labels are normalized so they are unchanged. 0 = keep originals")
+    parser.add_argument("--shards", default="",
+                        help="Also pack each split into memory-mappable shards in this folder (see shards.py)")
+    parser.add_argument("--dedup", type=int, default=None, metavar="BITS",
+                        help="Remove near-duplicate frames whose perceptual hashes differ by at most BITS "
+                             "(e.g. 6) and keep each cluster in a single split")
+    parser.add_argument("--dedup-per-video", action="store_true",
+                        help="With --dedup, keep one frame per cluster per video instead of per cluster")
+    parser.add_argument("--from-index", action="store_true",
+                        help="Take the list of pairs from the metadata index (metadata_index.py) instead of "
+                             "scanning RAW_DATA_DIR. Run `python metadata_index.py rebuild` first if files "
+                             "were changed outside the app")
+    parser.add_argument("--no-validate", action="store_true",
+                        help=f"Skip the label validation / statistics pass ({REPORT_NAME} in the destination)")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Delete the output and rebuild from scratch instead of updating incrementally")
+    return parser.parse_args()
+
+def main(args=None):
+    args = args or parse_args()
     print(f"🚀 Starting Data Split...")
     print(f"   Source: {SOURCE_ROOT}")
     print(f"   Destination: {DEST_ROOT}")
 
-    # 1. Clear old dataset to avoid duplicates
-    if os.path.exists(DEST_ROOT):
-        shutil.rmtree(DEST_ROOT)
+    # 1. Load the manifest of the previous run. Without one (or with --rebuild)
+    # the output can't be trusted, so clear it to avoid duplicates.
+    manifest = None if args.rebuild else load_manifest(DEST_ROOT)
+    if manifest is None:
+        if os.path.exists(DEST_ROOT):
+            shutil.rmtree(DEST_ROOT)
+        manifest = {"version": MANIFEST_VERSION, "pairs": {}}
+    old_pairs = manifest["pairs"]
+    # Switching --link or --imgsz between runs re-materializes every image with the new strategy
+    relink = bool(old_pairs) and (manifest.get("link") != args.link or manifest.get("imgsz", 0) != args.imgsz)
         
     for split in ['train', 'val']:
         os.makedirs(os.path.join(DEST_ROOT, split, 'images'), exist_ok=True)
         os.makedirs(os.path.join(DEST_ROOT, split, 'labels'), exist_ok=True)
 
-    # 2. Gather files (Fixed GLOB to look deeper)
-    # Looks for: Root / VideoName / pose / images / *.jpg
-    all_images = glob.glob(os.path.join(SOURCE_ROOT, "*", "*", "images", "*.jpg"))
-    
-    # Fallback: Try the old shallow path just in case
-    if not all_images:
-        all_images = glob.glob(os.path.join(SOURCE_ROOT, "*", "images", "*.jpg"))
+    # 2. Gather files
+    if args.from_index:
+        import metadata_index
+        pairs, image_count = metadata_index.indexed_pairs(os.path.abspath(SOURCE_ROOT))
+        print(f"   Using metadata index ({len(pairs)} pairs)")
+    else:
+        pairs, image_count = gather_pairs(SOURCE_ROOT)
 
-    if not all_images:
+    if not image_count:
         print("❌ Error: No images found! Check your directory structure or RAW_DATA_DIR.")
         return
 
-    print(f"Found {len(all_images)} total images.")
-
-    pairs = []
-    for img_path in all_images:
-        # Construct label path based on image path
-        # Replaces .../images/name.jpg with .../labels/name.txt
-        label_path = img_path.replace(f"{os.sep}images{os.sep}", f"{os.sep}labels{os.sep}").replace(".jpg", ".txt")
-        
-        if os.path.exists(label_path):
-            pairs.append((img_path, label_path))
-        else:
-            print(f"⚠️ Warning: Missing label for {os.path.basename(img_path)}")
+    print(f"Found {image_count} total images.")
            
     if not pairs:
         print("❌ Error: Found images but no matching .txt labels.")
         return
 
-    # 3. Split
-    random.shuffle(pairs)
-    split_idx = int(len(pairs) * TRAIN_RATIO)
-    train_set = pairs[:split_idx]
-    val_set = pairs[split_idx:]
-
-    # 4. Copy
-    for subset, name in [(train_set, "train"), (val_set, "val")]:
-        print(f"Processing {name} ({len(subset)} images)...")
-        for img, lbl in subset:
-            fname = os.path.basename(img)
-            
-            # Copy Image
-            shutil.copy(img, os.path.join(DEST_ROOT, name, 'images', fname))
-            
-            # Clean & Copy Label
-            clean_and_copy(lbl, os.path.join(DEST_ROOT, name, 'labels', fname.replace('.jpg', '.txt')))
+    # Output folders are flat, so two sources with the same file name can't both be used
+    seen_names = {}
+    for key in list(pairs):
+        fname = os.path.basename(pairs[key]["img"])
+        if fname in seen_names:
+            print(f"⚠️ Warning: Skipping {key}, same file name as {seen_names[fname]}")
+            del pairs[key]
+            continue
+        seen_names[fname] = key
+
+    # 2b. Optional near-duplicate removal
+    groups = dedup_stage(pairs, manifest, args) if args.dedup is not None else {}
+
+    # 3. Split (existing pairs keep their split, new ones are assigned by key hash).
+    # With dedup, a whole group (frames chained within the threshold) follows the split of its first previously-assigned member.
+    group_split = {}
+    for key in sorted(pairs):
+        group = groups.get(key, key)
+        if key in old_pairs and group not in group_split:
+            group_split[group] = old_pairs[key]["split"]
+
+    # 4. Diff against the manifest: only new or changed pairs are (re)materialized
+    jobs = []
+    job_keys = []
+    counts_per_split = {"train": 0, "val": 0}
+    for key, entry in pairs.items():
+        old = old_pairs.get(key)
+        group = groups.get(key, key)
+        entry["split"] = group_split.setdefault(group, split_for(group))
+        counts_per_split[entry["split"]] += 1
+        moved = bool(old) and old["split"] != entry["split"]
+        if moved:
+            remove_outputs(DEST_ROOT, old["split"], old["img"])
+        if same_files(old, entry) and not relink and not moved:
+            entry["hash"] = old.get("hash")
+            continue
+        dst_img, dst_lbl = output_paths(DEST_ROOT, entry["split"], entry["img"])
+        old_hash = old.get("hash") if old and not relink and not moved else None
+        jobs.append((entry["img"], entry["lbl"], dst_img, dst_lbl, args.link, args.imgsz, old_hash))
+        job_keys.append(key)
+
+    # Pairs that disappeared from the source are removed from the split
+    removed = [key for key in old_pairs if key not in pairs]
+    for key in removed:
+        old = old_pairs[key]
+        remove_outputs(DEST_ROOT, old["split"], old["img"])
+
+    unchanged = len(pairs) - len(jobs)
+    print(f"Split: {counts_per_split['train']} train / {counts_per_split['val']} val | "
+          f"{len(jobs)} new or changed, {unchanged} unchanged, {len(removed)} removed")
+
+    # 4b. Validate every source label once per split (clean_and_copy clamps/drops what it finds)
+    if not args.no_validate:
+        start = time.perf_counter()
+        split_labels = {"train": [], "val": []}
+        for entry in pairs.values():
+            split_labels[entry["split"]].append(entry["lbl"])
+        report = validate_splits(split_labels, workers=args.workers)
+        save_report(report, os.path.join(DEST_ROOT, REPORT_NAME))
+        print(f"🔍 Validated {len(pairs)} labels in {time.perf_counter() - start:.1f}s | "
+              f"{format_issues(report['all'])}. Stats: {os.path.join(DEST_ROOT, REPORT_NAME)}")
+        if report["all"]["issue_count"]:
+            print(f"⚠️ Warning: Out-of-range values are clamped in the split; see 'examples' in {REPORT_NAME}.")
+
+    start = time.perf_counter()
+    counts, hashes, dropped = run_jobs(jobs, workers=args.workers)
+    elapsed = time.perf_counter() - start
+    for key, digest in zip(job_keys, hashes):
+        pairs[key]["hash"] = digest
+    summary = ", ".join(f"{n} {mode}" for mode, n in counts.items()) or "nothing to do"
+    print(f"⏱  {len(jobs)} pairs in {elapsed:.1f}s ({len(jobs) / max(elapsed, 1e-9):.0f} pairs/s, {args.workers} workers) | images: {summary}")
+    if args.link != "copy" and not args.imgsz and counts.get("copy"):
+        print(f"⚠️ Warning: {counts['copy']} images fell back to a full copy ({args.link} not possible on this filesystem).")
+    if counts.get("unresized"):
+        print(f"⚠️ Warning: {counts['unresized']} images could not be decoded and were placed unresized.")
+    if dropped:
+        print(f"⚠️ Warning: Dropped {dropped} unusable label lines (wrong value count, not numbers, NaN/inf) "
+              f"from the split. The source labels are unchanged"
+              f"{'.' if args.no_validate else f'; {REPORT_NAME} lists where they are.'}")
+
+    # 5. Record what was materialized so the next run can be incremental
+    manifest["pairs"] = pairs
+    manifest["link"] = args.link
+    manifest["imgsz"] = args.imgsz
+    save_manifest(DEST_ROOT, manifest)
+
+    # 6. GENERATE YAML 
+    create_yaml(DEST_ROOT, args.imgsz)
 
-    # 5. GENERATE YAML 
-    create_yaml(DEST_ROOT)
+    # 7. Optional packed shards, built from the cleaned output
+    if args.shards:
+        from shards import pack_dataset
+        start = time.perf_counter()
+        counts, kept = pack_dataset(DEST_ROOT, args.shards, signatures=split_signatures(pairs, args.imgsz))
+        unchanged = f", {' and '.join(kept)} unchanged" if kept else ""
+        print(f"📦 Packed {counts['train']} train / {counts['val']} val images into {args.shards}{unchanged} "
+              f"in {time.perf_counter() - start:.1f}s (data yaml: {os.path.join(args.shards, 'data.yaml')})")
 
     print(f"✅ Ready for training! Data is in: {DEST_ROOT}")
 
@@ -0,0 +1,169 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import cv2
+
+# Near-duplicate detection for consecutive video frames.
+# dHash: 64-bit difference hash of a 9x8 grayscale thumbnail. Frames that differ by only
+# a few bits (Hamming distance) look the same to a person and to the model.
+
+HASH_CHUNK = 512
+
+
+def _dhash_chunk(paths):
+    """Hashes a chunk of images. Unreadable images get None."""
+    smalls = np.zeros((len(paths), 8, 9), dtype=np.uint8)
+    valid = np.zeros(len(paths), dtype=bool)
+    for i, path in enumerate(paths):
+        # 1/8 reduced decode: the hash only needs a 9x8 image
+        gray = cv2.imread(path, cv2.IMREAD_REDUCED_GRAYSCALE_8)
+        if gray is None:
+            continue
+        smalls[i] = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+        valid[i] = True
+
+    # Vectorized over the chunk: compare horizontal neighbours, pack 64 bits per image
+    bits = smalls[:, :, 1:] > smalls[:, :, :-1]
+    hashes = np.packbits(bits.reshape(len(paths), 64), axis=1).view(">u8").ravel()
+    return [int(h) if ok else None for h, ok in zip(hashes, valid)]
+
+
+def dhash_image(img):
+    """dHash of an already decoded BGR frame (e.g. straight from a video)."""
+    small = cv2.resize(img, (9, 8), interpolation=cv2.INTER_AREA)
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    bits = gray[:, 1:] > gray[:, :-1]
+    return int(np.packbits(bits.ravel()).view(">u8")[0])
+
+
+def compute_hashes(paths, workers=1):
+    """dHash for every path (None for unreadable images), using a process pool if workers > 1."""
+    chunks = [paths[i:i + HASH_CHUNK] for i in range(0, len(paths), HASH_CHUNK)]
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_dhash_chunk, chunks))
+    else:
+        results = [_dhash_chunk(chunk) for chunk in chunks]
+    return [h for chunk in results for h in chunk]
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over Hamming distance: a radius query only visits children whose
+    edge distance is within [d - r, d + r] (triangle inequality), so it avoids the
+    all-pairs comparison.
+    """
+
+    def __init__(self):
+        self.root = None   # [hash, item_index, {distance: child_node}]
+
+    def add(self, value, index):
+        if self.root is None:
+            self.root = [value, index, {}]
+            return
+        node = self.root
+        while True:
+            d = hamming(value, node[0])
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = [value, index, {}]
+                return
+            node = child
+
+    def query(self, value, radius):
+        """Indices of all items within radius of value."""
+        found = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            d = hamming(value, node[0])
+            if d <= radius:
+                found.append(node[1])
+            for edge, child in node[2].items():
+                if d - radius <= edge <= d + radius:
+                    stack.append(child)
+        return found
+
+
+def cluster(hashes, threshold):
+    """
+    Leader clustering: items are visited in order and join the nearest existing leader
+    within threshold bits, or become a leader themselves. Every member is within
+    threshold of its leader, so slow drifts (each frame 1 bit from the previous one)
+    don't chain into one huge cluster the way transitive grouping would.
+    Returns a list of cluster ids (the leader's index); None hashes stay alone.
+    """
+    ids = list(range(len(hashes)))
+    leaders = BKTree()
+    for i, h in enumerate(hashes):
+        if h is None:
+            continue
+        near = leaders.query(h, threshold)
+        if near:
+            ids[i] = min(near, key=lambda j: (hamming(h, hashes[j]), j))
+        else:
+            leaders.add(h, i)
+    return ids
+
+
+def components(hashes, threshold):
+    """
+    Transitive grouping: union-find over every pair within threshold bits, so two
+    near-duplicates always share a component even when their leaders differ. Components
+    can be long chains (a slow drift), which is fine for keeping look-alikes in one split
+    but not for picking representatives (see cluster).
+    Returns a list of component ids (the smallest index in the component); None hashes stay alone.
+    """
+    parent = list(range(len(hashes)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    tree = BKTree()
+    for i, h in enumerate(hashes):
+        if h is None:
+            continue
+        for j in tree.query(h, threshold):
+            a, b = find(i), find(j)
+            if a != b:
+                parent[max(a, b)] = min(a, b)
+        tree.add(h, i)
+    return [find(i) for i in range(len(hashes))]
+
+
+def video_of(key):
+    """First path component of a dataset key (RAW_DATA_DIR/<video>/...)."""
+    return key.replace("\\", "/").split("/", 1)[0]
+
+
+def dedup_pairs(keys, hashes, weights, threshold, per_video=False):
+    """
+    Picks representatives of near-duplicate clusters.
+    Args:
+        keys (list): Pair keys (relative paths), same order as hashes.
+        hashes (list): dHash per key (None = unreadable, never clustered).
+        weights (list): Preference per key; the highest weight in a cluster is kept
+                        (e.g. label file size, so the most complete annotation wins).
+        threshold (int): Max Hamming distance for two frames to be near-duplicates.
+        per_video (bool): Keep one representative per cluster per video instead of per cluster.
+    Returns:
+        (keep, groups): keep is the set of kept keys (one per leader cluster); groups maps
+        each key to its connected component's key, so any two frames within threshold are
+        forced into the same split.
+    """
+    ids = cluster(hashes, threshold)
+    groups = {key: keys[cid] for key, cid in zip(keys, components(hashes, threshold))}
+
+    best = {}
+    for i, key in enumerate(keys):
+        slot = (ids[i], video_of(key)) if per_video else ids[i]
+        if slot not in best or weights[i] > weights[best[slot]]:
+            best[slot] = i
+    keep = {keys[i] for i in best.values()}
+    return keep, groups
@@ -0,0 +1,184 @@
+from collections import OrderedDict
+
+import memory_budget
+
+# Undo/redo for annotation edits, kept per frame.
+#
+# Entries are small deltas, never copies of the whole annotation list:
+#   ("kpt", item, k, (x, y, v) before, (x, y, v) after)
+#   ("bbox", item, bbox before, bbox after)
+#   ("add", item, annotation)      - the added dict itself (for redo)
+#   ("delete", item, annotation)   - the removed dict itself (for undo)
+# A whole drag is recorded as one entry (start and end state), so undo/redo is O(1)
+# however many persons a frame has.
+#
+# Histories of every visited frame are kept (LRU), bounded by LIMIT_BYTES in total and
+# accounted as "history" in the memory budget (evicted last, the same way).
+# Returning to a frame keeps its history if the annotations loaded there match what the
+# history expects: the edited state (e.g. it was saved), or the state before the first
+# edit (unsaved edits were dropped - they can then be brought back with redo).
+
+LIMIT_BYTES = 8 * 1024 * 1024
+ENTRY_BYTES = 160         # Rough cost of a delta tuple and its coordinates
+ITEM_BYTES = 400          # Rough cost of an annotation dict, plus KEYPOINT_BYTES per keypoint
+KEYPOINT_BYTES = 120
+
+
+def fingerprint(annotations):
+    """Cheap identity of an annotation list's content."""
+    # Rounded, so a frame reloaded from its saved label file still matches
+    return hash(tuple(
+        (a.get('class_id'), tuple(round(v, 6) for v in a.get('bbox') or ()),
+         tuple((round(k[0], 6), round(k[1], 6), k[2]) for k in a['keypoints']) if a.get('keypoints') else None)
+        for a in annotations))
+
+
+def entry_size(entry):
+    if entry[0] in ("add", "delete"):
+        return ENTRY_BYTES + ITEM_BYTES + KEYPOINT_BYTES * len(entry[2].get('keypoints') or ())
+    return ENTRY_BYTES
+
+
+def apply_entry(annotations, entry, undo):
+    """Applies (or reverts) one delta in place. Returns the index of the item it touched."""
+    kind, i = entry[0], entry[1]
+    if kind == "kpt":
+        annotations[i]['keypoints'][entry[2]][:] = entry[3] if undo else entry[4]
+    elif kind == "bbox":
+        annotations[i]['bbox'] = list(entry[2] if undo else entry[3])
+    elif (kind == "add") == undo:
+        del annotations[i]
+    else:
+        annotations.insert(i, entry[2])
+    return i
+
+
+class FrameHistory:
+    __slots__ = ("undo", "redo", "base", "head", "size")
+
+    def __init__(self, base):
+        self.undo = []
+        self.redo = []
+        self.base = base    # Fingerprint before the oldest undo entry (None once trimmed)
+        self.head = base    # Fingerprint after the latest edit/undo/redo
+        self.size = 0
+
+
+class EditHistory:
+    def __init__(self, limit_bytes=LIMIT_BYTES, budget=None):
+        self.limit_bytes = limit_bytes
+        self.frames = OrderedDict()   # key -> FrameHistory, least recently used first
+        self.key = None
+        self.loaded = None            # Fingerprint of the current frame as loaded
+        self.size = 0
+        self.budget = budget or memory_budget.default
+        self.budget.register("history", memory_budget.PRIORITY_HISTORY, self._evict)
+
+    # --- FRAMES ---
+    def switch(self, key, annotations):
+        """Called after a frame's annotations are loaded (from disk, a model, or nothing)."""
+        self.key = key
+        self.loaded = fingerprint(annotations)
+        frame = self.frames.get(key)
+        if frame is None:
+            return
+        self.frames.move_to_end(key)
+        if self.loaded == frame.head:
+            return
+        if self.loaded == frame.base:
+            # Back at the state before the first edit: everything is undone, redo brings it back
+            frame.redo.extend(reversed(frame.undo))
+            frame.undo.clear()
+            frame.head = frame.base
+        else:
+            # Loaded something else (e.g. a different model's guess); the deltas don't apply
+            self._drop(key)
+            self.budget.set("history", self.size)
+
+    def modified(self, annotations):
+        """True if annotations no longer match the current frame as it was loaded (unsaved edits)."""
+        return self.key is not None and fingerprint(annotations) != self.loaded
+
+    def rename(self, old_video, new_video):
+        """Re-keys histories of a video that moved (keys are (video_path, ...) tuples)."""
+        def renamed(key):
+            if isinstance(key, tuple) and key and key[0] == old_video:
+                return (new_video,) + key[1:]
+            return key
+        self.frames = OrderedDict((renamed(k), f) for k, f in self.frames.items())
+        self.key = renamed(self.key)
+
+    def _drop(self, key):
+        frame = self.frames.pop(key)
+        self.size -= frame.size
+
+    # --- RECORDING ---
+    def record(self, annotations, entry):
+        """Adds the delta of an edit that was just applied to annotations (clears redo)."""
+        if self.key is None:
+            return
+        frame = self.frames.get(self.key)
+        if frame is None:
+            frame = self.frames[self.key] = FrameHistory(self.loaded)
+        self.frames.move_to_end(self.key)
+        for old in frame.redo:
+            frame.size -= entry_size(old)
+            self.size -= entry_size(old)
+        frame.redo.clear()
+        frame.undo.append(entry)
+        size = entry_size(entry)
+        frame.size += size
+        self.size += size
+        frame.head = fingerprint(annotations)
+        self._shrink(self.limit_bytes)
+        self.budget.set("history", self.size)
+
+    def _evict(self, nbytes):
+        before = self.size
+        self._shrink(before - nbytes)
+        return before - self.size
+
+    def _shrink(self, target):
+        # Least recently used frames go first, then the oldest entries of the current frame
+        for key in [k for k in self.frames if k != self.key]:
+            if self.size <= target:
+                break
+            self._drop(key)
+        frame = self.frames.get(self.key)
+        while frame and self.size > target and len(frame.undo) > 1:
+            old = frame.undo.pop(0)
+            frame.size -= entry_size(old)
+            self.size -= entry_size(old)
+            frame.base = None
+
+    # --- UNDO / REDO ---
+    def _step(self, annotations, source, target, undo):
+        frame = self.frames.get(self.key)
+        if not frame or not getattr(frame, source):
+            return None
+        entry = getattr(frame, source)[-1]
+        # "add" undo / "delete" redo remove an item, everything else needs it present
+        limit = len(annotations) + (entry[0] == "add" and not undo or entry[0] == "delete" and undo)
+        if not 0 <= entry[1] < limit:
+            # Annotations were replaced behind the history's back; its deltas no longer apply
+            self._drop(self.key)
+            self.budget.set("history", self.size)
+            return None
+        getattr(frame, source).pop()
+        getattr(frame, target).append(entry)
+        idx = apply_entry(annotations, entry, undo)
+        frame.head = fingerprint(annotations)
+        return idx
+
+    def undo(self, annotations):
+        """Reverts the last edit of the current frame. Returns the touched item index, or None."""
+        return self._step(annotations, "undo", "redo", True)
+
+    def redo(self, annotations):
+        """Re-applies the last undone edit. Returns the touched item index, or None."""
+        return self._step(annotations, "redo", "undo", False)
+
+    def counts(self):
+        """(undo, redo) entries available on the current frame."""
+        frame = self.frames.get(self.key)
+        return (len(frame.undo), len(frame.redo)) if frame else (0, 0)
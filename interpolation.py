@@ -0,0 +1,244 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import cv2
+
+from label_io import load_label_arrays, write_label_file
+from pose_metrics import box_iou, oks_matrix, match_pairs
+
+# Keyframe interpolation: given saved labels for frames i < j of one video, generate
+# labels (and images) for every frame in between.
+#
+# Persons/objects are matched between keyframes (Hungarian on IoU + OKS), then boxes and
+# keypoints are interpolated for all in-between frames at once with numpy:
+#   linear: straight line between the two keyframes
+#   spline: cubic Hermite (Catmull-Rom tangents from the neighbouring keyframes, when the
+#           same person is matched there too), which follows arcs of a throw better
+# Visibility: a joint unlabeled (v=0) at either end stays unlabeled; otherwise the flag
+# of the nearer keyframe is used.
+
+MIN_MATCH = 0.1           # Minimum combined IoU/OKS to treat two instances as the same person
+FLOW_WEIGHT = 0.5         # Blend between optical flow track and interpolation when refining
+FLOW_MAX_ERROR = 20.0     # LK tracking error above which the flow estimate is ignored
+WRITE_THREADS = 4
+
+
+def keyframe_indices(labels_dir, video_name):
+    """Sorted frame indices that have a saved label file for this video."""
+    pattern = re.compile(re.escape(video_name) + r"_(\d{6})\.txt$")
+    found = []
+    try:
+        with os.scandir(labels_dir) as entries:
+            for entry in entries:
+                m = pattern.match(entry.name)
+                if m:
+                    found.append(int(m.group(1)))
+    except OSError:
+        pass
+    return sorted(found)
+
+
+def load_keyframe(labels_dir, video_name, idx):
+    return load_label_arrays(os.path.join(labels_dir, f"{video_name}_{idx:06d}.txt"))
+
+
+def match_instances(frame_a, frame_b):
+    """
+    Matches instances between two keyframes (class_ids, boxes, kpts tuples).
+    Returns a list of (index_in_a, index_in_b).
+    """
+    classes_a, boxes_a, kpts_a = frame_a
+    classes_b, boxes_b, kpts_b = frame_b
+    similarity = box_iou(boxes_a, boxes_b)
+    if kpts_a[..., 2].any():
+        # Keypoints disambiguate overlapping grapplers much better than boxes alone
+        similarity = 0.5 * similarity + 0.5 * oks_matrix(kpts_a, boxes_a, kpts_b)
+    similarity = similarity * (classes_a[:, None] == classes_b[None, :])
+    return match_pairs(similarity, MIN_MATCH)
+
+
+def _tangent(prev_val, prev_t, next_val, next_t):
+    return (next_val - prev_val) / float(next_t - prev_t)
+
+
+def interpolate_segment(i, frame_i, j, frame_j, method="linear", prev_key=None, next_key=None):
+    """
+    Interpolates all frames strictly between keyframes i and j.
+    Args:
+        frame_i, frame_j: (classes, boxes, kpts) arrays of the two keyframes.
+        method (str): "linear" or "spline".
+        prev_key, next_key: Optional (index, frame) keyframes before i / after j for spline tangents.
+    Returns:
+        frames (list): Target frame indices.
+        classes (P,), boxes (T, P, 4), kpts (T, P, K, 3) for the P matched instances.
+        start_kpts (P, K, 3): Keypoints of the matched instances at keyframe i.
+        unmatched (int): Instances present in only one keyframe (not interpolated).
+    """
+    frames = list(range(i + 1, j))
+    matches = match_instances(frame_i, frame_j)
+    unmatched = len(frame_i[0]) + len(frame_j[0]) - 2 * len(matches)
+    ia = np.array([a for a, _ in matches], dtype=int)
+    ib = np.array([b for _, b in matches], dtype=int)
+
+    classes = frame_i[0][ia]
+    box_a, box_b = frame_i[1][ia], frame_j[1][ib]
+    kp_a, kp_b = frame_i[2][ia], frame_j[2][ib]
+
+    # t: (T, 1, 1) broadcast over instances and box coordinates, t4 adds the keypoint axis
+    t = ((np.array(frames, dtype=np.float32) - i) / (j - i))[:, None, None]
+    t4 = t[..., None]
+
+    if method == "spline":
+        span = float(j - i)
+        # Default tangents are the secant (Hermite then equals linear)
+        secant_box = (box_b - box_a) / span
+        secant_kp = (kp_b[..., :2] - kp_a[..., :2]) / span
+        m_box_a, m_box_b = secant_box.copy(), secant_box.copy()
+        m_kp_a, m_kp_b = secant_kp.copy(), secant_kp.copy()
+
+        if prev_key is not None:
+            h, frame_h = prev_key
+            for a, p in match_instances(frame_i, frame_h):
+                rows = np.flatnonzero(ia == a)
+                if len(rows):
+                    r = rows[0]
+                    m_box_a[r] = _tangent(frame_h[1][p], h, box_b[r], j)
+                    m_kp_a[r] = _tangent(frame_h[2][p, :, :2], h, kp_b[r, :, :2], j)
+        if next_key is not None:
+            k, frame_k = next_key
+            for b, q in match_instances(frame_j, frame_k):
+                rows = np.flatnonzero(ib == b)
+                if len(rows):
+                    r = rows[0]
+                    m_box_b[r] = _tangent(box_a[r], i, frame_k[1][q], k)
+                    m_kp_b[r] = _tangent(kp_a[r, :, :2], i, frame_k[2][q, :, :2], k)
+
+        t2, t3 = t * t, t * t * t
+        h00, h10, h01, h11 = 2*t3 - 3*t2 + 1, t3 - 2*t2 + t, -2*t3 + 3*t2, t3 - t2
+        boxes = h00 * box_a + h10 * span * m_box_a + h01 * box_b + h11 * span * m_box_b
+        xy = (h00[..., None] * kp_a[..., :2] + h10[..., None] * span * m_kp_a
+              + h01[..., None] * kp_b[..., :2] + h11[..., None] * span * m_kp_b)
+    else:
+        boxes = box_a + t * (box_b - box_a)
+        xy = kp_a[..., :2] + t4 * (kp_b[..., :2] - kp_a[..., :2])
+
+    vis_a, vis_b = kp_a[..., 2], kp_b[..., 2]
+    labeled = (vis_a > 0) & (vis_b > 0)
+    vis = np.where(t4[..., 0] < 0.5, vis_a, vis_b) * labeled
+    xy = xy * labeled[..., None]   # YOLO convention: unlabeled joints are 0, 0, 0
+    kpts = np.concatenate([np.clip(xy, 0.0, 1.0), vis[..., None]], axis=-1)
+    boxes = np.clip(boxes, 0.0, 1.0)
+    return frames, classes, boxes.astype(np.float32), kpts.astype(np.float32), kp_a, unmatched
+
+
+def refine_with_flow(prev_gray, gray, prev_kpts, kpts, size):
+    """
+    Nudges interpolated keypoints towards where pyramidal Lucas-Kanade tracks the
+    previous frame's keypoints. Only labeled joints with a good track are changed.
+    """
+    w, h = size
+    labeled = kpts[..., 2] > 0
+    if not labeled.any():
+        return kpts
+    src = (prev_kpts[..., :2] * (w, h)).reshape(-1, 1, 2).astype(np.float32)
+    dst, status, err = cv2.calcOpticalFlowPyrLK(prev_gray, gray, src, None, winSize=(21, 21), maxLevel=3)
+    good = (status.reshape(-1) == 1) & (err.reshape(-1) < FLOW_MAX_ERROR) & labeled.reshape(-1)
+    flow_xy = dst.reshape(kpts.shape[:-1] + (2,)) / (w, h)
+    refined = kpts.copy()
+    good = good.reshape(labeled.shape)
+    refined[..., :2][good] = (FLOW_WEIGHT * flow_xy[good] + (1 - FLOW_WEIGHT) * kpts[..., :2][good])
+    refined[..., :2] = np.clip(refined[..., :2], 0.0, 1.0)
+    return refined
+
+
+def interpolate_range(video_path, video_name, labels_dir, images_dir, start, end,
+                      method="linear", use_flow=False, progress=None):
+    """
+    Fills every gap between saved keyframes inside [start, end] and writes the results
+    like save_pair does (<video>_<idx>.txt + .jpg). Frames that already have labels are
+    never overwritten. Returns ([(label_path, image_path) written], unmatched_instances).
+    """
+    keys = [k for k in keyframe_indices(labels_dir, video_name) if start <= k <= end]
+    if len(keys) < 2:
+        return [], 0
+    all_keys = keyframe_indices(labels_dir, video_name)
+    loaded = {k: load_keyframe(labels_dir, video_name, k) for k in keys}
+
+    def neighbour(k, step):
+        pos = all_keys.index(k) + step
+        if 0 <= pos < len(all_keys):
+            idx = all_keys[pos]
+            if idx not in loaded:
+                loaded[idx] = load_keyframe(labels_dir, video_name, idx)
+            return idx, loaded[idx]
+        return None
+
+    # 1. Interpolate all gaps (pure numpy, fast)
+    generated = {}   # frame -> (classes, boxes, kpts)
+    starts = {}      # keyframe -> matched keypoints, where optical flow tracking restarts
+    unmatched = 0
+    for i, j in zip(keys, keys[1:]):
+        if j - i < 2:
+            continue
+        frames, classes, boxes, kpts, start_kpts, lost = interpolate_segment(
+            i, loaded[i], j, loaded[j], method,
+            prev_key=neighbour(i, -1) if method == "spline" else None,
+            next_key=neighbour(j, +1) if method == "spline" else None)
+        unmatched += lost
+        if not len(classes):
+            continue
+        starts[i] = start_kpts
+        for n, f in enumerate(frames):
+            generated[f] = (classes, boxes[n], kpts[n])
+    if not generated:
+        return [], unmatched
+
+    # 2. Decode sequentially once (no per-frame seeking) and write through a thread pool
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError("Could not open video file")
+    first, last = min(generated) - 1, max(generated)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, first)
+    is_pose = any(kpts[..., 2].any() for _, _, kpts in generated.values())
+    prev_gray, prev_kpts = None, None
+    written = []
+    queued = 0
+
+    def write(f, bgr, classes, boxes, kpts):
+        base = f"{video_name}_{f:06d}"
+        img_path, txt_path = os.path.join(images_dir, base + ".jpg"), os.path.join(labels_dir, base + ".txt")
+        cv2.imwrite(img_path, bgr)
+        write_label_file(txt_path, [
+            {'class_id': int(c), 'bbox': b.tolist(),
+             'keypoints': [[float(x), float(y), int(v)] for x, y, v in k] if is_pose else None}
+            for c, b, k in zip(classes, boxes, kpts)])
+        return txt_path, img_path
+
+    with ThreadPoolExecutor(max_workers=WRITE_THREADS) as pool:
+        futures = []
+        for f in range(first, last + 1):
+            # Bound the frames waiting to be encoded so RAM stays flat on long ranges
+            while len(futures) >= 2 * WRITE_THREADS:
+                written.append(futures.pop(0).result())
+            ok, bgr = cap.read()
+            if not ok:
+                break
+            gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY) if use_flow else None
+            if f in generated:
+                classes, boxes, kpts = generated[f]
+                if use_flow and is_pose and prev_gray is not None and prev_kpts is not None \
+                        and prev_kpts.shape == kpts.shape:
+                    kpts = refine_with_flow(prev_gray, gray, prev_kpts, kpts, (bgr.shape[1], bgr.shape[0]))
+                futures.append(pool.submit(write, f, bgr, classes, boxes, kpts))
+                prev_kpts = kpts
+                queued += 1
+                if progress and queued % 25 == 0:
+                    progress(queued, len(generated))
+            else:
+                # Keyframe: restart the flow track from the human labels
+                prev_kpts = starts.get(f)
+            prev_gray = gray
+        written.extend(future.result() for future in futures)
+    cap.release()
+    return written, unmatched
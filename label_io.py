@@ -0,0 +1,110 @@
+import numpy as np
+
+# Shared YOLO label parsing/serialization.
+# Line format:  class cx cy w h [x y v  x y v ...]   (all coordinates normalized 0-1)
+
+NUM_KEYPOINTS = 17
+
+
+def parse_label_line(line):
+    """
+    Parses one YOLO label line.
+    Returns (class_id, bbox, keypoints) where keypoints is a list of [x, y, v] or None
+    for detect-format lines. Returns None for blank lines.
+    """
+    parts = list(map(float, line.strip().split()))
+    if not parts:
+        return None
+    class_id = int(parts[0])
+    bbox = parts[1:5]
+    if len(parts) > 5:
+        raw_kpts = parts[5:]
+        kpts = [[raw_kpts[i], raw_kpts[i+1], int(raw_kpts[i+2])] for i in range(0, len(raw_kpts), 3)]
+    else:
+        kpts = None
+    return class_id, bbox, kpts
+
+
+def read_label_file(path):
+    """Reads a label file into a list of (class_id, bbox, keypoints) rows."""
+    with open(path, "r") as f:
+        rows = [parse_label_line(line) for line in f]
+    return [row for row in rows if row is not None]
+
+
+def format_label_line(class_id, bbox, kpts=None):
+    line = [class_id]
+    line.extend(bbox)
+    if kpts:
+        for k in kpts:
+            line.extend(k)
+    return " ".join(map(str, line))
+
+
+def write_label_file(path, annotations):
+    """
+    Writes annotator items ({'class_id', 'bbox', 'keypoints'}) to a YOLO label file.
+    """
+    with open(path, "w") as f:
+        for item in annotations:
+            f.write(format_label_line(item['class_id'], item['bbox'], item.get('keypoints')) + "\n")
+
+
+def load_label_arrays(path, num_kpts=NUM_KEYPOINTS):
+    """
+    Loads a label file as numpy arrays for vectorized metrics.
+    Returns:
+        classes (N,) int, boxes (N, 4) float32 xywh-normalized,
+        kpts (N, num_kpts, 3) float32 (all zeros for detect-format rows).
+    """
+    rows = read_label_file(path)
+    n = len(rows)
+    classes = np.zeros(n, dtype=np.int32)
+    boxes = np.zeros((n, 4), dtype=np.float32)
+    kpts = np.zeros((n, num_kpts, 3), dtype=np.float32)
+    for i, (class_id, bbox, row_kpts) in enumerate(rows):
+        classes[i] = class_id
+        boxes[i] = bbox
+        if row_kpts:
+            k = np.asarray(row_kpts[:num_kpts], dtype=np.float32)
+            kpts[i, :len(k)] = k
+    return classes, boxes, kpts
+
+
+def result_annotations(result, mode):
+    """
+    Converts one ultralytics result into annotator items.
+    Args:
+        result: ultralytics Results for one image.
+        mode (str): "pose" (persons with keypoints) or "detect" (labelled boxes).
+    """
+    items = []
+    if mode == "pose" and result.keypoints is not None:
+        keypoints_data = result.keypoints.xyn.cpu().numpy()
+        boxes = result.boxes.xywhn.cpu().numpy()
+        for i, kpts in enumerate(keypoints_data):
+            # Undetected joints come back as (0, 0)
+            formatted_kpts = [[float(x), float(y), 0 if (x == 0 and y == 0) else 2] for x, y in kpts]
+            bbox = boxes[i].tolist() if i < len(boxes) else [0, 0, 0, 0]
+            items.append({'type': 'person', 'class_id': 0, 'bbox': bbox, 'keypoints': formatted_kpts})
+    elif mode == "detect" and result.boxes is not None:
+        boxes = result.boxes.xywhn.cpu().numpy()
+        classes = result.boxes.cls.cpu().numpy()
+        for box, cls in zip(boxes, classes):
+            cls = int(cls)
+            items.append({'type': 'object', 'label': result.names[cls], 'class_id': cls,
+                          'bbox': box.tolist(), 'keypoints': None})
+    return items
+
+
+def result_pose_arrays(result, num_kpts=NUM_KEYPOINTS):
+    """
+    One ultralytics pose result as arrays: boxes (N, 4) xywh-normalized and keypoints
+    (N, num_kpts, 3) with the keypoint confidence as the third column.
+    """
+    if result.keypoints is None or result.boxes is None or len(result.boxes) == 0:
+        return np.zeros((0, 4), dtype=np.float32), np.zeros((0, num_kpts, 3), dtype=np.float32)
+    xy = result.keypoints.xyn.cpu().numpy()
+    conf = result.keypoints.conf
+    conf = conf.cpu().numpy() if conf is not None else np.ones(xy.shape[:2], dtype=np.float32)
+    return result.boxes.xywhn.cpu().numpy(), np.concatenate([xy, conf[..., None]], axis=-1)
@@ -0,0 +1,347 @@
+import os
+import sys
+import json
+import time
+import argparse
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from dotenv import load_dotenv
+
+from label_io import NUM_KEYPOINTS
+
+# Streaming label validation + dataset statistics.
+#
+#   python label_validation.py datasets/judo_pose            -> label_stats.json in that folder
+#   python label_validation.py RAW_DATA_DIR --strict         -> exit code 1 if anything is wrong
+#
+# Every label file is read once, in chunks spread over worker processes. Lines are
+# checked as whole arrays per chunk (one numpy parse per line shape), so the checks
+# cost about as much as reading the files. Problems found per line:
+#   malformed          not (finite) numbers, or fewer than 5 values / not 5 + 3k values
+#   wrong_kpt_count    pose line whose keypoint count isn't kpt_shape[0]
+#   bad_class          negative or non-integer class id
+#   out_of_range       box centre/size or edges outside 0-1
+#   zero_area          box width or height <= 0
+#   bad_visibility     visibility flag other than 0, 1, 2
+#   kpt_out_of_range   labeled keypoint outside 0-1
+#   kpt_outside_box    labeled keypoint further than BOX_MARGIN outside its person box
+# Statistics: per-keypoint visibility rates, box size distribution (sqrt of the normalized
+# area) per class kind, persons per frame (pose frames only: files under a detect/ folder,
+# or detect-only files where the folder doesn't say, are left out) and class counts. datasplitter.py runs this on
+# every split and writes the result to <DEST_ROOT>/label_stats.json.
+
+load_dotenv()
+
+# --- CONFIG ---
+CHUNK_FILES = 512         # Label files per worker task
+BOX_MARGIN = 0.1          # Keypoints may lie this fraction of the box size outside it
+EPS = 1e-6                # Float slack for the 0-1 range checks
+SIZE_BINS = 100           # Box size histogram bins over 0-1
+MAX_PERSONS = 32          # Persons-per-frame histogram; frames with more land in the last bin
+MAX_EXAMPLES = 20         # Example "path:line" locations kept per issue
+REPORT_NAME = "label_stats.json"
+
+ISSUES = ("unreadable", "malformed", "wrong_kpt_count", "bad_class", "out_of_range", "zero_area",
+          "bad_visibility", "kpt_out_of_range", "kpt_outside_box")
+VISIBILITY = ("unlabeled", "occluded", "visible")
+
+
+def folder_mode(path):
+    """"pose" / "detect" from a RAW_DATA_DIR/<video>/<mode>/labels path, else None (e.g. a split folder)."""
+    parts = os.path.normpath(path).split(os.sep)
+    mode = parts[-3] if len(parts) >= 3 else None
+    return mode if mode in ("pose", "detect") else None
+
+
+def shape_issue(count, num_kpts=NUM_KEYPOINTS):
+    """Issue name for a line with `count` values, or None if its shape is valid (detect or pose)."""
+    if count < 5 or (count - 5) % 3:
+        return "malformed"
+    if count != 5 and count != 5 + 3 * num_kpts:
+        return "wrong_kpt_count"
+    return None
+
+
+# --- PARTIAL STATS (one per chunk, merged in the parent) ---
+def new_stats(num_kpts=NUM_KEYPOINTS):
+    return {
+        "files": 0, "lines": 0, "persons": 0, "objects": 0,
+        "issues": dict.fromkeys(ISSUES, 0),
+        "examples": {name: [] for name in ISSUES},
+        "classes": {},
+        "visibility": np.zeros((num_kpts, 3), dtype=np.int64),
+        "box_size": {"person": np.zeros(SIZE_BINS, dtype=np.int64), "object": np.zeros(SIZE_BINS, dtype=np.int64)},
+        "persons_per_frame": np.zeros(MAX_PERSONS + 1, dtype=np.int64),
+    }
+
+
+def merge_stats(total, part):
+    for key in ("files", "lines", "persons", "objects"):
+        total[key] += part[key]
+    for name in ISSUES:
+        total["issues"][name] += part["issues"][name]
+        room = MAX_EXAMPLES - len(total["examples"][name])
+        total["examples"][name].extend(part["examples"][name][:max(0, room)])
+    for cls, n in part["classes"].items():
+        total["classes"][cls] = total["classes"].get(cls, 0) + n
+    total["visibility"] += part["visibility"]
+    for kind in total["box_size"]:
+        total["box_size"][kind] += part["box_size"][kind]
+    total["persons_per_frame"] += part["persons_per_frame"]
+    return total
+
+
+def _note(stats, issue, refs, rows):
+    """Counts issue for the flagged rows and keeps a few example locations."""
+    rows = np.flatnonzero(rows)
+    stats["issues"][issue] += len(rows)
+    room = MAX_EXAMPLES - len(stats["examples"][issue])
+    for r in rows[:max(0, room)]:
+        path, line_no = refs[r]
+        stats["examples"][issue].append(f"{path}:{line_no}")
+
+
+def _parse_block(lines, width):
+    """
+    (values (n, width), parsed (n,) bool). One C-level parse for the whole block; if a
+    token isn't a number, the block is halved until the bad lines are isolated.
+    """
+    try:
+        with warnings.catch_warnings():
+            # A token that isn't a number ends the parse (older numpy warns, newer raises)
+            warnings.simplefilter("ignore")
+            flat = np.fromstring(" ".join(lines), dtype=np.float64, sep=" ")
+    except ValueError:
+        flat = None
+    if flat is not None and flat.size == len(lines) * width:
+        values = flat.reshape(len(lines), width)
+        return values, np.isfinite(values).all(1)
+    if len(lines) == 1:
+        return np.zeros((1, width), dtype=np.float64), np.zeros(1, dtype=bool)
+    mid = len(lines) // 2
+    head, tail = _parse_block(lines[:mid], width), _parse_block(lines[mid:], width)
+    return np.concatenate((head[0], tail[0])), np.concatenate((head[1], tail[1]))
+
+
+def _check_boxes(stats, values, refs, kind):
+    cls, cx, cy, w, h = values[:, 0], values[:, 1], values[:, 2], values[:, 3], values[:, 4]
+    _note(stats, "bad_class", refs, (cls < 0) | (cls != np.round(cls)))
+    outside = ((values[:, 1:5] < -EPS) | (values[:, 1:5] > 1 + EPS)).any(1)
+    outside |= (cx - w / 2 < -EPS) | (cx + w / 2 > 1 + EPS) | (cy - h / 2 < -EPS) | (cy + h / 2 > 1 + EPS)
+    _note(stats, "out_of_range", refs, outside)
+    _note(stats, "zero_area", refs, (w <= 0) | (h <= 0))
+
+    ids, counts = np.unique(cls.astype(np.int64), return_counts=True)
+    for cls_id, n in zip(ids.tolist(), counts.tolist()):
+        stats["classes"][str(cls_id)] = stats["classes"].get(str(cls_id), 0) + n
+    size = np.sqrt(np.clip(w * h, 0.0, 1.0))
+    bins = np.minimum((size * SIZE_BINS).astype(np.int64), SIZE_BINS - 1)
+    stats["box_size"][kind] += np.bincount(bins, minlength=SIZE_BINS)
+
+
+def _check_keypoints(stats, values, refs, num_kpts):
+    cx, cy, w, h = values[:, 1:2], values[:, 2:3], values[:, 3:4], values[:, 4:5]
+    kpts = values[:, 5:].reshape(len(values), num_kpts, 3)
+    x, y, v = kpts[..., 0], kpts[..., 1], kpts[..., 2]
+    _note(stats, "bad_visibility", refs, ~np.isin(v, (0, 1, 2)).all(1))
+    labeled = v > 0
+    out = (x < -EPS) | (x > 1 + EPS) | (y < -EPS) | (y > 1 + EPS)
+    _note(stats, "kpt_out_of_range", refs, (labeled & out).any(1))
+    away = (np.abs(x - cx) > w * (0.5 + BOX_MARGIN) + EPS) | (np.abs(y - cy) > h * (0.5 + BOX_MARGIN) + EPS)
+    _note(stats, "kpt_outside_box", refs, (labeled & away).any(1))
+    for flag in range(3):
+        stats["visibility"][:, flag] += (v == flag).sum(0)
+
+
+def validate_chunk(job):
+    """
+    Worker task: validates one chunk of label files.
+    job = (paths, num_kpts). Returns partial stats (see new_stats).
+    """
+    paths, num_kpts = job
+    stats = new_stats(num_kpts)
+    width = 5 + 3 * num_kpts
+    blocks = {5: ([], [], []), width: ([], [], [])}   # values per line -> (lines, (path, line_no), file index)
+    files = 0
+    modes = []
+    for path in paths:
+        try:
+            with open(path, "r") as f:
+                text = f.read()
+        except (OSError, UnicodeDecodeError):
+            stats["issues"]["unreadable"] += 1
+            if len(stats["examples"]["unreadable"]) < MAX_EXAMPLES:
+                stats["examples"]["unreadable"].append(path)
+            continue
+        for line_no, line in enumerate(text.splitlines(), 1):
+            count = len(line.split())
+            if not count:
+                continue
+            stats["lines"] += 1
+            issue = shape_issue(count, num_kpts)
+            if issue:
+                _note(stats, issue, [(path, line_no)], np.ones(1, bool))
+                continue
+            lines, refs, owners = blocks[count]
+            lines.append(line)
+            refs.append((path, line_no))
+            owners.append(files)
+        files += 1
+        modes.append(folder_mode(path))
+    stats["files"] = files
+
+    persons = np.zeros(files, dtype=np.int64)
+    objects = np.zeros(files, dtype=np.int64)
+    for count, (lines, refs, owners) in blocks.items():
+        if not lines:
+            continue
+        values, parsed = _parse_block(lines, count)
+        _note(stats, "malformed", refs, ~parsed)
+        values = values[parsed]
+        refs = [ref for ref, ok in zip(refs, parsed) if ok]
+        if count == 5:
+            stats["objects"] += len(values)
+            _check_boxes(stats, values, refs, "object")
+            objects += np.bincount(np.asarray(owners)[parsed], minlength=files)
+        else:
+            stats["persons"] += len(values)
+            _check_boxes(stats, values, refs, "person")
+            _check_keypoints(stats, values, refs, num_kpts)
+            persons += np.bincount(np.asarray(owners)[parsed], minlength=files)
+    # Persons per frame only over pose frames: detect frames have no persons by design
+    pose = np.array([m == "pose" if m else bool(p or not o) for m, p, o in zip(modes, persons, objects)], dtype=bool)
+    stats["persons_per_frame"] += np.bincount(np.minimum(persons[pose], MAX_PERSONS), minlength=MAX_PERSONS + 1)
+    return stats
+
+
+def validate_files(paths, workers=None, num_kpts=NUM_KEYPOINTS):
+    """
+    Streams label files through the checks (chunks in a process pool, merged as they
+    finish, so memory stays flat however many files there are). Returns merged stats.
+    """
+    jobs = [(paths[i:i + CHUNK_FILES], num_kpts) for i in range(0, len(paths), CHUNK_FILES)]
+    total = new_stats(num_kpts)
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for part in pool.map(validate_chunk, jobs):
+                merge_stats(total, part)
+    else:
+        for part in map(validate_chunk, jobs):
+            merge_stats(total, part)
+    return total
+
+
+# --- REPORT ---
+def _size_summary(hist):
+    n = int(hist.sum())
+    out = {"count": n}
+    if n:
+        cumulative = np.cumsum(hist)
+        for q in (5, 50, 95):
+            out[f"p{q}"] = round((int(np.searchsorted(cumulative, n * q / 100)) + 0.5) / SIZE_BINS, 3)
+    out["histogram"] = hist.tolist()
+    return out
+
+
+def summarize(stats):
+    """JSON-ready summary of merged stats."""
+    try:
+        from annotator import KEYPOINT_NAMES
+    except ImportError:
+        KEYPOINT_NAMES = []
+    vis = stats["visibility"]
+    names = KEYPOINT_NAMES if len(KEYPOINT_NAMES) == len(vis) else [str(k) for k in range(len(vis))]
+    per_frame = stats["persons_per_frame"]
+    frames = int(per_frame.sum())
+    return {
+        "files": stats["files"],
+        "lines": stats["lines"],
+        "persons": stats["persons"],
+        "objects": stats["objects"],
+        "issues": stats["issues"],
+        "issue_count": sum(n for name, n in stats["issues"].items() if name != "unreadable"),
+        "examples": {name: ex for name, ex in stats["examples"].items() if ex},
+        "classes": dict(sorted(stats["classes"].items(), key=lambda kv: int(kv[0]))),
+        "keypoint_visibility": {
+            name: {flag: round(float(row[i]) / max(int(row.sum()), 1), 4) for i, flag in enumerate(VISIBILITY)}
+            for name, row in zip(names, vis)
+        },
+        "box_size": {"bins": SIZE_BINS, **{kind: _size_summary(h) for kind, h in stats["box_size"].items()}},
+        "persons_per_frame": {
+            "mean": round(float(np.dot(np.arange(len(per_frame)), per_frame)) / max(frames, 1), 3),
+            "frames_without_persons": int(per_frame[0]),
+            "histogram": per_frame.tolist(),
+        },
+    }
+
+
+def validate_splits(split_paths, workers=None, num_kpts=NUM_KEYPOINTS):
+    """{split: [label paths]} -> {split: summary, ..., "all": summary}."""
+    total = new_stats(num_kpts)
+    report = {}
+    for split, paths in split_paths.items():
+        stats = validate_files(paths, workers, num_kpts)
+        report[split] = summarize(stats)
+        merge_stats(total, stats)
+    if len(split_paths) > 1:
+        report["all"] = summarize(total)
+    return report
+
+
+def save_report(report, path):
+    with open(path + ".tmp", "w") as f:
+        json.dump(report, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def format_issues(summary):
+    """One line: issue counts (or 'no issues')."""
+    found = ", ".join(f"{n} {name}" for name, n in summary["issues"].items() if n)
+    return found or "no issues"
+
+
+def find_label_files(folder):
+    """Every .txt inside a 'labels' folder below folder."""
+    paths = []
+    for root, dirs, files in os.walk(folder):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        if os.path.basename(root) == "labels":
+            paths.extend(os.path.join(root, f) for f in files if f.endswith(".txt"))
+    return sorted(paths)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate YOLO label files and collect dataset statistics.")
+    parser.add_argument("folder", nargs="?", default=os.getenv("RAW_DATA_DIR", "judo_datasetDONTDELETE"),
+                        help="Dataset folder; every */labels/*.txt below it is checked")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--kpts", type=int, default=NUM_KEYPOINTS, help="Keypoints per person (kpt_shape[0])")
+    parser.add_argument("--out", default=None, help=f"Report path (default: <folder>/{REPORT_NAME})")
+    parser.add_argument("--strict", action="store_true", help="Exit with code 1 if any issue is found")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.folder):
+        print(f"❌ Error: Folder not found: {args.folder}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    paths = find_label_files(args.folder)
+    summary = summarize(validate_files(paths, args.workers, args.kpts))
+    out = args.out or os.path.join(args.folder, REPORT_NAME)
+    save_report(summary, out)
+
+    elapsed = time.perf_counter() - start
+    icon = "✅" if not summary["issue_count"] and not summary["issues"]["unreadable"] else "⚠️"
+    print(f"{icon} {summary['files']} files, {summary['persons']} persons, {summary['objects']} objects "
+          f"in {elapsed:.1f}s ({summary['files'] / max(elapsed, 1e-9):.0f} files/s) | {format_issues(summary)}")
+    for name, examples in summary["examples"].items():
+        print(f"   {name}: {', '.join(examples[:3])}")
+    print(f"   -> {out}")
+    if args.strict and (summary["issue_count"] or summary["issues"]["unreadable"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
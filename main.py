@@ -1,21 +1,42 @@
+import startup_timing
 import sys
 import os
-import shutil
+from collections import deque
+import time
+import threading
+import copy
 import cv2
-import torch 
-import glob
 import numpy as np
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QPushButton, QSlider, QLabel, QFileDialog, 
                              QCheckBox, QMessageBox, QScrollArea, QFrame, QGroupBox,
-                             QRadioButton, QButtonGroup, QInputDialog)
+                             QRadioButton, QButtonGroup, QInputDialog, QSpinBox, QComboBox,
+                             QProgressBar)
 from PyQt6.QtCore import Qt, QTimer
-from ultralytics import YOLO
 from dotenv import load_dotenv
 load_dotenv()
 
 from video_engine import VideoEngine
 from annotator import AnnotationWidget, KEYPOINT_NAMES
+from dataset_scan import iter_review_pairs, load_label_mtimes
+from label_io import read_label_file, write_label_file, result_annotations, result_pose_arrays
+from thumbnail_grid import ThumbnailGrid
+from batch_label import find_videos
+import review_scoring
+import interpolation
+import model_pool
+import perf_stats
+import video_import
+import sync_cache
+import sqlite3
+import metadata_index
+import active_learning
+import pose_compare
+import memory_budget
+startup_timing.mark("imports")
+
+PLAYBACK_SPEEDS = [0.25, 0.5, 1.0, 1.5, 2.0, 4.0]
+RANK_CHUNK = 64 # Pairs per scoring task when ranking the review queue (progress granularity)
 
 class JudoAppQt(QMainWindow):
     def __init__(self):
@@ -34,6 +55,16 @@ class JudoAppQt(QMainWindow):
         # --- REVIEW MODE STATE ---
         self.review_pairs = [] # List of tuples: (image_path, label_path)
         self.review_index = 0
+        self.review_scan = None # Active streaming folder scan (generator), if any
+        self.index_rescan = None # (thread, result) of a background metadata index rebuild
+        self.review_folder = ""
+        self.review_mtimes = {} # {stem: label mtime_ns} from the folder scan (see dataset_scan.py)
+        self.review_rank = None # (thread, result) of a background worst-first scoring run
+        self.grid = None # Thumbnail grid window, created on first use
+
+        # --- ACTIVE LEARNING STATE ---
+        self.to_label_index = 0 # Position in the to-label list (see active_learning.py)
+        self.to_label_created = None # "created" stamp of the list to_label_index refers to
 
         # --- PROJECT DIRECTORY SETUP ---
         env_path = os.getenv("RAW_DATA_DIR", "judo_datasetDONTDELETE")
@@ -45,20 +76,49 @@ class JudoAppQt(QMainWindow):
         
         os.makedirs(self.videos_storage_dir, exist_ok=True)
 
+        # Optional local write-back cache for a slow synced RAW_DATA_DIR (RAW_CACHE_DIR)
+        self.sync = sync_cache.from_env(self.project_root)
+        self.labels_sync = None # Labels mirror whose first pull is still running
+
+        # SQLite index of videos/labels, kept current on save/delete (see metadata_index.py)
+        try:
+            self.index = metadata_index.connect(self.project_root)
+        except sqlite3.Error as e:
+            print(f"⚠️ Warning: Metadata index unavailable: {e}")
+            self.index = None
+
         self.current_video_name = ""
         self.current_video_path = ""
         
         # These update dynamically based on mode
         self.active_images_dir = ""
         self.active_labels_dir = ""
+        self.active_predictions_dir = ""
 
         self.engine = VideoEngine()
         self.model = None 
+        self.model_path = "" # Weights file of the loaded model (used to key score caches)
+        self.compare_model = None # Base model drawn as a ghost layer next to the main model
+        self.compare_model_path = ""
+        # Loaded models count against the memory budget but are never evicted
+        memory_budget.default.register("model.main")
+        memory_budget.default.register("model.compare")
+        # Auto-guesses per (model, video, mode, frame), so revisiting a frame skips the model
+        self.predictions = memory_budget.BudgetedLRU("predictions", memory_budget.PRIORITY_PREDICTIONS,
+                                                     memory_budget.annotations_bytes)
         self.current_frame_img = None 
         self.is_playing = False
-        
+
+        # Playback is paced by wall clock: each tick shows the frame that is due now
+        # (dropping any we fell behind on) and schedules itself for the next one
+        self.playback_speed = 1.0
+        self.play_clock_start = 0.0
+        self.play_clock_frame = 0
+        self.play_dropped = 0
+        self.play_shown = deque(maxlen=512) # Display timestamps, for the actual fps readout
         self.timer = QTimer()
-        self.timer.setInterval(30)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
         self.timer.timeout.connect(self.next_frame_automatic)
 
         # --- MAIN LAYOUT ---
@@ -97,6 +157,20 @@ class JudoAppQt(QMainWindow):
         self.annotator = AnnotationWidget()
         left_layout.addWidget(self.annotator, stretch=1)
 
+        # Per-stage latency + memory budget overlay (P key), drawn on top of the annotator
+        self.perf_overlay = QLabel(self.annotator)
+        self.perf_overlay.setStyleSheet("background-color: rgba(0, 0, 0, 170); color: #8f8; "
+                                        "font-family: monospace; font-size: 11px; padding: 4px;")
+        self.perf_overlay.move(8, 8)
+        self.perf_overlay.hide()
+        self.perf_timer = QTimer()
+        self.perf_timer.setInterval(500)
+        self.perf_timer.timeout.connect(self.update_perf_overlay)
+        if os.getenv("PERF_STATS_OUT"):
+            perf_stats.enable(True)
+            perf_stats.dump_at_exit()
+        self.perf_always_on = perf_stats.enabled()
+
         # Controls
         play_layout = QHBoxLayout()
         self.btn_prev = QPushButton("< Prev")
@@ -105,10 +179,32 @@ class JudoAppQt(QMainWindow):
         self.btn_play.clicked.connect(self.toggle_play)
         self.btn_next = QPushButton("Next >")
         self.btn_next.clicked.connect(self.next_frame)
+        self.combo_speed = QComboBox()
+        for speed in PLAYBACK_SPEEDS:
+            self.combo_speed.addItem(f"{speed:g}×", speed)
+        self.combo_speed.setCurrentIndex(PLAYBACK_SPEEDS.index(1.0))
+        self.combo_speed.setToolTip("Playback speed (relative to the video's own frame rate)")
+        self.combo_speed.currentIndexChanged.connect(self.on_speed_change)
+
+        # Motion-index navigation (skips idle segments: bowing, matte, resets)
+        self.btn_next_action = QPushButton("⏭ Next Action")
+        self.btn_next_action.setToolTip("Jump to the next high-motion frame or scene cut")
+        self.btn_next_action.clicked.connect(self.jump_next_action)
+        self.btn_next_distinct = QPushButton("⏩ Next Distinct")
+        self.btn_next_distinct.setToolTip("Jump ahead by N visibly different frames, skipping near-identical ones")
+        self.btn_next_distinct.clicked.connect(self.jump_next_distinct)
+        self.spin_distinct = QSpinBox()
+        self.spin_distinct.setRange(1, 100)
+        self.spin_distinct.setPrefix("N=")
+
         play_layout.addStretch()
         play_layout.addWidget(self.btn_prev)
         play_layout.addWidget(self.btn_play)
         play_layout.addWidget(self.btn_next)
+        play_layout.addWidget(self.combo_speed)
+        play_layout.addWidget(self.btn_next_action)
+        play_layout.addWidget(self.btn_next_distinct)
+        play_layout.addWidget(self.spin_distinct)
         play_layout.addStretch()
         left_layout.addLayout(play_layout)
 
@@ -116,6 +212,26 @@ class JudoAppQt(QMainWindow):
         file_layout = QHBoxLayout()
         self.btn_load = QPushButton("1. Import Video")
         self.btn_load.clicked.connect(self.load_video)
+        self.combo_import = QComboBox()
+        for mode in video_import.IMPORT_MODES:
+            self.combo_import.addItem(mode.capitalize(), mode)
+        default_mode = os.getenv("VIDEO_IMPORT_MODE", "copy")
+        if default_mode in video_import.IMPORT_MODES:
+            self.combo_import.setCurrentIndex(video_import.IMPORT_MODES.index(default_mode))
+        self.combo_import.setToolTip("Copy into videos/, hardlink (same drive only), or use the file where it is")
+
+        # Import progress (visible while a background import runs)
+        self.import_job = None
+        self.import_bar = QProgressBar()
+        self.import_bar.setRange(0, 1000)
+        self.import_bar.setFormat("Importing %p%")
+        self.import_bar.hide()
+        self.btn_cancel_import = QPushButton("✖ Cancel Import")
+        self.btn_cancel_import.clicked.connect(self.cancel_import)
+        self.btn_cancel_import.hide()
+        self.import_timer = QTimer()
+        self.import_timer.setInterval(100)
+        self.import_timer.timeout.connect(self.poll_import)
         
         self.btn_load_model = QPushButton("2a. Load Main Model") # Renamed slightly
         self.btn_load_model.clicked.connect(self.load_yolo_main)
@@ -124,6 +240,10 @@ class JudoAppQt(QMainWindow):
         self.btn_load_compare = QPushButton("2b. Load Base Model to Compare (26n)")
         self.btn_load_compare.setStyleSheet("background-color: #e0f7fa; color: black;")
         self.btn_load_compare.clicked.connect(self.load_yolo_compare)
+        self.chk_compare = QCheckBox("Compare")
+        self.chk_compare.setToolTip("Run main and base models together and draw the base model as a ghost layer;\n"
+                                    "keypoints where they disagree are ringed in magenta")
+        self.chk_compare.toggled.connect(self.on_compare_toggled)
         # -----------------------------
 
         self.chk_auto = QCheckBox("Auto-Guess")
@@ -133,8 +253,12 @@ class JudoAppQt(QMainWindow):
         self.btn_save.clicked.connect(self.save_pair)
         
         file_layout.addWidget(self.btn_load)
+        file_layout.addWidget(self.combo_import)
+        file_layout.addWidget(self.import_bar)
+        file_layout.addWidget(self.btn_cancel_import)
         file_layout.addWidget(self.btn_load_model)
         file_layout.addWidget(self.btn_load_compare) # Add to layout
+        file_layout.addWidget(self.chk_compare)
         file_layout.addWidget(self.chk_auto)
         file_layout.addStretch()
         file_layout.addWidget(self.btn_save)
@@ -173,6 +297,40 @@ class JudoAppQt(QMainWindow):
         self.btn_del_item.setStyleSheet("background-color: #f44336; color: white; font-weight: bold; padding: 5px;")
         self.btn_del_item.clicked.connect(self.delete_selected_item)
         right_layout.addWidget(self.btn_del_item)
+
+        # INTERPOLATE BUTTON (Pose/Detect Mode)
+        self.btn_interp = QPushButton("⇢ Interpolate Gap")
+        self.btn_interp.setStyleSheet("background-color: #9C27B0; color: white; font-weight: bold; padding: 5px;")
+        self.btn_interp.setToolTip("Generate labels for every frame between the saved keyframes around the current frame")
+        self.btn_interp.clicked.connect(self.interpolate_keyframes)
+        right_layout.addWidget(self.btn_interp)
+
+        # STATS BUTTON
+        self.btn_stats = QPushButton("📊 Dataset Stats")
+        self.btn_stats.setToolTip("Labeled frames, persons and keypoint visibility per video (from the metadata index)")
+        self.btn_stats.clicked.connect(self.show_stats)
+        right_layout.addWidget(self.btn_stats)
+
+        # TO-LABEL BUTTON (Pose Mode; list written by active_learning.py)
+        self.btn_to_label = QPushButton("🎯 Next To-Label (N)")
+        self.btn_to_label.setToolTip("Jump to the next unlabeled frame the model is most unsure about.\nRun active_learning.py after training to refresh the list.")
+        self.btn_to_label.clicked.connect(self.next_to_label)
+        right_layout.addWidget(self.btn_to_label)
+
+        # RANK BUTTON (Review Mode only)
+        self.btn_rank = QPushButton("⚠ Rank Worst-First")
+        self.btn_rank.setStyleSheet("background-color: #FF9800; color: white; font-weight: bold; padding: 5px;")
+        self.btn_rank.setToolTip("Order review frames by model disagreement and low confidence.\nLoad a model first, or run review_scoring.py headless.")
+        self.btn_rank.clicked.connect(self.rank_review_queue)
+        self.btn_rank.hide()
+        right_layout.addWidget(self.btn_rank)
+
+        # GRID BUTTON (Review Mode only)
+        self.btn_grid = QPushButton("▦ Grid View")
+        self.btn_grid.setStyleSheet("background-color: #607D8B; color: white; font-weight: bold; padding: 5px;")
+        self.btn_grid.clicked.connect(self.open_review_grid)
+        self.btn_grid.hide()
+        right_layout.addWidget(self.btn_grid)
         
         # Focus Mode
         self.chk_focus = QCheckBox("Focus Selected (F)")
@@ -256,6 +414,12 @@ class JudoAppQt(QMainWindow):
             self.legend_group.show()
             self.chk_show_nums.show()
             self.btn_load_compare.show() # Show compare button in pose mode
+            self.chk_compare.show()
+            self.btn_rank.hide()
+            self.btn_grid.hide()
+            self.btn_interp.show()
+            self.btn_to_label.show()
+            self.combo_import.show()
             self.set_playback_controls_enabled(True)
             self.instr_label.setText("Controls:\n- L-Click: Drag\n- R-Click: Toggle Vis\n- Del: Delete Item")
             
@@ -267,6 +431,12 @@ class JudoAppQt(QMainWindow):
             self.legend_group.hide()
             self.chk_show_nums.hide()
             self.btn_load_compare.hide() # Hide compare button in detect mode
+            self.chk_compare.hide()
+            self.btn_rank.hide()
+            self.btn_grid.hide()
+            self.btn_interp.show()
+            self.btn_to_label.hide()
+            self.combo_import.show()
             self.set_playback_controls_enabled(True)
             self.instr_label.setText("Controls:\n- L-Click: Drag\n- R-Click: Toggle Vis\n- Del: Delete Item")
             
@@ -274,14 +444,26 @@ class JudoAppQt(QMainWindow):
             self.app_mode = "review"
             self.btn_load.setText("1. Load Dataset Folder")
             self.btn_add_item.setText("+ Add Person")
-            self.btn_load_model.setText("N/A")
+            self.btn_load_model.setText("2a. Load Main (Scoring)")
             self.legend_group.show() # Show legend in review mode
             self.chk_show_nums.show() # Show numbers option in review mode
             self.btn_load_compare.hide()
+            self.chk_compare.hide()
+            self.btn_rank.show()
+            self.btn_grid.show()
+            self.btn_interp.hide()
+            self.btn_to_label.hide()
+            self.combo_import.hide()
             self.set_playback_controls_enabled(False)
             self.instr_label.setText("Review Mode Controls:\n- S: Save & Next\n- D: Skip\n- A: Prev\n- Backspace: Delete Image\n- L-Click: Drag\n- Del: Delete Item")
         
         self.model = None
+        self.model_path = ""
+        self.compare_model = None
+        self.compare_model_path = ""
+        memory_budget.default.set("model.main", 0)
+        memory_budget.default.set("model.compare", 0)
+        self.annotator.clear_comparison()
         self.btn_load_model.setStyleSheet("") 
         self.btn_load_compare.setStyleSheet("background-color: #e0f7fa; color: black;")
         self.update_directories()
@@ -298,6 +480,10 @@ class JudoAppQt(QMainWindow):
         self.btn_play.setEnabled(enabled)
         self.btn_prev.setEnabled(enabled)
         self.btn_next.setEnabled(enabled)
+        self.btn_next_action.setEnabled(enabled)
+        self.btn_next_distinct.setEnabled(enabled)
+        self.spin_distinct.setEnabled(enabled)
+        self.combo_speed.setEnabled(enabled)
         self.slider.setEnabled(enabled)
 
     def update_directories(self):
@@ -315,12 +501,45 @@ class JudoAppQt(QMainWindow):
             
         self.active_images_dir = os.path.join(mode_root, "images")
         self.active_labels_dir = os.path.join(mode_root, "labels")
-        
-        os.makedirs(self.active_images_dir, exist_ok=True)
-        os.makedirs(self.active_labels_dir, exist_ok=True)
-        
+        self.active_predictions_dir = os.path.join(mode_root, "predictions") # Written by batch_label.py
+
+        if self.sync:
+            # Work on local mirrors; their threads push/pull the synced folder in the background.
+            # Images are write-back only: the annotator never reads them back in this mode.
+            labels = self.sync.mirror(self.active_labels_dir)
+            self.active_labels_dir = labels.local_dir
+            self.active_images_dir = self.sync.mirror(self.active_images_dir, pull=False).local_dir
+            self.active_predictions_dir = self.sync.mirror(self.active_predictions_dir).local_dir
+            if not labels.ready.is_set():
+                # First pull still running: poll it, saved frames show up once it's done
+                self.labels_sync = labels
+                self.lbl_status.setText(f"Syncing labels for {self.current_video_name}... (editing works meanwhile)")
+                QTimer.singleShot(200, self.poll_labels_sync)
+                return
+            self.labels_sync = None
+        else:
+            os.makedirs(self.active_images_dir, exist_ok=True)
+            os.makedirs(self.active_labels_dir, exist_ok=True)
+
         self.lbl_status.setText(f"Active Mode: {self.app_mode.upper()} | Folder: .../{self.current_video_name}/{self.app_mode}/")
 
+    def poll_labels_sync(self):
+        labels = self.labels_sync
+        if labels is None or labels.local_dir != self.active_labels_dir:
+            return   # Moved on to another video/mode; its own poll takes over
+        if not labels.ready.is_set():
+            QTimer.singleShot(200, self.poll_labels_sync)
+            return
+        self.labels_sync = None
+        self.lbl_status.setText(f"Active Mode: {self.app_mode.upper()} | Folder: .../{self.current_video_name}/{self.app_mode}/ | labels synced")
+        # Show the pulled label of the frame on screen, unless it was edited meanwhile
+        idx = self.engine.current_frame_index
+        if self.app_mode in ("pose", "detect") and not self.is_playing and self.current_frame_img is not None \
+                and not self.annotator.history.modified(self.annotator.annotations) and self.try_load_existing_labels(idx):
+            self.annotator.begin_frame((self.current_video_path, self.app_mode, idx))
+            self.lbl_status.setText(f"Frame {idx}: Loaded Saved ({self.app_mode}) ✅")
+            self.btn_save.setStyleSheet("background-color: #2E7D32; color: white; font-weight: bold;")
+
     def toggle_numbers(self, checked):
         self.annotator.show_numbers = checked
         self.annotator.update()
@@ -335,6 +554,16 @@ class JudoAppQt(QMainWindow):
             self: The class instance.
             event: The key press event object.
         """
+        # Undo / Redo (Ctrl+Z, Ctrl+Shift+Z or Ctrl+Y; Cmd on macOS)
+        if event.modifiers() & Qt.KeyboardModifier.ControlModifier:
+            shift = event.modifiers() & Qt.KeyboardModifier.ShiftModifier
+            if event.key() == Qt.Key.Key_Z:
+                self.undo_redo(redo=bool(shift))
+                return
+            if event.key() == Qt.Key.Key_Y:
+                self.undo_redo(redo=True)
+                return
+
         if self.app_mode == "review":
             if event.key() == Qt.Key.Key_S:
                 # Save & Next
@@ -359,6 +588,10 @@ class JudoAppQt(QMainWindow):
 
         if event.key() == Qt.Key.Key_F:
             self.chk_focus.setChecked(not self.chk_focus.isChecked())
+        elif event.key() == Qt.Key.Key_P:
+            self.toggle_perf_overlay()
+        elif event.key() == Qt.Key.Key_N and self.app_mode == "pose":
+            self.next_to_label()
         elif event.key() == Qt.Key.Key_Delete:
             # Delete selected item (e.g. an extra person bounding box)
             self.delete_selected_item()
@@ -368,6 +601,34 @@ class JudoAppQt(QMainWindow):
         else:
             super().keyPressEvent(event)
             
+    def undo_redo(self, redo=False):
+        done = self.annotator.redo() if redo else self.annotator.undo()
+        undo_left, redo_left = self.annotator.history.counts()
+        if done:
+            self.lbl_status.setText(f"{'↷ Redo' if redo else '↶ Undo'} | {undo_left} undo / {redo_left} redo left")
+            self.btn_save.setStyleSheet("background-color: #4CAF50; color: white; font-weight: bold;")
+        else:
+            self.lbl_status.setText(f"Nothing to {'redo' if redo else 'undo'} on this frame.")
+
+    def toggle_perf_overlay(self):
+        """Shows/hides the per-stage latency overlay. Recording is on while it is visible."""
+        if self.perf_overlay.isVisible():
+            self.perf_overlay.hide()
+            self.perf_timer.stop()
+            if not self.perf_always_on:
+                perf_stats.enable(False)
+            return
+        perf_stats.enable(True)
+        self.update_perf_overlay()
+        self.perf_overlay.show()
+        self.perf_overlay.raise_()
+        self.perf_timer.start()
+
+    def update_perf_overlay(self):
+        self.perf_overlay.setText(perf_stats.format_table() + "\n(ms, last %d samples | P to hide)\n\n" % perf_stats.WINDOW
+                                  + memory_budget.default.format_table())
+        self.perf_overlay.adjustSize()
+
     def delete_current_review_image(self):
         """
         Deletes the currently viewed image and label files from the disk during review mode.
@@ -388,8 +649,11 @@ class JudoAppQt(QMainWindow):
             QMessageBox.critical(self, "Delete Error", f"Could not delete files: {e}")
             return
             
+        self.index_label(txt_path, None, self.review_folder)
+
         # Remove from our tracking list
         self.review_pairs.pop(self.review_index)
+        self.sync_grid()
         
         # Load the next image (or previous if we deleted the very last one in the list)
         if self.review_index < len(self.review_pairs):
@@ -400,14 +664,83 @@ class JudoAppQt(QMainWindow):
         else:
             # Folder is now empty
             self.annotator.annotations = []
+            self.annotator.begin_frame(None)   # Nothing to undo on a deleted image
             self.annotator.set_image(np.zeros((100, 100, 3), dtype=np.uint8)) 
             self.annotator.update()
             self.lbl_status.setText("All images deleted.")
 
+    def index_label(self, txt_path, img_path, folder=None):
+        """
+        Updates (or, if the file is gone, removes) one label in the metadata index.
+        Args:
+            self: The class instance.
+            folder (str): Review folder the label belongs to; None for the active video.
+        """
+        if self.index is None: return
+        if folder is None:
+            where = (self.current_video_name, self.app_mode)
+        else:
+            # Review folders are only indexed when they are RAW_DATA_DIR/<video>/<mode>
+            where = metadata_index.locate(self.project_root, folder)
+            if where is None: return
+        try:
+            metadata_index.update_label(self.index, where[0], where[1], txt_path, img_path)
+        except sqlite3.Error as e:
+            print(f"⚠️ Warning: Could not update metadata index: {e}")
+
+    def show_stats(self):
+        """Shows per video / mode totals from the metadata index (Rescan updates it first)."""
+        if self.index is None:
+            QMessageBox.warning(self, "Stats", "Metadata index unavailable.")
+            return
+        box = QMessageBox(self)
+        box.setWindowTitle("Dataset Stats")
+        rescan = box.addButton("Rescan", QMessageBox.ButtonRole.ActionRole)
+        box.addButton(QMessageBox.StandardButton.Close)
+        start = time.perf_counter()
+        text = metadata_index.format_stats(metadata_index.stats(self.index))
+        box.setText(f"<pre>{text}</pre><small>Query: {(time.perf_counter() - start) * 1000:.1f} ms</small>")
+        box.exec()
+        if box.clickedButton() == rescan:
+            self.start_index_rescan()
+
+    def start_index_rescan(self):
+        """Runs metadata_index.rebuild (tree scan + process pool) on a background thread."""
+        if self.index_rescan is not None:
+            self.lbl_status.setText("Index rescan already running...")
+            return
+        result = {}
+
+        def worker():
+            try:
+                result["counts"] = metadata_index.rebuild(self.project_root)
+            except Exception as e:
+                result["error"] = e
+
+        thread = threading.Thread(target=worker, daemon=True)
+        self.index_rescan = (thread, result)
+        thread.start()
+        self.lbl_status.setText("Rescanning RAW_DATA_DIR in the background...")
+        QTimer.singleShot(200, self.poll_index_rescan)
+
+    def poll_index_rescan(self):
+        thread, result = self.index_rescan
+        if thread.is_alive():
+            QTimer.singleShot(200, self.poll_index_rescan)
+            return
+        self.index_rescan = None
+        if "error" in result:
+            print(f"⚠️ Warning: Index rescan failed: {result['error']}")
+            self.lbl_status.setText(f"Index rescan failed: {result['error']}")
+            return
+        total, parsed = result["counts"]
+        self.lbl_status.setText(f"Index updated: {total} labels ({parsed} changed). Open 📊 Dataset Stats to see it.")
+
     def delete_selected_item(self):
         idx = self.annotator.selected_idx
         if idx != -1 and idx < len(self.annotator.annotations):
-            del self.annotator.annotations[idx]
+            item = self.annotator.annotations.pop(idx)
+            self.annotator.record_delete(idx, item)
             self.annotator.selected_idx = -1
             self.annotator.selected_kpt_idx = -1
             self.annotator.update()
@@ -466,6 +799,7 @@ class JudoAppQt(QMainWindow):
             }
 
         self.annotator.annotations.append(new_item)
+        self.annotator.record_add(len(self.annotator.annotations) - 1)
         self.annotator.update()
         self.btn_save.setStyleSheet("background-color: #4CAF50; color: white; font-weight: bold;")
 
@@ -478,28 +812,87 @@ class JudoAppQt(QMainWindow):
 
         path, _ = QFileDialog.getOpenFileName(self, "Import Video", "", "Video (*.mp4 *.avi *.mov)")
         if path:
-            filename = os.path.basename(path)
-            destination_path = os.path.join(self.videos_storage_dir, filename)
-            
-            if os.path.abspath(path) != os.path.abspath(destination_path):
-                try:
-                    self.lbl_status.setText(f"Importing video...")
-                    QApplication.processEvents()
-                    shutil.copy(path, destination_path)
-                except Exception as e:
-                    QMessageBox.warning(self, "Import Error", f"Could not copy video: {e}")
-                    return
+            if self.import_job and not self.import_job.done:
+                QMessageBox.information(self, "Import", "Another import is still running.")
+                return
+            mode = self.combo_import.currentData()
+            try:
+                job = video_import.ImportJob(path, self.videos_storage_dir, mode)
+            except Exception as e:
+                QMessageBox.warning(self, "Import Error", f"Could not import video: {e}")
+                return
 
-            self.current_video_path = destination_path
-            count = self.engine.load_video(self.current_video_path)
-            self.current_video_name = os.path.splitext(filename)[0]
-            self.update_directories()
-            self.slider.setRange(0, count - 1)
-            self.slider.setValue(0)
-            self.seek_frame(0)
+            # Show the video straight from the source while the import runs
+            self.stop_playback()
+            try:
+                self.open_video(path)
+            except Exception as e:
+                QMessageBox.warning(self, "Import Error", f"Could not open video: {e}")
+                return
+
+            self.import_job = job.start()
+            self.import_bar.setValue(0)
+            self.import_bar.show()
+            self.btn_cancel_import.show()
+            self.import_timer.start()
+
+    def open_video(self, path, frame=0):
+        """Opens a video for annotation and shows `frame`."""
+        count = self.engine.load_video(path)
+        self.current_video_path = path
+        self.current_video_name = os.path.splitext(os.path.basename(path))[0]
+        self.update_directories()
+        self.slider.blockSignals(True)
+        self.slider.setRange(0, count - 1)
+        self.slider.setValue(frame)
+        self.slider.blockSignals(False)
+        self.seek_frame(frame)
+
+    def poll_import(self):
+        job = self.import_job
+        if job is None: return
+        if not job.done:
+            self.import_bar.setValue(int(job.progress * 1000))
+            return
+
+        self.import_timer.stop()
+        self.import_bar.hide()
+        self.btn_cancel_import.hide()
+        if job.error:
+            # The source stays open, so annotation can continue from it
+            if job.error != "cancelled":
+                QMessageBox.warning(self, "Import Error", f"Could not import video: {job.error}")
+            self.lbl_status.setText(f"Import {'cancelled' if job.error == 'cancelled' else 'failed'}: using the source file in place")
+            self.engine.start_motion_analysis(self.current_video_path)
+            return
+
+        # Switch to the imported copy (unless the user moved on). Only the capture is swapped:
+        # the frame on screen, its unsaved edits and the undo history stay as they are.
+        final_path = job.result["path"]
+        if os.path.abspath(self.current_video_path) == os.path.abspath(job.src) and final_path != self.current_video_path:
+            try:
+                self.engine.swap_capture(final_path)
+            except ValueError:
+                self.lbl_status.setText("Import done, but the copy could not be opened: using the source file in place")
+                return
+            self.annotator.history.rename(self.current_video_path, final_path)
+            self.current_video_path = final_path
+            name = os.path.splitext(os.path.basename(final_path))[0]
+            if name != self.current_video_name:
+                self.current_video_name = name
+                self.update_directories()
+        if os.path.abspath(self.current_video_path) == os.path.abspath(final_path):
+            self.engine.start_motion_analysis(final_path)
+        self.lbl_status.setText(f"Imported ({job.result['mode']}): {job.result['name']} | sha256 {job.result['sha256'][:12]}")
+
+    def cancel_import(self):
+        if self.import_job and not self.import_job.done:
+            self.import_job.cancel()
 
     def load_review_folder(self, folder_path):
         """
+        Starts a streaming scan of the dataset folder. The first image is shown as soon
+        as the first matching pair is found; the rest of the list fills in incrementally.
         Args:
             self: The class instance.
             folder_path (str): The path to the dataset directory containing 'images' and 'labels' folders.
@@ -512,22 +905,58 @@ class JudoAppQt(QMainWindow):
             QMessageBox.warning(self, "Error", "Folder must contain 'images' and 'labels' subdirectories.")
             return
 
-        image_files = sorted(glob.glob(os.path.join(images_dir, "*.jpg")))
-        
-        for img_path in image_files:
-            filename = os.path.basename(img_path)
-            label_path = os.path.join(labels_dir, filename.replace(".jpg", ".txt"))
-            if os.path.exists(label_path):
-                self.review_pairs.append((img_path, label_path))
+        self.review_index = 0
+        self.review_folder = folder_path
+        self.active_labels_dir = labels_dir 
+        self.active_images_dir = images_dir
+        self.active_predictions_dir = "" 
+        self.review_scan = iter_review_pairs(images_dir, labels_dir)
+        self.lbl_status.setText("Scanning dataset folder...")
+        self.pump_review_scan(self.review_scan)
+
+    def pump_review_scan(self, scan):
+        """
+        Pulls chunks from the review scan for a short time slice, then yields back to the
+        Qt event loop so the window stays responsive.
+        Args:
+            self: The class instance.
+            scan: The generator returned by iter_review_pairs.
+        """
+        # A newer folder was opened; drop this scan
+        if scan is not self.review_scan:
+            scan.close()
+            return
+
+        deadline = time.perf_counter() + 0.03
+        finished = False
+        while time.perf_counter() < deadline:
+            chunk = next(scan, None)
+            if chunk is None:
+                finished = True
+                break
+            first_chunk = not self.review_pairs
+            self.review_pairs.extend(chunk)
+            if first_chunk:
+                self.load_review_image(0)
+
+        if not finished:
+            self.lbl_status.setText(f"Reviewing {self.review_index + 1} / {len(self.review_pairs)}+  (scanning...)")
+            self.sync_grid()
+            QTimer.singleShot(0, lambda: self.pump_review_scan(scan))
+            return
 
+        self.review_scan = None
+        self.review_mtimes = load_label_mtimes(self.active_images_dir, self.active_labels_dir) or {}
         if not self.review_pairs:
             QMessageBox.warning(self, "No Data", "No matching image/label pairs found.")
             return
 
-        self.review_index = 0
-        self.active_labels_dir = labels_dir 
-        self.active_images_dir = images_dir 
-        self.load_review_image(self.review_index)
+        # Sort once at the end, keeping the reviewer on the image they are looking at
+        current = self.review_pairs[self.review_index]
+        self.review_pairs.sort()
+        self.review_index = self.review_pairs.index(current)
+        self.sync_grid()
+        self.lbl_status.setText(f"Reviewing {self.review_index + 1} / {len(self.review_pairs)}  |  {os.path.basename(current[0])}")
 
     def load_review_image(self, index):
         """
@@ -551,29 +980,23 @@ class JudoAppQt(QMainWindow):
         # Load Annotations directly
         self.annotator.annotations = []
         try:
-            with open(txt_path, "r") as f:
-                for line in f.readlines():
-                    parts = list(map(float, line.strip().split()))
-                    class_id = int(parts[0])
-                    bbox = parts[1:5]
-                    
-                    if len(parts) > 5:
-                        # Pose format
-                        raw_kpts = parts[5:]
-                        formatted_kpts = [[raw_kpts[i], raw_kpts[i+1], int(raw_kpts[i+2])] for i in range(0, len(raw_kpts), 3)]
-                        self.annotator.annotations.append({
-                            'type': 'person', 'class_id': class_id, 
-                            'bbox': bbox, 'keypoints': formatted_kpts
-                        })
-                    else:
-                        # Detect format
-                        self.annotator.annotations.append({
-                            'type': 'object', 'label': self.get_class_name(class_id), 'class_id': class_id,
-                            'bbox': bbox, 'keypoints': None
-                        })
+            for class_id, bbox, kpts in read_label_file(txt_path):
+                if kpts:
+                    # Pose format
+                    self.annotator.annotations.append({
+                        'type': 'person', 'class_id': class_id, 
+                        'bbox': bbox, 'keypoints': kpts
+                    })
+                else:
+                    # Detect format
+                    self.annotator.annotations.append({
+                        'type': 'object', 'label': self.get_class_name(class_id), 'class_id': class_id,
+                        'bbox': bbox, 'keypoints': None
+                    })
         except Exception as e:
             print(f"Error loading {txt_path}: {e}")
 
+        self.annotator.begin_frame(("review", img_path))
         self.annotator.update()
         self.lbl_status.setText(f"Reviewing {index + 1} / {len(self.review_pairs)}  |  {os.path.basename(img_path)}")
         self.btn_save.setStyleSheet("background-color: #4CAF50; color: white; font-weight: bold;")
@@ -581,10 +1004,116 @@ class JudoAppQt(QMainWindow):
         # Override the current video name so the save function writes to the correct filename
         self.current_video_name = os.path.basename(img_path).replace(".jpg", "")
 
+        if self.grid and self.grid.isVisible():
+            self.grid.set_current(index)
+
+    def open_review_grid(self):
+        """
+        Opens the thumbnail contact sheet for the current review folder.
+        Args:
+            self: The class instance.
+        """
+        if not self.review_pairs:
+            QMessageBox.information(self, "Grid View", "Load a dataset folder first.")
+            return
+        if self.grid is None:
+            self.grid = ThumbnailGrid()
+            self.grid.image_selected.connect(self.on_grid_selected)
+        self.grid.set_pairs(self.review_folder, self.review_pairs, self.review_index)
+        self.grid.show()
+        self.grid.raise_()
+        self.grid.set_current(self.review_index)
+
+    def sync_grid(self):
+        """Pushes the (possibly reordered) review list to the grid if it is open."""
+        if self.grid and self.grid.isVisible():
+            self.grid.set_pairs(self.review_folder, self.review_pairs, self.review_index)
+
+    def on_grid_selected(self, index):
+        self.review_index = index
+        self.load_review_image(index)
+        self.activateWindow()
+
+    def rank_review_queue(self):
+        """
+        Reorders review_pairs worst-first using the loaded model's cached disagreement
+        scores. New or edited labels are scored on a background thread by a pool of
+        worker processes (review_scoring.score_pairs_pooled); the queue is reordered
+        when they finish.
+        Args:
+            self: The class instance.
+        """
+        if not self.review_pairs:
+            QMessageBox.information(self, "Rank", "Load a dataset folder first.")
+            return
+        if self.review_scan is not None:
+            QMessageBox.information(self, "Rank", "Still scanning the folder, try again in a moment.")
+            return
+        if not self.model:
+            # Cached scores are only meaningful for the model that produced them
+            QMessageBox.information(self, "Rank", "Load the model to rank by first.")
+            return
+        if self.review_rank is not None:
+            self.lbl_status.setText("Ranking already running...")
+            return
+
+        images_dir = self.active_images_dir
+        model_path = self.model_path
+        model_id = review_scoring.model_identity(model_path)
+        pairs = list(self.review_pairs)
+        mtimes = dict(self.review_mtimes)
+        result = {"done": 0, "total": 0}
+
+        def worker():
+            try:
+                scores = review_scoring.load_scores(images_dir, model_id)
+                todo = review_scoring.stale_pairs(pairs, scores, mtimes)
+                result["todo"] = len(todo)
+
+                def checkpoint(chunk_scores, done, total):
+                    scores.update(chunk_scores)
+                    review_scoring.save_scores(images_dir, model_id, scores)
+                    result["done"], result["total"] = done, total
+
+                if todo:
+                    review_scoring.score_pairs_pooled(model_path, todo, chunk_size=RANK_CHUNK, on_chunk=checkpoint)
+                result["scores"] = scores
+            except Exception as e:
+                result["error"] = e
+
+        thread = threading.Thread(target=worker, daemon=True)
+        self.review_rank = (thread, result, self.review_folder)
+        thread.start()
+        self.lbl_status.setText("Scoring frames in the background...")
+        QTimer.singleShot(200, self.poll_review_rank)
+
+    def poll_review_rank(self):
+        thread, result, folder = self.review_rank
+        if thread.is_alive():
+            if result["total"]:
+                self.lbl_status.setText(f"Scoring {result['todo']} frames in the background... "
+                                        f"chunk {result['done']} / {result['total']}")
+            QTimer.singleShot(200, self.poll_review_rank)
+            return
+        self.review_rank = None
+        if "error" in result:
+            print(f"⚠️ Warning: Ranking failed: {result['error']}")
+            self.lbl_status.setText(f"Ranking failed: {result['error']}")
+            return
+        if folder != self.review_folder or self.app_mode != "review":
+            return   # Moved on; the scores are cached for next time
+
+        scores = result["scores"]
+        self.review_pairs = review_scoring.rank_pairs(self.review_pairs, scores)
+        self.review_index = 0
+        self.sync_grid()
+        self.load_review_image(self.review_index)
+        self.lbl_status.setText(f"Ranked {len(scores)} scored frames worst-first | " + self.lbl_status.text())
+
     # --- MODEL LOADING LOGIC ---
     def load_yolo_main(self):
         """Loads the default main model depending on current mode."""
-        if self.app_mode == "pose":
+        if self.app_mode in ("pose", "review"):
             engine = os.getenv("MODEL_MAIN_PATH", "yolo26n-pose.engine")
             pt = os.getenv("MODEL_NANO_PATH", "yolo26n-pose.pt")
         else:
@@ -605,22 +1134,34 @@ class JudoAppQt(QMainWindow):
         engine = 'Models/yolo26n-pose.engine'
         pt = 'Models/yolo26n-pose.pt'
 
-        self._load_model_generic(engine, pt)
+        # Loaded next to the main model (not instead of it) and compared on every frame
+        if self._load_model_generic(engine, pt, target="compare"):
+            if self.chk_compare.isChecked():
+                self.on_compare_toggled(True)
+            else:
+                self.chk_compare.setChecked(True)
 
-    def _load_model_generic(self, engine_path, pt_path):
-        """Reusable helper to load any YOLO model."""
+    def _load_model_generic(self, engine_path, pt_path, target="main"):
+        """
+        Reusable helper to load any YOLO model.
+        Args:
+            target (str): "main" (auto-guess model) or "compare" (base model for the ghost layer).
+        Returns:
+            True if a model was loaded.
+        """
         self.lbl_status.setText(f"Loading Model: {pt_path} ...")
         QApplication.processEvents()
 
         model_loaded = False
         
         # 1. Try GPU (TensorRT Engine)
-        if torch.cuda.is_available():
+        if model_pool.cuda_available():
             try:
                 if os.path.exists(engine_path):
                     self.lbl_status.setText(f"Loading Engine: {engine_path}")
                     QApplication.processEvents()
-                    self.model = YOLO(engine_path)
+                    model = model_pool.yolo(engine_path)
+                    model_path = engine_path
                     model_loaded = True
                 else:
                     print(f"GPU Detected! Checking export capability...")
@@ -628,11 +1169,12 @@ class JudoAppQt(QMainWindow):
                     QApplication.processEvents()
                     
                     if os.path.exists(pt_path):
-                        model = YOLO(pt_path) 
+                        model = model_pool.yolo(pt_path) 
                         model.export(format='engine', half=True)
                         self.lbl_status.setText("Export Complete! Loading...")
                         QApplication.processEvents()
-                        self.model = YOLO(engine_path)
+                        model = model_pool.yolo(engine_path)
+                        model_path = engine_path
                         model_loaded = True
                     else:
                         print(f"Missing source PT file: {pt_path}")
@@ -649,48 +1191,132 @@ class JudoAppQt(QMainWindow):
                     print(f'Loading CPU model ({pt_path})...')
                     self.lbl_status.setText(f"Loading CPU Model ({pt_path})...")
                     QApplication.processEvents()
-                    self.model = YOLO(pt_path)
+                    model = model_pool.yolo(pt_path)
+                    model_path = pt_path
                     model_loaded = True
                 else:
                     QMessageBox.critical(self, "Model Error", f"Could not find model file:\n{pt_path}")
                     self.lbl_status.setText("Error loading model.")
-                    return
+                    return False
             except Exception as e:
                 QMessageBox.critical(self, "Model Error", f"Critical: Could not load CPU model: {e}")
                 self.lbl_status.setText("Error loading model.")
-                return
+                return False
 
         if model_loaded:
-            self.lbl_status.setText(f"Loaded: {self.model.model_name}")
-            print(f'Loaded Model: {self.model.model_name}')
-            
-            # Visual feedback: Turn active button green, others neutral
-            # Note: This simple check assumes specific button usage
-            if pt_path == 'Models/best.pt' or pt_path == 'Models/yolo26n.pt':
-                 self.btn_load_model.setStyleSheet("background-color: #d4edda")
-                 self.btn_load_compare.setStyleSheet("background-color: #e0f7fa")
+            if target == "compare":
+                self.compare_model, self.compare_model_path = model, model_path
             else:
-                 self.btn_load_compare.setStyleSheet("background-color: #d4edda")
-                 self.btn_load_model.setStyleSheet("")
+                self.model, self.model_path = model, model_path
+                self.predictions.clear()
+            # Pinned: the caches make room for it
+            memory_budget.default.set(f"model.{target}", memory_budget.model_bytes(model, model_path))
+            self.lbl_status.setText(f"Loaded: {model.model_name}")
+            print(f'Loaded Model: {model.model_name}')
+            
+            # Visual feedback: Turn the button of each loaded model green
+            self.btn_load_model.setStyleSheet("background-color: #d4edda" if self.model else "")
+            self.btn_load_compare.setStyleSheet("background-color: #d4edda" if self.compare_model
+                                                else "background-color: #e0f7fa; color: black;")
+        return model_loaded
+
+    def on_compare_toggled(self, checked):
+        if self.app_mode != "review" and self.engine.total_frames > 0 and not self.is_playing:
+            self.refresh_comparison()
+        if checked and not self.comparing():
+            self.lbl_status.setText("Compare: load the main (2a) and base (2b) models first.")
+
+    def refresh_comparison(self):
+        """Recomputes (or clears) the base-model overlay of the frame on screen; its annotations are left alone."""
+        img = self.current_frame_img
+        if not self.comparing() or img is None:
+            self.annotator.clear_comparison()
+            return
+        t0 = perf_stats.start()
+        main_results, base_results = pose_compare.predict_pair(self.model, self.compare_model, img)
+        perf_stats.stop("inference.model", t0)
+        self.lbl_status.setText(f"Frame {self.engine.current_frame_index}")
+        self.note_comparison(main_results[0], base_results[0], img)
+
+    def note_comparison(self, main_result, base_result, img):
+        """Shows the comparison overlay and appends its counts to the status bar."""
+        comparison = self.show_comparison(main_result, base_result, img)
+        self.lbl_status.setText(f"{self.lbl_status.text()} | vs base: {int(comparison['over'].sum())} keypoints "
+                                f"disagree, {len(comparison['matches'])} matched, "
+                                f"{comparison['main_only']} main-only, {comparison['base_only']} base-only")
+
+    def comparing(self):
+        return (self.chk_compare.isChecked() and self.app_mode == "pose"
+                and self.model is not None and self.compare_model is not None)
+
+    @perf_stats.timed("inference.compare")
+    def show_comparison(self, main_result, base_result, img):
+        """Draws the base model as a ghost layer and rings keypoints where the models disagree."""
+        h, w = img.shape[:2]
+        main, base = result_pose_arrays(main_result), result_pose_arrays(base_result)
+        comparison = pose_compare.compare_arrays(main, base, (w, h))
+        self.annotator.set_comparison(base[1].tolist(), pose_compare.disagreement_markers(main, base, comparison))
+        return comparison
 
     def toggle_play(self):
         self.is_playing = not self.is_playing
         if self.is_playing:
             self.btn_play.setText("|| Pause")
-            self.timer.start()
+            self.restart_play_clock()
+            self.timer.start(0)
         else:
             self.btn_play.setText("▶ Play")
             self.timer.stop()
+            # Auto-guess and compare are skipped while playing; run them on the frame we paused
+            # on, unless it has a saved label or was edited (reloading would drop the edits)
+            idx = self.engine.current_frame_index
+            saved = os.path.exists(os.path.join(self.active_labels_dir, f"{self.current_video_name}_{idx:06d}.txt"))
+            if saved or self.annotator.history.modified(self.annotator.annotations):
+                self.refresh_comparison()
+            else:
+                self.seek_frame(idx)
+
+    def restart_play_clock(self):
+        """Anchors the playback schedule at the current frame and time."""
+        self.play_clock_start = time.perf_counter()
+        self.play_clock_frame = self.engine.current_frame_index
+        self.play_dropped = 0
+        self.play_shown.clear()
+
+    def on_speed_change(self, index):
+        self.playback_speed = self.combo_speed.itemData(index)
+        if self.is_playing:
+            self.restart_play_clock()
+            self.timer.start(0)
 
     def next_frame_automatic(self):
-        if self.engine.current_frame_index < self.engine.total_frames - 1:
-            next_idx = self.engine.current_frame_index + 1
-            self.slider.blockSignals(True)
-            self.slider.setValue(next_idx)
-            self.slider.blockSignals(False)
-            self.seek_frame(next_idx)
-        else:
+        """Shows the frame due at this moment of wall-clock time, then schedules the next tick."""
+        if not self.is_playing: return
+        last = self.engine.total_frames - 1
+        current = self.engine.current_frame_index
+        if current >= last:
             self.toggle_play()
+            return
+
+        target_fps = self.engine.fps * self.playback_speed
+        now = time.perf_counter()
+        due = self.play_clock_frame + int((now - self.play_clock_start) * target_fps)
+        next_idx = min(max(due, current + 1), last)
+        self.play_dropped += next_idx - current - 1
+
+        self.slider.blockSignals(True)
+        self.slider.setValue(next_idx)
+        self.slider.blockSignals(False)
+        self.seek_frame(next_idx)
+
+        self.play_shown.append(now)
+        while self.play_shown and now - self.play_shown[0] > 1.0:
+            self.play_shown.popleft()
+        self.lbl_status.setText(f"▶ Frame {next_idx} | {len(self.play_shown)} / {target_fps:.1f} fps "
+                                f"({self.playback_speed:g}×) | dropped {self.play_dropped}")
+
+        next_time = self.play_clock_start + (next_idx + 1 - self.play_clock_frame) / target_fps
+        self.timer.start(max(0, int((next_time - time.perf_counter()) * 1000)))
 
     def next_frame(self):
         self.stop_playback()
@@ -702,6 +1328,116 @@ class JudoAppQt(QMainWindow):
         if self.engine.current_frame_index > 0:
             self.slider.setValue(self.engine.current_frame_index - 1)
 
+    def jump_next_action(self):
+        self.stop_playback()
+        self._jump_motion(self.engine.next_motion_frame(self.engine.current_frame_index), "high-motion frames")
+
+    def jump_next_distinct(self):
+        self.stop_playback()
+        idx = self.engine.next_distinct_frame(self.engine.current_frame_index, steps=self.spin_distinct.value())
+        self._jump_motion(idx, "distinct frames")
+
+    def _jump_motion(self, idx, what):
+        if self.engine.total_frames == 0: return
+        if not self.engine.motion_ready():
+            self.lbl_status.setText(f"Motion index still analyzing ({self.engine.motion_progress:.0%})...")
+            return
+        if idx is None:
+            self.lbl_status.setText(f"No more {what} in this video.")
+            return
+        self.slider.setValue(min(idx, self.engine.total_frames - 1))
+
+    def next_to_label(self):
+        """Opens the next frame of the to-label list that still has no pose label."""
+        created, entries = active_learning.load_list(self.project_root)
+        if not entries:
+            QMessageBox.information(self, "To-Label List", "No to-label list yet.\nRun: python active_learning.py")
+            return
+        if created != self.to_label_created:
+            # active_learning.py wrote a new list: start from its top
+            self.to_label_created = created
+            self.to_label_index = 0
+        self.stop_playback()
+        while self.to_label_index < len(entries):
+            entry = entries[self.to_label_index]
+            self.to_label_index += 1
+            name, frame = entry["video"], entry["frame"]
+            labels_dir = self.active_labels_dir if name == self.current_video_name else \
+                os.path.join(self.project_root, name, "pose", "labels")
+            if os.path.exists(os.path.join(labels_dir, f"{name}_{frame:06d}.txt")):
+                continue   # Labeled since the list was made
+            if name == self.current_video_name:
+                self.slider.setValue(frame)
+            else:
+                path = find_videos(self.project_root).get(name)
+                if not path:
+                    print(f"⚠️ Warning: Video for to-label entry not found: {name}")
+                    continue
+                try:
+                    self.open_video(path, frame)
+                except Exception as e:
+                    print(f"⚠️ Warning: Could not open {path} for to-label entry: {e}")
+                    continue
+                self.engine.start_motion_analysis(path)
+            self.lbl_status.setText(f"🎯 To-label {self.to_label_index}/{len(entries)}: {name} frame {frame} | "
+                                    f"priority {entry['priority']:.2f} (conf {entry['confidence']:.2f}, "
+                                    f"unstable {entry['instability']:.2f}, disagree {entry['disagreement']:.2f})")
+            return
+        self.to_label_index = 0
+        QMessageBox.information(self, "To-Label List", "Every frame on the to-label list is labeled. ✅")
+
+    def interpolate_keyframes(self):
+        """
+        Fills the gap between the saved keyframes around the current frame (or the gap
+        ending at the current frame, if it is itself a keyframe).
+        Args:
+            self: The class instance.
+        """
+        if not self.current_video_path or not self.active_labels_dir:
+            QMessageBox.information(self, "Interpolate", "Import a video first.")
+            return
+        self.stop_playback()
+        cur = self.engine.current_frame_index
+        keys = interpolation.keyframe_indices(self.active_labels_dir, self.current_video_name)
+        before = [k for k in keys if k < cur]
+        after = [k for k in keys if k >= cur]
+        if not before or not after:
+            QMessageBox.information(self, "Interpolate", "Save labels on a frame before and after this one first.")
+            return
+        start, end = before[-1], after[0]
+        if end - start < 2:
+            self.lbl_status.setText("No frames between these keyframes.")
+            return
+
+        methods = ["linear", "spline", "linear + optical flow", "spline + optical flow"]
+        choice, ok = QInputDialog.getItem(self, "Interpolate",
+                                          f"Generate labels for frames {start + 1}-{end - 1} ({end - start - 1} frames):",
+                                          methods, 0, False)
+        if not ok: return
+
+        def progress(done, total):
+            self.lbl_status.setText(f"Interpolating... {done} / {total}")
+            QApplication.processEvents()
+
+        try:
+            written, unmatched = interpolation.interpolate_range(
+                self.current_video_path, self.current_video_name,
+                self.active_labels_dir, self.active_images_dir, start, end,
+                method=choice.split()[0], use_flow="flow" in choice, progress=progress)
+        except Exception as e:
+            QMessageBox.critical(self, "Interpolate Error", f"Could not interpolate: {e}")
+            return
+
+        # Written outside save_pair, so index (and sync) them the same way
+        for txt_path, img_path in written:
+            self.index_label(txt_path, img_path)
+        if written and self.sync:
+            self.sync.poke()
+
+        self.seek_frame(cur)
+        note = f" ({unmatched} unmatched person(s) skipped)" if unmatched else ""
+        self.lbl_status.setText(f"Interpolated {len(written)} frames between {start} and {end}{note}")
+
     def stop_playback(self):
         if self.is_playing:
             self.is_playing = False
@@ -718,7 +1454,8 @@ class JudoAppQt(QMainWindow):
     def slider_released(self):
         self.slider_is_being_dragged = False
         if self.is_playing:
-            self.timer.start()
+            self.restart_play_clock()
+            self.timer.start(0)
 
     def seek_frame(self, idx):
         self.engine.current_frame_index = idx
@@ -728,12 +1465,23 @@ class JudoAppQt(QMainWindow):
             self.annotator.set_image(img)
             self.annotator.selected_idx = -1
             self.annotator.selected_kpt_idx = -1
+
+            # Compare mode: main and base models run together on this frame
+            main_result = base_result = None
+            if self.comparing() and not self.is_playing:
+                t0 = perf_stats.start()
+                main_results, base_results = pose_compare.predict_pair(self.model, self.compare_model, img)
+                perf_stats.stop("inference.model", t0)
+                main_result, base_result = main_results[0], base_results[0]
             
             if self.try_load_existing_labels(idx):
                 self.lbl_status.setText(f"Frame {idx}: Loaded Saved ({self.app_mode}) ✅")
                 self.btn_save.setStyleSheet("background-color: #2E7D32; color: white; font-weight: bold;")
-            elif self.chk_auto.isChecked() and self.model:
-                self.run_inference(img)
+            elif self.chk_auto.isChecked() and self.try_load_existing_labels(idx, self.active_predictions_dir):
+                self.lbl_status.setText(f"Frame {idx}: Batch Pre-Label ({self.app_mode}) 🤖")
+                self.btn_save.setStyleSheet("background-color: #4CAF50; color: white; font-weight: bold;")
+            elif self.chk_auto.isChecked() and self.model and not self.is_playing:
+                self.run_inference(img, main_result)
                 self.lbl_status.setText(f"Frame {idx}: Auto-Guessed ({self.app_mode}) 🤖")
                 self.btn_save.setStyleSheet("background-color: #4CAF50; color: white; font-weight: bold;")
             else:
@@ -741,42 +1489,39 @@ class JudoAppQt(QMainWindow):
                 self.annotator.update()
                 self.lbl_status.setText(f"Frame {idx}: No Data")
                 self.btn_save.setStyleSheet("background-color: #4CAF50; color: white; font-weight: bold;")
+            self.annotator.begin_frame((self.current_video_path, self.app_mode, idx))
+            if self.labels_sync is not None:
+                self.lbl_status.setText(f"{self.lbl_status.text()} | syncing labels...")
+
+            if main_result is not None:
+                self.note_comparison(main_result, base_result, img)
+            else:
+                self.annotator.clear_comparison()
 
-    def try_load_existing_labels(self, idx):
-        if not self.active_labels_dir: return False
+    @perf_stats.timed("labels.load")
+    def try_load_existing_labels(self, idx, labels_dir=None):
+        labels_dir = labels_dir or self.active_labels_dir
+        if not labels_dir: return False
         filename = f"{self.current_video_name}_{idx:06d}.txt"
-        path = os.path.join(self.active_labels_dir, filename)
+        path = os.path.join(labels_dir, filename)
         if not os.path.exists(path): return False
         
         new_annotations = []
         try:
-            with open(path, "r") as f:
-                lines = f.readlines()
-                for line in lines:
-                    parts = list(map(float, line.strip().split()))
-                    class_id = int(parts[0])
-                    bbox = parts[1:5]
-                    
-                    if len(parts) > 5:
-                        if self.app_mode != "pose": continue 
-                        raw_kpts = parts[5:]
-                        formatted_kpts = []
-                        for i in range(0, len(raw_kpts), 3):
-                            x = raw_kpts[i]
-                            y = raw_kpts[i+1]
-                            v = int(raw_kpts[i+2])
-                            formatted_kpts.append([x, y, v])
-                        new_annotations.append({
-                            'type': 'person', 'class_id': class_id, 
-                            'bbox': bbox, 'keypoints': formatted_kpts
-                        })
-                    else:
-                        if self.app_mode != "detect": continue
-                        label_name = self.get_class_name(class_id)
-                        new_annotations.append({
-                            'type': 'object', 'label': label_name, 'class_id': class_id,
-                            'bbox': bbox, 'keypoints': None
-                        })
+            for class_id, bbox, kpts in read_label_file(path):
+                if kpts:
+                    if self.app_mode != "pose": continue 
+                    new_annotations.append({
+                        'type': 'person', 'class_id': class_id, 
+                        'bbox': bbox, 'keypoints': kpts
+                    })
+                else:
+                    if self.app_mode != "detect": continue
+                    label_name = self.get_class_name(class_id)
+                    new_annotations.append({
+                        'type': 'object', 'label': label_name, 'class_id': class_id,
+                        'bbox': bbox, 'keypoints': None
+                    })
             
             if new_annotations:
                 self.annotator.annotations = new_annotations
@@ -787,41 +1532,27 @@ class JudoAppQt(QMainWindow):
         except Exception:
             return False
 
-    def run_inference(self, img):
+    @perf_stats.timed("inference")
+    def run_inference(self, img, result=None):
+        """Auto-guess for img (result: an already computed prediction, e.g. from compare mode)."""
         if not self.model: return
-        results = self.model(img, verbose=False)
-        self.annotator.annotations = []
-        
-        if not results: return
-
-        if self.app_mode == "pose" and results[0].keypoints is not None:
-            keypoints_data = results[0].keypoints.xyn.cpu().numpy()
-            boxes = results[0].boxes.xywhn.cpu().numpy() 
-            for i, kpts in enumerate(keypoints_data):
-                formatted_kpts = []
-                for kp in kpts:
-                    x, y = kp
-                    vis = 0 if (x==0 and y==0) else 2 
-                    formatted_kpts.append([float(x), float(y), vis])
-                bbox = boxes[i].tolist() if i < len(boxes) else [0,0,0,0]
-                self.annotator.annotations.append({
-                    'type': 'person', 'class_id': 0,
-                    'bbox': bbox, 'keypoints': formatted_kpts
-                })
-        
-        elif self.app_mode == "detect" and results[0].boxes is not None:
-            boxes = results[0].boxes.xywhn.cpu().numpy()
-            classes = results[0].boxes.cls.cpu().numpy()
-            for i, box in enumerate(boxes):
-                cls = int(classes[i])
-                label_name = results[0].names[cls]
-                self.annotator.annotations.append({
-                    'type': 'object', 'label': label_name, 'class_id': cls,
-                    'bbox': box.tolist(), 'keypoints': None
-                })
-                
+        key = (self.model_path, self.current_video_path, self.app_mode, self.engine.current_frame_index)
+        cached = self.predictions.get(key) if result is None else None
+        if cached is None:
+            if result is None:
+                t0 = perf_stats.start()
+                results = self.model(img, verbose=False)
+                perf_stats.stop("inference.model", t0)
+                self.annotator.annotations = []
+                if not results: return
+                result = results[0]
+            cached = result_annotations(result, self.app_mode)
+            self.predictions.put(key, cached)
+        # Copies: the annotator edits its items in place
+        self.annotator.annotations = copy.deepcopy(cached)
         self.annotator.update()
 
+    @perf_stats.timed("save_pair")
     def save_pair(self):
         if not self.active_images_dir or not self.active_labels_dir: 
             QMessageBox.warning(self, "Error", "No valid folder for current mode.")
@@ -837,15 +1568,7 @@ class JudoAppQt(QMainWindow):
         txt_path = os.path.join(self.active_labels_dir, f"{base_filename}.txt")
         
         try:
-            with open(txt_path, "w") as f:
-                for item in self.annotator.annotations:
-                    line = [item['class_id']]
-                    line.extend(item['bbox'])
-                    if item.get('keypoints'):
-                        for k in item['keypoints']:
-                            line.extend(k)
-                    
-                    f.write(" ".join(map(str, line)) + "\n")
+            write_label_file(txt_path, self.annotator.annotations)
         except Exception as e:
             QMessageBox.critical(self, "Save Error", f"Txt Error: {e}")
             return
@@ -859,10 +1582,42 @@ class JudoAppQt(QMainWindow):
             return
             
         self.lbl_status.setText(f"Saved: {base_filename}")
+        if self.app_mode == "review":
+            self.index_label(txt_path, img_path, self.review_folder)
+            # Edited in place, so the folder scan's mtime is out of date (ranking rescores it)
+            self.review_mtimes.pop(base_filename, None)
+        else:
+            self.index_label(txt_path, img_path)
+        if self.sync:
+            self.sync.poke()
+            if not self.sync.online():
+                self.lbl_status.setText(f"Saved: {base_filename} | ☁ Sync folder offline, kept locally")
+        if self.app_mode == "review" and self.grid and self.grid.isVisible():
+            self.grid.refresh_image(img_path)
         self.btn_save.setStyleSheet("background-color: #2E7D32; color: white; font-weight: bold;")
 
+    def closeEvent(self, event):
+        if self.sync:
+            self.lbl_status.setText("Syncing changes...")
+            QApplication.processEvents()
+            if not self.sync.close(timeout=15.0):
+                print(f"⚠️ Warning: Some changes are not synced yet; they stay in {self.sync.cache_root} and sync on next start")
+        super().closeEvent(event)
+
+def on_first_paint():
+    """Runs on the first event loop pass, after the window has painted."""
+    startup_timing.mark("first paint")
+    if os.getenv("STARTUP_REPORT", "0") == "1":
+        startup_timing.report()
+    # Warm torch/ultralytics in the background so the first model load is quick
+    if os.getenv("PRELOAD_MODELS", "1") == "1":
+        model_pool.preload()
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
+    startup_timing.mark("QApplication")
     window = JudoAppQt()
+    startup_timing.mark("window built")
     window.show()
-    sys.exit(app.exec())
\ No newline at end of file
+    QTimer.singleShot(0, on_first_paint)
+    sys.exit(app.exec())
@@ -0,0 +1,218 @@
+import os
+import threading
+from collections import OrderedDict
+
+# One memory budget for every in-app cache.
+#
+#   MEMORY_BUDGET_MB=1024 python main.py
+#
+# Each cache registers under a name with a priority and an evict(nbytes) callback, and
+# reports its size with add() (deltas) or set() (absolute). When the total goes over the
+# budget, caches are asked to free memory in priority order (lowest first; within a
+# priority the biggest first) until it fits again. A cache registered without an evict
+# callback (e.g. loaded models) is pinned: it counts towards the budget but never shrinks,
+# so the others get less room. The P overlay shows usage per cache.
+#
+# evict(nbytes) must free what it can (oldest entries first), return the bytes it freed
+# and not report that change itself. Sizes are estimates (array bytes, pixmap pixels),
+# not RSS.
+
+DEFAULT_BUDGET_MB = 1024
+
+# Eviction order: cheap to rebuild first
+PRIORITY_PIXMAPS = 10         # Rebuilt from thumbnails
+PRIORITY_THUMBNAILS = 20      # Reloaded from <folder>/.thumbs
+PRIORITY_FRAMES = 30          # Re-decoded from the video
+PRIORITY_PREDICTIONS = 40     # Re-run through the model
+PRIORITY_HISTORY = 80         # Undo history: lost for good, so last
+
+
+class CacheAccount:
+    __slots__ = ("name", "priority", "evict", "size", "evicted")
+
+    def __init__(self, name, priority, evict):
+        self.name = name
+        self.priority = priority
+        self.evict = evict
+        self.size = 0
+        self.evicted = 0    # Lifetime bytes freed on the budget's request
+
+
+class MemoryBudget:
+    def __init__(self, limit_bytes):
+        self.limit_bytes = limit_bytes
+        self.accounts = {}
+        self.lock = threading.RLock()
+
+    def register(self, name, priority=0, evict=None):
+        """Adds (or resets) a cache account. evict=None pins it."""
+        with self.lock:
+            self.accounts[name] = CacheAccount(name, priority, evict)
+
+    def unregister(self, name):
+        with self.lock:
+            self.accounts.pop(name, None)
+
+    def add(self, name, delta, enforce=True):
+        """Reports that a cache grew (or, negative, shrank) by delta bytes."""
+        with self.lock:
+            account = self.accounts.get(name)
+            if account is None:
+                return
+            account.size = max(0, account.size + delta)
+            if enforce and delta > 0:
+                self.enforce()
+
+    def set(self, name, size, enforce=True):
+        """Reports a cache's total size."""
+        with self.lock:
+            account = self.accounts.get(name)
+            if account is None:
+                return
+            grew = size > account.size
+            account.size = size
+            if enforce and grew:
+                self.enforce()
+
+    def used(self):
+        with self.lock:
+            return sum(a.size for a in self.accounts.values())
+
+    def enforce(self):
+        """Evicts until the total fits. Returns False if it can't (pinned caches alone exceed it)."""
+        with self.lock:
+            excess = self.used() - self.limit_bytes
+            if excess <= 0:
+                return True
+            candidates = sorted((a for a in self.accounts.values() if a.evict),
+                                key=lambda a: (a.priority, -a.size))
+            for account in candidates:
+                if account.size <= 0:
+                    continue
+                freed = max(0, account.evict(min(excess, account.size)))
+                account.size = max(0, account.size - freed)
+                account.evicted += freed
+                excess -= freed
+                if excess <= 0:
+                    return True
+            return excess <= 0
+
+    def usage(self):
+        """[(name, size, priority, pinned, evicted)] biggest first."""
+        with self.lock:
+            return sorted(((a.name, a.size, a.priority, a.evict is None, a.evicted) for a in self.accounts.values()),
+                          key=lambda row: -row[1])
+
+    def format_table(self):
+        lines = [f"memory {self.used() / 2**20:7.1f} / {self.limit_bytes / 2**20:.0f} MB"]
+        for name, size, priority, pinned, evicted in self.usage():
+            note = "pinned" if pinned else f"p{priority}, evicted {evicted / 2**20:.1f} MB"
+            lines.append(f"  {name:<14}{size / 2**20:8.1f} MB  {note}")
+        return "\n".join(lines)
+
+
+class BudgetedLRU:
+    """
+    Key -> value cache that is accounted under one name and evicts least recently used
+    entries when the budget asks. Thread-safe (shares the budget's lock).
+    Args:
+        name (str): Account name shown in the overlay.
+        priority (int): Eviction order (lowest evicted first).
+        sizeof (callable): value -> bytes.
+        max_items (int): Optional count limit on top of the budget.
+    """
+
+    def __init__(self, name, priority, sizeof, max_items=None, budget=None):
+        self.name = name
+        self.sizeof = sizeof
+        self.max_items = max_items
+        self.budget = budget or default
+        self.entries = OrderedDict()   # key -> (value, size), least recently used first
+        self.size = 0
+        self.budget.register(name, priority, self._evict)
+
+    def get(self, key):
+        with self.budget.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def put(self, key, value):
+        with self.budget.lock:
+            self._remove(key)
+            size = self.sizeof(value)
+            self.entries[key] = (value, size)
+            self.size += size
+            freed = 0
+            while self.max_items is not None and len(self.entries) > self.max_items:
+                freed += self._remove(next(iter(self.entries)))
+            # Eviction never drops the newest entry, so the value just put stays available
+            self.budget.add(self.name, size - freed)
+
+    def trim(self, max_items):
+        """Drops least recently used entries beyond max_items."""
+        with self.budget.lock:
+            freed = 0
+            while len(self.entries) > max_items:
+                freed += self._remove(next(iter(self.entries)))
+            self.budget.add(self.name, -freed)
+
+    def pop(self, key):
+        with self.budget.lock:
+            self.budget.add(self.name, -self._remove(key))
+
+    def clear(self):
+        with self.budget.lock:
+            self.entries.clear()
+            self.size = 0
+            self.budget.set(self.name, 0)
+
+    def _remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return 0
+        self.size -= entry[1]
+        return entry[1]
+
+    def _evict(self, nbytes):
+        freed = 0
+        while freed < nbytes and len(self.entries) > 1:
+            freed += self._remove(next(iter(self.entries)))
+        return freed
+
+
+def array_bytes(arr):
+    return int(getattr(arr, "nbytes", 0))
+
+
+def pixmap_bytes(pixmap):
+    return pixmap.width() * pixmap.height() * max(1, pixmap.depth()) // 8
+
+
+def annotations_bytes(annotations):
+    """Rough size of annotator items (dict + lists of floats)."""
+    return sum(400 + 120 * len(a.get('keypoints') or ()) for a in annotations)
+
+
+def model_bytes(model, path=""):
+    """Parameter + buffer bytes of a loaded ultralytics model (file size for exported engines)."""
+    try:
+        module = model.model
+        tensors = list(module.parameters()) + list(module.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+    except (AttributeError, TypeError):
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+
+default = MemoryBudget(int(float(os.getenv("MEMORY_BUDGET_MB", DEFAULT_BUDGET_MB)) * 2**20))
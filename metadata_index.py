@@ -0,0 +1,285 @@
+import os
+import sys
+import time
+import sqlite3
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import cv2
+from dotenv import load_dotenv
+
+from label_io import read_label_file
+import video_import
+
+# SQLite index of videos, frames and label files under RAW_DATA_DIR.
+#
+#   python metadata_index.py rebuild          -> incremental parallel scan (unchanged files are skipped)
+#   python metadata_index.py stats            -> per video / mode totals, in milliseconds
+#
+# The GUI keeps it current on save/delete; the scanner catches anything edited elsewhere.
+# Keys are paths relative to RAW_DATA_DIR (<video>/<mode>/labels/<stem>.txt), so the index
+# stays valid when the app works on a local cache of the folder.
+
+load_dotenv()
+
+# --- CONFIG ---
+RAW_DATA_DIR = os.path.abspath(os.getenv("RAW_DATA_DIR", "judo_datasetDONTDELETE"))
+DB_NAME = ".metadata_index.sqlite"
+MODES = ("pose", "detect")
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov")
+PARSE_CHUNK = 256
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    name TEXT PRIMARY KEY, path TEXT, frame_count INTEGER, fps REAL,
+    width INTEGER, height INTEGER, size INTEGER, mtime_ns INTEGER
+);
+CREATE TABLE IF NOT EXISTS labels (
+    key TEXT PRIMARY KEY, video TEXT, mode TEXT, stem TEXT, frame INTEGER,
+    lbl_size INTEGER, lbl_mtime INTEGER, img_size INTEGER, img_mtime INTEGER,
+    persons INTEGER, objects INTEGER, kpt_unlabeled INTEGER, kpt_occluded INTEGER, kpt_visible INTEGER
+);
+CREATE INDEX IF NOT EXISTS labels_video_mode ON labels (video, mode);
+"""
+
+
+def db_path(root=RAW_DATA_DIR):
+    return os.getenv("METADATA_DB") or os.path.join(root, DB_NAME)
+
+
+def connect(root=RAW_DATA_DIR):
+    conn = sqlite3.connect(db_path(root))
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def label_key(video, mode, stem):
+    return f"{video}/{mode}/labels/{stem}.txt"
+
+
+def frame_of(stem):
+    """Frame index from a <video>_<idx:06d> stem, or None."""
+    tail = stem.rsplit("_", 1)[-1]
+    return int(tail) if tail.isdigit() else None
+
+
+def summarize_label(path):
+    """(persons, objects, unlabeled, occluded, visible) for one label file."""
+    persons = objects = 0
+    vis = [0, 0, 0]
+    for _, _, kpts in read_label_file(path):
+        if kpts:
+            persons += 1
+            for _, _, v in kpts:
+                vis[min(max(int(v), 0), 2)] += 1
+        else:
+            objects += 1
+    return persons, objects, vis[0], vis[1], vis[2]
+
+
+def _summarize_chunk(paths):
+    out = []
+    for path in paths:
+        try:
+            out.append(summarize_label(path))
+        except (OSError, ValueError, IndexError):
+            out.append(None)   # Malformed label: indexed with no counts
+    return out
+
+
+# --- INCREMENTAL UPDATES (GUI) ---
+def update_label(conn, video, mode, label_path, image_path=None):
+    """Upserts one label (after a save). Missing files are removed from the index."""
+    stem = os.path.splitext(os.path.basename(label_path))[0]
+    key = label_key(video, mode, stem)
+    try:
+        lst = os.stat(label_path)
+        counts = summarize_label(label_path)
+    except (OSError, ValueError, IndexError):
+        remove_label(conn, video, mode, stem)
+        return
+    ist = os.stat(image_path) if image_path and os.path.exists(image_path) else None
+    conn.execute("INSERT OR REPLACE INTO labels VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
+                 (key, video, mode, stem, frame_of(stem), lst.st_size, lst.st_mtime_ns,
+                  ist.st_size if ist else None, ist.st_mtime_ns if ist else None) + tuple(counts))
+    conn.commit()
+
+
+def remove_label(conn, video, mode, stem):
+    conn.execute("DELETE FROM labels WHERE key = ?", (label_key(video, mode, stem),))
+    conn.commit()
+
+
+def locate(root, folder):
+    """(video, mode) if folder is <root>/<video>/<mode>[/images|labels], else None."""
+    rel = os.path.relpath(os.path.abspath(folder), root).replace("\\", "/").split("/")
+    if len(rel) in (2, 3) and rel[1] in MODES and rel[0] != "..":
+        return rel[0], rel[1]
+    return None
+
+
+# --- FULL SCAN ---
+def _scan(directory, ext):
+    found = {}
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(ext) and entry.is_file():
+                    st = entry.stat()
+                    found[entry.name[:-len(ext)]] = (entry.path, st.st_size, st.st_mtime_ns)
+    except OSError:
+        pass
+    return found
+
+
+def scan_videos(conn, root):
+    """Records every video in videos/ (and referenced imports); probes only new/changed files."""
+    videos_dir = os.path.join(root, "videos")
+    paths = {}
+    for ext in VIDEO_EXTENSIONS:
+        paths.update({name: path for name, (path, _, _) in _scan(videos_dir, ext).items()})
+    for name, info in video_import.load_index(videos_dir).items():
+        if name not in paths and os.path.exists(info.get("path", "")):
+            paths[name] = info["path"]
+
+    known = {row[0]: row[1:] for row in conn.execute("SELECT name, size, mtime_ns FROM videos")}
+    for name, path in paths.items():
+        st = os.stat(path)
+        if known.get(name) == (st.st_size, st.st_mtime_ns):
+            continue
+        cap = cv2.VideoCapture(path)
+        conn.execute("INSERT OR REPLACE INTO videos VALUES (?,?,?,?,?,?,?,?)",
+                     (name, path, int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), cap.get(cv2.CAP_PROP_FPS),
+                      int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                      st.st_size, st.st_mtime_ns))
+        cap.release()
+    for name in set(known) - set(paths):
+        conn.execute("DELETE FROM videos WHERE name = ?", (name,))
+    conn.commit()
+    return len(paths)
+
+
+def rebuild(root=RAW_DATA_DIR, workers=None, full=False):
+    """
+    Brings the index up to date with one scandir pass per folder. Labels whose size and
+    mtime are unchanged are skipped; changed ones are parsed in a process pool.
+    Returns (labels_total, labels_parsed).
+    """
+    conn = connect(root)
+    if full:
+        conn.execute("DELETE FROM labels")
+    scan_videos(conn, root)
+
+    known = {row[0]: row[1:] for row in conn.execute("SELECT key, lbl_size, lbl_mtime, img_size, img_mtime FROM labels")}
+    seen = set()
+    todo = []   # (key, video, mode, stem, label path, (lbl_size, lbl_mtime, img_size, img_mtime))
+    try:
+        videos = [e.name for e in os.scandir(root) if e.is_dir() and e.name != "videos"]
+    except OSError:
+        videos = []
+    for video in videos:
+        for mode in MODES:
+            labels = _scan(os.path.join(root, video, mode, "labels"), ".txt")
+            images = _scan(os.path.join(root, video, mode, "images"), ".jpg")
+            for stem, (path, size, mtime) in labels.items():
+                key = label_key(video, mode, stem)
+                seen.add(key)
+                img = images.get(stem)
+                stat = (size, mtime, img[1] if img else None, img[2] if img else None)
+                if known.get(key) != stat:
+                    todo.append((key, video, mode, stem, path, stat))
+
+    # Parse changed labels in parallel, chunked to amortize process overhead
+    paths = [t[4] for t in todo]
+    chunks = [paths[i:i + PARSE_CHUNK] for i in range(0, len(paths), PARSE_CHUNK)]
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            counts = [c for chunk in pool.map(_summarize_chunk, chunks) for c in chunk]
+    else:
+        counts = [c for chunk in map(_summarize_chunk, chunks) for c in chunk]
+
+    rows = [(key, video, mode, stem, frame_of(stem)) + stat + tuple(c or (0, 0, 0, 0, 0))
+            for (key, video, mode, stem, _, stat), c in zip(todo, counts)]
+    conn.executemany("INSERT OR REPLACE INTO labels VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)", rows)
+    stale = [(key,) for key in set(known) - seen]
+    conn.executemany("DELETE FROM labels WHERE key = ?", stale)
+    conn.commit()
+    conn.close()
+    return len(seen), len(rows)
+
+
+# --- QUERIES ---
+def stats(conn, video=None):
+    """Per (video, mode) rows: labeled frames, persons, objects, keypoint visibility totals, video frames."""
+    query = """
+        SELECT l.video, l.mode, COUNT(*), SUM(l.persons), SUM(l.objects),
+               SUM(l.kpt_unlabeled), SUM(l.kpt_occluded), SUM(l.kpt_visible), v.frame_count
+        FROM labels l LEFT JOIN videos v ON v.name = l.video
+        {where} GROUP BY l.video, l.mode ORDER BY l.video, l.mode
+    """
+    if video:
+        return conn.execute(query.format(where="WHERE l.video = ?"), (video,)).fetchall()
+    return conn.execute(query.format(where="")).fetchall()
+
+
+def format_stats(rows):
+    """Fixed-width table (CLI and GUI panel)."""
+    lines = [f"{'video':<28}{'mode':<8}{'frames':>8}{'of':>8}{'persons':>9}{'objects':>9}{'visible':>9}{'occluded':>9}{'unlab.':>8}"]
+    total = [0] * 6
+    for video, mode, frames, persons, objects, unl, occ, vis, frame_count in rows:
+        lines.append(f"{video[:27]:<28}{mode:<8}{frames:>8}{(frame_count or '?'):>8}{persons or 0:>9}"
+                     f"{objects or 0:>9}{vis or 0:>9}{occ or 0:>9}{unl or 0:>8}")
+        for i, v in enumerate((frames, persons, objects, vis, occ, unl)):
+            total[i] += v or 0
+    lines.append(f"{'TOTAL':<28}{'':<8}{total[0]:>8}{'':>8}{total[1]:>9}{total[2]:>9}{total[3]:>9}{total[4]:>9}{total[5]:>8}")
+    return "\n".join(lines)
+
+
+def indexed_pairs(root=RAW_DATA_DIR):
+    """
+    Image/label pairs from the index, in datasplitter.gather_pairs format:
+    (pairs keyed by image path relative to root, image_count).
+    """
+    conn = connect(root)
+    rows = conn.execute("SELECT video, mode, stem, img_size, img_mtime, lbl_size, lbl_mtime "
+                        "FROM labels WHERE img_size IS NOT NULL ORDER BY key").fetchall()
+    conn.close()
+    pairs = {}
+    for video, mode, stem, img_size, img_mtime, lbl_size, lbl_mtime in rows:
+        key = f"{video}/{mode}/images/{stem}.jpg"
+        pairs[key] = {"img": os.path.join(root, video, mode, "images", stem + ".jpg"),
+                      "lbl": os.path.join(root, video, mode, "labels", stem + ".txt"),
+                      "img_size": img_size, "img_mtime": img_mtime,
+                      "lbl_size": lbl_size, "lbl_mtime": lbl_mtime}
+    return pairs, len(pairs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite metadata index of RAW_DATA_DIR.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_rebuild = sub.add_parser("rebuild", help="Scan RAW_DATA_DIR and update the index")
+    p_rebuild.add_argument("--workers", type=int, default=None)
+    p_rebuild.add_argument("--full", action="store_true", help="Re-parse every label, not just changed ones")
+    p_stats = sub.add_parser("stats", help="Per video / mode totals")
+    p_stats.add_argument("--video", default=None)
+    args = parser.parse_args()
+
+    if not os.path.isdir(RAW_DATA_DIR):
+        print(f"❌ Error: RAW_DATA_DIR not found: {RAW_DATA_DIR}")
+        sys.exit(1)
+
+    if args.command == "rebuild":
+        start = time.perf_counter()
+        total, parsed = rebuild(RAW_DATA_DIR, args.workers, args.full)
+        print(f"✅ Indexed {total} labels ({parsed} parsed) in {time.perf_counter() - start:.2f}s -> {db_path()}")
+    else:
+        start = time.perf_counter()
+        conn = connect(RAW_DATA_DIR)
+        rows = stats(conn, args.video)
+        conn.close()
+        print(format_stats(rows))
+        print(f"({(time.perf_counter() - start) * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import threading
+
+# Deferred torch / ultralytics imports.
+# Importing ultralytics pulls in torch, torchvision and friends, which takes seconds.
+# The GUI only needs them once a model is loaded (never in plain review mode), so nothing
+# here touches them until asked. preload() warms the import in a background thread after
+# the window is up, so the first "Load Model" click does not pay for it either.
+
+_lock = threading.Lock()
+_modules = {}
+_preload_thread = None
+
+
+def _import():
+    """Imports torch + ultralytics once (thread-safe) and returns the module dict."""
+    with _lock:
+        if not _modules:
+            import torch
+            from ultralytics import YOLO
+            _modules["torch"] = torch
+            _modules["YOLO"] = YOLO
+    return _modules
+
+
+def preload():
+    """Starts importing torch/ultralytics in a daemon thread. Safe to call repeatedly."""
+    global _preload_thread
+    if _modules or _preload_thread is not None:
+        return
+    _preload_thread = threading.Thread(target=_preload, daemon=True)
+    _preload_thread.start()
+
+
+def _preload():
+    try:
+        _import()
+    except Exception as e:
+        # Not fatal: the real load will raise the same error where it can be shown
+        print(f"⚠️ Warning: Background model import failed: {e}")
+
+
+def is_ready():
+    """True once torch/ultralytics are imported."""
+    return bool(_modules)
+
+
+def torch():
+    """The torch module (imports it on first use, waiting for a running preload)."""
+    return _import()["torch"]
+
+
+def yolo(path):
+    """Loads a YOLO model (ultralytics is imported on first use)."""
+    return _import()["YOLO"](path)
+
+
+def cuda_available():
+    return torch().cuda.is_available()
@@ -0,0 +1,123 @@
+import os
+import numpy as np
+import cv2
+
+# Per-frame motion / scene-change scores for a video, stored in a sidecar next to it:
+#   <video>.motion.npz  ->  motion (N,), scene (N,), signature
+#
+# motion[i]: mean absolute difference between frame i and i-1 on a small grayscale copy (0-1)
+# scene[i]:  histogram distance between frame i and i-1 (Bhattacharyya, 0-1); spikes at cuts
+
+ANALYSIS_WIDTH = 160      # Frames are downscaled to this width before differencing
+SCENE_CUT = 0.4           # scene score above this is treated as a cut
+DISTINCT_CHANGE = 0.05    # Accumulated motion that makes a frame "distinct" from the last one
+SIDECAR_SUFFIX = ".motion.npz"
+
+
+def sidecar_path(video_path):
+    return video_path + SIDECAR_SUFFIX
+
+
+def _signature(video_path):
+    st = os.stat(video_path)
+    return np.array([st.st_size, st.st_mtime_ns], dtype=np.int64)
+
+
+def load_sidecar(video_path):
+    """Returns (motion, scene) if a sidecar for this exact file exists, else None."""
+    try:
+        data = np.load(sidecar_path(video_path))
+        if np.array_equal(data["signature"], _signature(video_path)):
+            return data["motion"], data["scene"]
+    except (OSError, KeyError, ValueError):
+        pass
+    return None
+
+
+def compute_motion_scores(video_path, progress=None, stop_event=None):
+    """
+    Decodes the video once, sequentially (no seeking), and scores every frame.
+    Args:
+        progress (callable): Optional progress(fraction) hook.
+        stop_event (threading.Event): Aborts the pass when set; returns None.
+    Returns:
+        (motion, scene) float32 arrays, also written to the sidecar.
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError("Could not open video file")
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    motion = np.zeros(max(total, 0), dtype=np.float32)
+    scene = np.zeros(max(total, 0), dtype=np.float32)
+
+    prev_small = None
+    prev_hist = None
+    idx = 0
+    try:
+        while True:
+            if stop_event is not None and stop_event.is_set():
+                return None
+            ok, frame = cap.read()
+            if not ok:
+                break
+            h, w = frame.shape[:2]
+            small = cv2.resize(frame, (ANALYSIS_WIDTH, max(1, h * ANALYSIS_WIDTH // w)), interpolation=cv2.INTER_AREA)
+            gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+            hist = cv2.calcHist([gray], [0], None, [32], [0, 256])
+            cv2.normalize(hist, hist)
+
+            if idx >= len(motion):
+                # Container frame counts can be wrong; grow as needed
+                motion = np.append(motion, np.zeros(256, np.float32))
+                scene = np.append(scene, np.zeros(256, np.float32))
+            if prev_small is not None:
+                motion[idx] = cv2.absdiff(gray, prev_small).mean() / 255.0
+                scene[idx] = cv2.compareHist(prev_hist, hist, cv2.HISTCMP_BHATTACHARYYA)
+            prev_small, prev_hist = gray, hist
+            idx += 1
+            if progress and idx % 100 == 0 and total > 0:
+                progress(min(1.0, idx / total))
+    finally:
+        cap.release()
+
+    motion, scene = motion[:idx], scene[:idx]
+    try:
+        np.savez(sidecar_path(video_path), motion=motion, scene=scene, signature=_signature(video_path))
+    except OSError as e:
+        print(f"⚠️ Warning: Could not write motion sidecar: {e}")
+    if progress:
+        progress(1.0)
+    return motion, scene
+
+
+def motion_threshold(motion, percentile=75):
+    """Adaptive 'high motion' level for a video: its own upper quartile of frame differences."""
+    if len(motion) == 0:
+        return 0.0
+    return float(np.percentile(motion, percentile))
+
+
+def next_high_motion(motion, scene, idx, threshold=None):
+    """First frame after idx that is a scene cut or has motion above threshold (None if none)."""
+    if threshold is None:
+        threshold = motion_threshold(motion)
+    # Skip the current burst of motion first, so repeated presses jump between actions
+    start = idx + 1
+    calm = np.flatnonzero(motion[start:] <= threshold)
+    start = start + int(calm[0]) if len(calm) else len(motion)
+    hits = np.flatnonzero((motion[start:] > threshold) | (scene[start:] > SCENE_CUT))
+    return int(start + hits[0]) if len(hits) else None
+
+
+def next_distinct_frame(motion, idx, min_change=DISTINCT_CHANGE, steps=1):
+    """
+    Frame after idx where the accumulated motion since the last pick reaches min_change,
+    repeated `steps` times ("every Nth distinct frame"). None if the video ends first.
+    """
+    for _ in range(steps):
+        cumulative = np.cumsum(motion[idx + 1:])
+        hits = np.flatnonzero(cumulative >= min_change)
+        if not len(hits):
+            return None
+        idx = idx + 1 + int(hits[0])
+    return idx
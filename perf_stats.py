@@ -0,0 +1,143 @@
+import os
+import csv
+import json
+import time
+import atexit
+import functools
+from collections import deque
+import numpy as np
+
+# Lightweight per-stage latency recording for the frame pipeline.
+#
+#   PERF_STATS=1 python main.py                 -> record from startup (P toggles the overlay)
+#   PERF_STATS_OUT=perf.json python main.py     -> also dump at exit (.json or .csv)
+#
+# Each stage keeps its last WINDOW samples (rolling p50/p95/max) plus lifetime count/max.
+# When disabled, a timed call costs one flag check and start()/stop() return immediately.
+
+WINDOW = 500
+
+_enabled = os.getenv("PERF_STATS", "0") == "1"
+_stats = {}
+_dump_registered = False
+
+
+class StageStats:
+    def __init__(self):
+        self.samples = deque(maxlen=WINDOW)   # seconds
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def summary(self):
+        """Milliseconds: rolling p50/p95/max over the window, lifetime count/mean/max."""
+        window = np.fromiter(self.samples, dtype=np.float64) * 1000.0
+        p50, p95 = np.percentile(window, [50, 95]) if len(window) else (0.0, 0.0)
+        return {
+            "count": self.count,
+            "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3),
+            "window_max_ms": round(float(window.max()) if len(window) else 0.0, 3),
+            "mean_ms": round(self.total * 1000.0 / max(self.count, 1), 3),
+            "max_ms": round(self.max * 1000.0, 3),
+        }
+
+
+def enabled():
+    return _enabled
+
+
+def enable(on=True):
+    global _enabled
+    _enabled = on
+
+
+def reset():
+    _stats.clear()
+
+
+def record(stage, seconds):
+    stats = _stats.get(stage)
+    if stats is None:
+        stats = _stats[stage] = StageStats()
+    stats.add(seconds)
+
+
+def start():
+    """Start timestamp for stop(), or None while disabled."""
+    return time.perf_counter() if _enabled else None
+
+
+def stop(stage, t0):
+    """Records the time since start(). No-op if recording was off at start()."""
+    if t0 is not None:
+        record(stage, time.perf_counter() - t0)
+
+
+def timed(stage):
+    """Decorator recording the wrapped call's latency under `stage`."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(stage, time.perf_counter() - t0)
+        return wrapper
+    return decorate
+
+
+def summary():
+    """{stage: summary dict}, sorted by stage name."""
+    return {stage: _stats[stage].summary() for stage in sorted(_stats)}
+
+
+def format_table():
+    """Fixed-width text table for the on-screen overlay."""
+    rows = [f"{'stage':<22}{'p50':>8}{'p95':>8}{'max':>8}{'n':>7}"]
+    for stage, s in summary().items():
+        rows.append(f"{stage:<22}{s['p50_ms']:>8.2f}{s['p95_ms']:>8.2f}{s['window_max_ms']:>8.2f}{s['count']:>7}")
+    if len(rows) == 1:
+        rows.append("(no samples yet)")
+    return "\n".join(rows)
+
+
+def dump(path):
+    """Writes the summary as JSON, or CSV if path ends in .csv."""
+    data = summary()
+    if path.lower().endswith(".csv"):
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            fields = ["count", "p50_ms", "p95_ms", "window_max_ms", "mean_ms", "max_ms"]
+            writer.writerow(["stage"] + fields)
+            for stage, s in data.items():
+                writer.writerow([stage] + [s[k] for k in fields])
+    else:
+        with open(path, "w") as f:
+            json.dump({"window": WINDOW, "stages": data}, f, indent=2)
+
+
+def dump_at_exit(path=None):
+    """Registers a dump to path (default: $PERF_STATS_OUT) when the process exits."""
+    global _dump_registered
+    path = path or os.getenv("PERF_STATS_OUT")
+    if not path or _dump_registered:
+        return
+    _dump_registered = True
+
+    def _dump():
+        if _stats:
+            dump(path)
+            print(f"⏱️ Perf stats written to {path}")
+
+    atexit.register(_dump)
@@ -0,0 +1,228 @@
+import os
+import sys
+import csv
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import cv2
+from dotenv import load_dotenv
+
+from pose_metrics import keypoint_similarity, box_iou, match_pairs
+from label_io import result_pose_arrays
+
+# Main vs base model comparison.
+#
+# Both models run on the same frame at once (two threads; torch releases the GIL while
+# it computes). Persons are matched one-to-one by OKS (Hungarian if scipy is installed),
+# falling back to box IoU for persons without confident keypoints. A keypoint disagrees
+# when 1 - its OKS term is above THRESHOLD; only keypoints both models are confident
+# about are compared.
+#
+# The GUI draws the base model as a ghost layer and marks disagreeing keypoints. The batch
+# version collects per-keypoint statistics over a whole video:
+#
+#   python pose_compare.py videos/match1.mp4 --main Models/best.pt --base Models/yolo26n-pose.pt --stride 5
+
+load_dotenv()
+
+# --- CONFIG ---
+THRESHOLD = 0.5           # Keypoint disagreement (1 - OKS term) above this is highlighted / counted
+KPT_CONF = 0.5            # Both models must be at least this confident for a keypoint to be compared
+MIN_MATCH = 0.1           # Matches below this similarity count as unmatched persons
+BATCH_SIZE = 8
+STRIDE = 5
+
+_pool = None
+
+
+def predict_pair(main_model, base_model, images, **kwargs):
+    """Runs both models on the same image(s) concurrently. Returns (main_results, base_results)."""
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=2)
+    base_future = _pool.submit(base_model, images, verbose=False, **kwargs)
+    main_results = main_model(images, verbose=False, **kwargs)
+    return main_results, base_future.result()
+
+
+def compare_arrays(main, base, image_size, threshold=THRESHOLD, kpt_conf=KPT_CONF):
+    """
+    Matches persons and computes per-keypoint disagreement, fully vectorized.
+    Args:
+        main, base: (boxes (N, 4), keypoints (N, K, 3) with confidence) per model.
+        image_size (w, h): Frame size, so OKS distances are in pixels.
+    Returns:
+        dict with matches [(main_idx, base_idx)], disagreement (P, K) (NaN where a keypoint
+        isn't confident in both), over (P, K) bool, and main_only / base_only person counts.
+    """
+    main_boxes, main_kpts = main
+    base_boxes, base_kpts = base
+    n, m = len(main_kpts), len(base_kpts)
+    k = main_kpts.shape[1] if n else base_kpts.shape[1]
+
+    similarity = keypoint_similarity(main_kpts, main_boxes, base_kpts, image_size)   # (N, M, K)
+    both = (main_kpts[:, None, :, 2] >= kpt_conf) & (base_kpts[None, :, :, 2] >= kpt_conf)
+    counted = both.sum(-1)
+    oks = np.where(counted > 0, (similarity * both).sum(-1) / np.maximum(counted, 1), 0.0)
+    # Persons without confident keypoints in common can still be matched by their boxes
+    oks = np.where(counted > 0, oks, box_iou(main_boxes, base_boxes) * 0.5)
+
+    matches = match_pairs(oks, MIN_MATCH)
+    rows = np.array([r for r, _ in matches], dtype=np.int64)
+    cols = np.array([c for _, c in matches], dtype=np.int64)
+    disagreement = np.where(both[rows, cols], 1.0 - similarity[rows, cols], np.nan).reshape(len(matches), k)
+    return {
+        "matches": matches,
+        "oks": oks[rows, cols] if matches else np.zeros(0, dtype=np.float32),
+        "disagreement": disagreement,
+        "over": np.nan_to_num(disagreement, nan=0.0) > threshold,
+        "main_only": n - len(matches),
+        "base_only": m - len(matches),
+    }
+
+
+def disagreement_markers(main, base, comparison):
+    """[(main_x, main_y, base_x, base_y)] normalized, one per keypoint over the threshold."""
+    markers = []
+    for p, k in zip(*np.nonzero(comparison["over"])):
+        i, j = comparison["matches"][p]
+        markers.append((float(main[1][i, k, 0]), float(main[1][i, k, 1]),
+                        float(base[1][j, k, 0]), float(base[1][j, k, 1])))
+    return markers
+
+
+# --- BATCH ---
+class KeypointStats:
+    """Accumulates per-keypoint disagreement over many frames."""
+
+    def __init__(self, num_kpts, threshold=THRESHOLD):
+        self.threshold = threshold
+        self.values = [[] for _ in range(num_kpts)]
+        self.frames = 0
+        self.matched = 0
+        self.main_only = 0
+        self.base_only = 0
+        self.oks = []
+
+    def add(self, comparison):
+        self.frames += 1
+        self.matched += len(comparison["matches"])
+        self.main_only += comparison["main_only"]
+        self.base_only += comparison["base_only"]
+        self.oks.extend(comparison["oks"].tolist())
+        d = comparison["disagreement"]
+        for k in range(d.shape[1]):
+            col = d[:, k]
+            self.values[k].extend(col[~np.isnan(col)].tolist())
+
+    def rows(self, names):
+        rows = []
+        for name, values in zip(names, self.values):
+            v = np.asarray(values, dtype=np.float32)
+            rows.append({
+                "keypoint": name,
+                "pairs": len(v),
+                "mean": round(float(v.mean()), 4) if len(v) else "",
+                "p50": round(float(np.percentile(v, 50)), 4) if len(v) else "",
+                "p90": round(float(np.percentile(v, 90)), 4) if len(v) else "",
+                "over_threshold": round(float((v > self.threshold).mean()), 4) if len(v) else "",
+            })
+        return rows
+
+
+def compare_video(video_path, main_model, base_model, stride=STRIDE, batch_size=BATCH_SIZE,
+                  threshold=THRESHOLD, progress=None):
+    """Compares both models on every stride-th frame (decoded sequentially). Returns KeypointStats."""
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise OSError(f"Could not open video: {video_path}")
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    stats = None
+    batch = []
+
+    def flush():
+        nonlocal stats
+        main_results, base_results = predict_pair(main_model, base_model, batch)
+        for img, main_result, base_result in zip(batch, main_results, base_results):
+            h, w = img.shape[:2]
+            main, base = result_pose_arrays(main_result), result_pose_arrays(base_result)
+            if stats is None:
+                stats = KeypointStats(main[1].shape[1], threshold)
+            stats.add(compare_arrays(main, base, (w, h), threshold))
+        batch.clear()
+
+    idx = 0
+    while True:
+        if idx % stride:
+            if not cap.grab():
+                break
+        else:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            batch.append(frame)
+            if len(batch) >= batch_size:
+                flush()
+                if progress:
+                    progress(idx + 1, total)
+        idx += 1
+    if batch:
+        flush()
+    cap.release()
+    return stats
+
+
+def main():
+    from annotator import KEYPOINT_NAMES
+    from ultralytics import YOLO
+
+    parser = argparse.ArgumentParser(description="Per-keypoint disagreement between two pose models over a video.")
+    parser.add_argument("video", help="Video file")
+    parser.add_argument("--main", default=os.getenv("MODEL_NANO_PATH", "yolo26n-pose.pt"), help="Fine-tuned weights")
+    parser.add_argument("--base", default="Models/yolo26n-pose.pt", help="Base weights to compare against")
+    parser.add_argument("--stride", type=int, default=STRIDE, help="Compare every Nth frame")
+    parser.add_argument("--batch", type=int, default=BATCH_SIZE, help="Frames per inference call")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="Disagreement counted as 'over'")
+    parser.add_argument("--out", default=None, help="CSV path (default: <video>.compare.csv)")
+    args = parser.parse_args()
+
+    for path in (args.video, args.main, args.base):
+        if not os.path.exists(path):
+            print(f"❌ Error: Not found: {path}")
+            sys.exit(1)
+
+    start = time.perf_counter()
+    main_model, base_model = YOLO(args.main), YOLO(args.base)
+
+    def progress(done, total):
+        print(f"\r   {done}/{total} frames", end="", flush=True)
+
+    stats = compare_video(args.video, main_model, base_model, max(1, args.stride), args.batch,
+                          args.threshold, progress)
+    print()
+    if stats is None:
+        print("❌ Error: No frames could be read.")
+        sys.exit(1)
+
+    rows = stats.rows(KEYPOINT_NAMES)
+    out = args.out or os.path.splitext(args.video)[0] + ".compare.csv"
+    with open(out, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+    persons = stats.matched + stats.main_only + stats.base_only
+    print(f"✅ {stats.frames} frames in {time.perf_counter() - start:.1f}s | persons matched {stats.matched}/{persons} "
+          f"(main only {stats.main_only}, base only {stats.base_only}) | mean OKS "
+          f"{np.mean(stats.oks) if stats.oks else 0:.3f}")
+    print(f"   {'keypoint':<12}{'pairs':>8}{'mean':>8}{'p90':>8}{'>thr':>8}")
+    for row in rows:
+        if row["pairs"]:
+            print(f"   {row['keypoint']:<12}{row['pairs']:>8}{row['mean']:>8.3f}{row['p90']:>8.3f}"
+                  f"{row['over_threshold']:>8.1%}")
+    print(f"   -> {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import numpy as np
+
+# Vectorized agreement metrics between two sets of persons/objects.
+# Boxes are (N, 4) xywh (center format), keypoints are (N, K, 3) x, y, visibility.
+
+# COCO per-keypoint falloff constants (same order as annotator.KEYPOINT_NAMES)
+COCO_SIGMAS = np.array([
+    .26, .25, .25, .35, .35, .79, .79, .72, .72, .62, .62,
+    1.07, 1.07, .87, .87, .89, .89
+], dtype=np.float32) / 10.0
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:  # scipy is optional; fall back to greedy matching
+    linear_sum_assignment = None
+
+
+def xywh_to_xyxy(boxes):
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    half_w = boxes[:, 2] / 2
+    half_h = boxes[:, 3] / 2
+    return np.stack([boxes[:, 0] - half_w, boxes[:, 1] - half_h,
+                     boxes[:, 0] + half_w, boxes[:, 1] + half_h], axis=1)
+
+
+def box_iou(boxes_a, boxes_b):
+    """Pairwise IoU between (N, 4) and (M, 4) xywh boxes. Returns (N, M)."""
+    a = xywh_to_xyxy(boxes_a)[:, None, :]
+    b = xywh_to_xyxy(boxes_b)[None, :, :]
+    inter_w = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    inter_h = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = inter_w * inter_h
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    union = area_a + area_b - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-12), 0.0).astype(np.float32)
+
+
+def keypoint_similarity(kpts_gt, boxes_gt, kpts_pred, image_size=(1, 1), sigmas=COCO_SIGMAS):
+    """
+    Pairwise per-keypoint OKS terms exp(-d^2 / (2 s^2 k^2)), before averaging.
+    Args:
+        kpts_gt (N, K, 2+): Reference keypoints.
+        boxes_gt (N, 4): Reference boxes, used for the object scale.
+        kpts_pred (M, K, 2+): Predicted keypoints.
+        image_size (w, h): Converts normalized coordinates to pixels so x/y distances are comparable.
+    Returns:
+        (N, M, K) similarity in [0, 1] for the first K = len(sigmas) keypoints.
+    """
+    kpts_gt = np.asarray(kpts_gt, dtype=np.float32)
+    kpts_pred = np.asarray(kpts_pred, dtype=np.float32)
+    k = len(sigmas)
+    n, m = len(kpts_gt), len(kpts_pred)
+    if n == 0 or m == 0:
+        return np.zeros((n, m, k), dtype=np.float32)
+
+    scale = np.array(image_size, dtype=np.float32)
+    gt_xy = kpts_gt[..., :2] * scale
+    pred_xy = kpts_pred[..., :2] * scale
+    boxes_gt = np.asarray(boxes_gt, dtype=np.float32).reshape(-1, 4)
+    area = boxes_gt[:, 2] * scale[0] * boxes_gt[:, 3] * scale[1]
+
+    d2 = ((gt_xy[:, None, :k, :] - pred_xy[None, :, :k, :]) ** 2).sum(-1)  # (N, M, K)
+    var = (2 * sigmas) ** 2
+    e = d2 / (2 * var[None, None, :] * (area[:, None, None] + np.finfo(np.float32).eps))
+    return np.exp(-e).astype(np.float32)
+
+
+def oks_matrix(kpts_gt, boxes_gt, kpts_pred, image_size=(1, 1), sigmas=COCO_SIGMAS):
+    """
+    Pairwise Object Keypoint Similarity.
+    Args:
+        kpts_gt (N, K, 3): Reference keypoints (visibility > 0 marks labeled joints).
+        boxes_gt (N, 4): Reference boxes, used for the object scale.
+        kpts_pred (M, K, 2+): Predicted keypoints.
+        image_size (w, h): Converts normalized coordinates to pixels so x/y distances are comparable.
+    Returns:
+        (N, M) OKS in [0, 1]. References with no labeled joints score 0.
+    """
+    kpts_gt = np.asarray(kpts_gt, dtype=np.float32)
+    n, m = len(kpts_gt), len(kpts_pred)
+    if n == 0 or m == 0:
+        return np.zeros((n, m), dtype=np.float32)
+
+    k = len(sigmas)
+    similarity = keypoint_similarity(kpts_gt, boxes_gt, kpts_pred, image_size, sigmas)
+    mask = (kpts_gt[:, None, :k, 2] > 0).astype(np.float32)
+    labeled = mask.sum(-1)
+    return np.where(labeled > 0, (similarity * mask).sum(-1) / np.maximum(labeled, 1), 0.0).astype(np.float32)
+
+
+def match_pairs(similarity, min_similarity=0.0):
+    """
+    One-to-one assignment maximizing total similarity (Hungarian if scipy is
+    installed, greedy otherwise).
+    Returns a list of (row, col) with similarity > min_similarity.
+    """
+    similarity = np.asarray(similarity, dtype=np.float32)
+    if similarity.size == 0:
+        return []
+    if linear_sum_assignment is not None:
+        rows, cols = linear_sum_assignment(-similarity)
+        pairs = zip(rows.tolist(), cols.tolist())
+    else:
+        pairs = []
+        sim = similarity.copy()
+        for _ in range(min(sim.shape)):
+            r, c = np.unravel_index(np.argmax(sim), sim.shape)
+            if sim[r, c] <= min_similarity:
+                break
+            pairs.append((int(r), int(c)))
+            sim[r, :] = -np.inf
+            sim[:, c] = -np.inf
+    return [(r, c) for r, c in pairs if similarity[r, c] > min_similarity]
+
+
+def frame_agreement(similarity):
+    """
+    Collapses a similarity matrix into one per-frame agreement in [0, 1]:
+    matched similarities summed over max(N, M), so missing or extra instances count as 0.
+    Two empty sets agree perfectly.
+    """
+    n, m = similarity.shape
+    if n == 0 and m == 0:
+        return 1.0
+    matches = match_pairs(similarity)
+    return float(sum(similarity[r, c] for r, c in matches) / max(n, m))
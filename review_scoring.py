@@ -0,0 +1,239 @@
+import os
+import sys
+import json
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from label_io import load_label_arrays
+from pose_metrics import box_iou, oks_matrix, frame_agreement
+
+# --- CONFIG ---
+SCORES_NAME = ".review_scores.json"
+BATCH_SIZE = 16
+LOW_CONF_WEIGHT = 0.5   # How much (1 - mean confidence) adds to the disagreement
+
+
+def scores_path(images_dir):
+    return os.path.join(os.path.dirname(os.path.abspath(images_dir)), SCORES_NAME)
+
+
+def model_identity(model_path):
+    """Scores are only reusable for the exact same weights file."""
+    try:
+        return f"{os.path.abspath(model_path)}@{os.stat(model_path).st_mtime_ns}"
+    except OSError:
+        return os.path.abspath(model_path)
+
+
+def load_scores(images_dir, model_id):
+    """Returns {stem: score_dict} from the cache, or {} if it belongs to another model."""
+    try:
+        with open(scores_path(images_dir), "r") as f:
+            cache = json.load(f)
+        if cache.get("model") == model_id:
+            return cache.get("scores", {})
+    except (OSError, ValueError):
+        pass
+    return {}
+
+
+def save_scores(images_dir, model_id, scores):
+    path = scores_path(images_dir)
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump({"model": model_id, "scores": scores}, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️ Warning: Could not write review scores: {e}")
+
+
+def label_mtime(label_path):
+    try:
+        return os.stat(label_path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def stale_pairs(pairs, scores, mtimes=None):
+    """
+    Pairs whose label has no score or was edited since it was scored.
+    mtimes: {stem: label mtime_ns} from the folder scan (dataset_scan.load_label_mtimes);
+    labels missing from it are stat'ed.
+    """
+    mtimes = mtimes or {}
+    stale = []
+    for img_path, txt_path in pairs:
+        stem = os.path.splitext(os.path.basename(txt_path))[0]
+        entry = scores.get(stem)
+        if entry is None:
+            stale.append((img_path, txt_path))
+            continue
+        mtime = mtimes[stem] if stem in mtimes else label_mtime(txt_path)
+        if entry.get("label_mtime") != mtime:
+            stale.append((img_path, txt_path))
+    return stale
+
+
+def score_result(result, txt_path):
+    """
+    Compares one ultralytics result against the saved label file.
+    Pose models are compared by OKS, detect models by class-aware box IoU.
+    """
+    h, w = result.orig_shape[:2]
+    classes, boxes, kpts = load_label_arrays(txt_path)
+
+    if result.keypoints is not None:
+        pred_kpts = result.keypoints.xyn.cpu().numpy()
+        conf = result.keypoints.conf
+        pred_conf = conf.cpu().numpy() if conf is not None else np.ones(pred_kpts.shape[:2], dtype=np.float32)
+        similarity = oks_matrix(kpts, boxes, pred_kpts, image_size=(w, h))
+    else:
+        pred_boxes = result.boxes.xywhn.cpu().numpy()
+        pred_cls = result.boxes.cls.cpu().numpy().astype(np.int32)
+        pred_conf = result.boxes.conf.cpu().numpy()
+        similarity = box_iou(boxes, pred_boxes) * (classes[:, None] == pred_cls[None, :])
+
+    disagreement = 1.0 - frame_agreement(similarity)
+    # No detections at all is treated as zero confidence
+    mean_conf = float(pred_conf.mean()) if pred_conf.size else 0.0
+    return {
+        "label_mtime": label_mtime(txt_path),
+        "disagreement": round(disagreement, 4),
+        "confidence": round(mean_conf, 4),
+        "priority": round(disagreement + LOW_CONF_WEIGHT * (1.0 - mean_conf), 4),
+    }
+
+
+def score_pairs(model, pairs, batch_size=BATCH_SIZE, progress=None):
+    """
+    Runs the model over pairs in batches and scores each frame.
+    Args:
+        model: A loaded ultralytics YOLO model.
+        pairs (list): (image_path, label_path) tuples.
+        progress (callable): Optional progress(done, total) hook, called per batch.
+    Returns:
+        {stem: score_dict}
+    """
+    scores = {}
+    for start in range(0, len(pairs), batch_size):
+        batch = pairs[start:start + batch_size]
+        results = model([img for img, _ in batch], verbose=False)
+        for (img_path, txt_path), result in zip(batch, results):
+            stem = os.path.splitext(os.path.basename(txt_path))[0]
+            try:
+                scores[stem] = score_result(result, txt_path)
+            except Exception as e:
+                print(f"⚠️ Warning: Could not score {stem}: {e}")
+        if progress:
+            progress(min(start + batch_size, len(pairs)), len(pairs))
+    return scores
+
+
+def rank_pairs(pairs, scores):
+    """Sorts pairs worst-first by priority; unscored pairs keep their order at the end."""
+    def key(pair):
+        stem = os.path.splitext(os.path.basename(pair[1]))[0]
+        entry = scores.get(stem)
+        return (0, -entry["priority"]) if entry else (1, 0)
+    return sorted(pairs, key=key)
+
+
+# --- MULTI-PROCESS HEADLESS SCORING ---
+_worker_model = None
+_worker_batch = BATCH_SIZE
+
+
+def _init_worker(model_path, threads, batch_size):
+    global _worker_model, _worker_batch
+    import torch
+    from ultralytics import YOLO
+    # Bound intra-op threads so N workers don't oversubscribe the CPU
+    torch.set_num_threads(threads)
+    _worker_model = YOLO(model_path)
+    _worker_batch = batch_size
+
+
+def _score_chunk(pairs):
+    return score_pairs(_worker_model, pairs, batch_size=_worker_batch)
+
+
+def score_pairs_pooled(model_path, pairs, workers=None, batch_size=BATCH_SIZE, chunk_size=256, on_chunk=None):
+    """
+    Scores pairs in a pool of worker processes, each with its own model instance.
+    Args:
+        on_chunk (callable): Optional on_chunk(chunk_scores, done, total) per finished chunk
+                             (called from this thread, e.g. to checkpoint or report progress).
+    Returns:
+        {stem: score_dict}
+    """
+    workers = workers or max(1, (os.cpu_count() or 1) // 2)
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    chunks = [pairs[i:i + chunk_size] for i in range(0, len(pairs), chunk_size)]
+
+    scores = {}
+    done = 0
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks)) or 1, initializer=_init_worker,
+                             initargs=(model_path, threads, batch_size)) as pool:
+        futures = [pool.submit(_score_chunk, chunk) for chunk in chunks]
+        for future in as_completed(futures):
+            chunk_scores = future.result()
+            scores.update(chunk_scores)
+            done += 1
+            if on_chunk:
+                on_chunk(chunk_scores, done, len(chunks))
+    return scores
+
+
+def score_folder(folder, model_path, workers=None, batch_size=BATCH_SIZE, chunk_size=256):
+    """
+    Scores every stale pair in a dataset folder using a pool of worker processes,
+    each with its own model instance. Results are merged into the score cache.
+    """
+    from dataset_scan import iter_review_pairs, load_label_mtimes
+
+    images_dir = os.path.join(folder, "images")
+    labels_dir = os.path.join(folder, "labels")
+    pairs = [pair for chunk in iter_review_pairs(images_dir, labels_dir) for pair in chunk]
+
+    model_id = model_identity(model_path)
+    scores = load_scores(images_dir, model_id)
+    todo = stale_pairs(pairs, scores, load_label_mtimes(images_dir, labels_dir))
+    print(f"Found {len(pairs)} pairs, {len(todo)} need scoring.")
+    if not todo:
+        return scores
+
+    def checkpoint(chunk_scores, done, total):
+        # Checkpoint so an interrupted run keeps finished work
+        scores.update(chunk_scores)
+        save_scores(images_dir, model_id, scores)
+        print(f"   Scored chunk {done}/{total}")
+
+    score_pairs_pooled(model_path, todo, workers=workers, batch_size=batch_size, chunk_size=chunk_size,
+                       on_chunk=checkpoint)
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank review frames by model disagreement (worst first).")
+    parser.add_argument("folder", help="Dataset folder containing images/ and labels/")
+    parser.add_argument("--model", required=True, help="Path to YOLO weights (.pt)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: half the cores)")
+    parser.add_argument("--batch", type=int, default=BATCH_SIZE, help="Images per inference batch")
+    parser.add_argument("--top", type=int, default=20, help="How many of the worst frames to print")
+    args = parser.parse_args()
+
+    if not os.path.isdir(os.path.join(args.folder, "images")):
+        print("❌ Error: Folder must contain 'images' and 'labels' subdirectories.")
+        sys.exit(1)
+
+    scores = score_folder(args.folder, args.model, workers=args.workers, batch_size=args.batch)
+    worst = sorted(scores.items(), key=lambda kv: -kv[1]["priority"])[:args.top]
+    print(f"✅ Scored {len(scores)} frames. Worst {len(worst)}:")
+    for stem, entry in worst:
+        print(f"   {entry['priority']:.3f}  disagree={entry['disagreement']:.3f}  conf={entry['confidence']:.3f}  {stem}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+import os
+import json
+import glob
+import numpy as np
+import cv2
+
+from label_io import load_label_arrays, NUM_KEYPOINTS
+
+# Packed dataset layout (one folder per split):
+#
+#   <root>/<split>/images.bin        concatenated, untouched JPEG bytes
+#   <root>/<split>/image_offsets.npy (N+1,) int64 byte offsets into images.bin
+#   <root>/<split>/image_shapes.npy  (N, 2) int32 original (h, w)
+#   <root>/<split>/label_offsets.npy (N+1,) int64 row offsets into the label arrays
+#   <root>/<split>/classes.npy       (M,) int32
+#   <root>/<split>/boxes.npy         (M, 4) float32 normalized xywh
+#   <root>/<split>/keypoints.npy     (M, 17, 3) float32 normalized x, y, visibility
+#   <root>/<split>/names.json        image stems, in order
+#   <root>/<split>/source.json       signature of the data it was packed from + image count
+#
+# Everything is opened with np.memmap / mmap_mode="r", so opening a split is instant
+# and moving a dataset means copying a handful of files instead of tens of thousands.
+
+SOURCE_NAME = "source.json"
+
+SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def jpeg_shape(data):
+    """Reads (h, w) from a JPEG header without decoding the image. Returns None if not found."""
+    i = 2
+    n = len(data)
+    while i + 9 < n:
+        if data[i] != 0xFF:
+            i += 1
+            continue
+        marker = data[i + 1]
+        if marker in SOF_MARKERS:
+            return int.from_bytes(data[i + 5:i + 7], "big"), int.from_bytes(data[i + 7:i + 9], "big")
+        if marker == 0xFF or 0xD0 <= marker <= 0xD9:
+            i += 1 if marker == 0xFF else 2
+            continue
+        i += 2 + int.from_bytes(data[i + 2:i + 4], "big")
+    return None
+
+
+def write_split(pairs, out_dir, num_kpts=NUM_KEYPOINTS):
+    """
+    Packs (image_path, label_path) pairs into one split folder.
+    Returns the number of images written.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    image_offsets = [0]
+    label_offsets = [0]
+    shapes, names = [], []
+    classes, boxes, kpts = [], [], []
+
+    with open(os.path.join(out_dir, "images.bin"), "wb") as blob:
+        for img_path, lbl_path in pairs:
+            with open(img_path, "rb") as f:
+                data = f.read()
+            shape = jpeg_shape(data)
+            if shape is None:
+                decoded = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+                if decoded is None:
+                    print(f"⚠️ Warning: Skipping unreadable image {img_path}")
+                    continue
+                shape = decoded.shape[:2]
+            c, b, k = load_label_arrays(lbl_path, num_kpts)
+
+            blob.write(data)
+            image_offsets.append(image_offsets[-1] + len(data))
+            shapes.append(shape)
+            names.append(os.path.splitext(os.path.basename(img_path))[0])
+            classes.append(c)
+            boxes.append(b)
+            kpts.append(k)
+            label_offsets.append(label_offsets[-1] + len(c))
+
+    np.save(os.path.join(out_dir, "image_offsets.npy"), np.asarray(image_offsets, dtype=np.int64))
+    np.save(os.path.join(out_dir, "image_shapes.npy"), np.asarray(shapes, dtype=np.int32).reshape(-1, 2))
+    np.save(os.path.join(out_dir, "label_offsets.npy"), np.asarray(label_offsets, dtype=np.int64))
+    np.save(os.path.join(out_dir, "classes.npy"), np.concatenate(classes) if classes else np.zeros(0, np.int32))
+    np.save(os.path.join(out_dir, "boxes.npy"), np.concatenate(boxes) if boxes else np.zeros((0, 4), np.float32))
+    np.save(os.path.join(out_dir, "keypoints.npy"),
+            np.concatenate(kpts) if kpts else np.zeros((0, num_kpts, 3), np.float32))
+    with open(os.path.join(out_dir, "names.json"), "w") as f:
+        json.dump(names, f)
+    return len(names)
+
+
+def packed_source(split_dir):
+    """(signature, image_count) a split was last packed from, or (None, 0)."""
+    try:
+        with open(os.path.join(split_dir, SOURCE_NAME), "r") as f:
+            source = json.load(f)
+        return source["signature"], source["count"]
+    except (OSError, ValueError, KeyError):
+        return None, 0
+
+
+def pack_dataset(dataset_root, shard_root, splits=("train", "val"), signatures=None):
+    """
+    Packs a loose YOLO dataset (<root>/<split>/images|labels) into shards and writes a
+    data yaml next to them.
+    Args:
+        signatures (dict): Optional {split: str} describing each split's content (e.g. a
+                           hash of its manifest entries). A split already packed from the
+                           same signature is kept as it is.
+    Returns:
+        ({split: image_count}, [splits kept unchanged])
+    """
+    signatures = signatures or {}
+    counts = {}
+    kept = []
+    for split in splits:
+        out_dir = os.path.join(shard_root, split)
+        signature = signatures.get(split)
+        packed, count = packed_source(out_dir)
+        if signature is not None and packed == signature:
+            counts[split] = count
+            kept.append(split)
+            continue
+
+        images = sorted(glob.glob(os.path.join(dataset_root, split, "images", "*.jpg")))
+        pairs = []
+        for img in images:
+            lbl = os.path.join(dataset_root, split, "labels", os.path.basename(img)[:-4] + ".txt")
+            if os.path.exists(lbl):
+                pairs.append((img, lbl))
+        # Drop the old signature first, so an interrupted pack is redone next time
+        if packed is not None:
+            os.remove(os.path.join(out_dir, SOURCE_NAME))
+        counts[split] = write_split(pairs, out_dir)
+        if signature is not None:
+            tmp_path = os.path.join(out_dir, SOURCE_NAME + ".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump({"signature": signature, "count": counts[split]}, f)
+            os.replace(tmp_path, os.path.join(out_dir, SOURCE_NAME))
+
+    abs_path = os.path.abspath(shard_root).replace('\\', '/')
+    with open(os.path.join(shard_root, "data.yaml"), "w") as f:
+        f.write(f"path: {abs_path}  # Packed shards (Auto-Generated)\n"
+                "train: train\nval: val\n\n"
+                "kpt_shape: [17, 3]\n"
+                "flip_idx: [0, 2, 1, 4, 3, 6, 5, 8, 7, 10, 9, 12, 11, 14, 13, 16, 15]\n\n"
+                "names:\n  0: person\n")
+    return counts, kept
+
+
+class ShardDataset:
+    """
+    Random-access reader for one packed split. Items are dicts using the same keys as
+    ultralytics labels, so they can feed a torch DataLoader or the trainer adapter below.
+    """
+
+    def __init__(self, split_dir):
+        self.split_dir = split_dir
+        self.blob = np.memmap(os.path.join(split_dir, "images.bin"), dtype=np.uint8, mode="r")
+        load = lambda name: np.load(os.path.join(split_dir, name), mmap_mode="r")
+        self.image_offsets = load("image_offsets.npy")
+        self.image_shapes = load("image_shapes.npy")
+        self.label_offsets = load("label_offsets.npy")
+        self.classes = load("classes.npy")
+        self.boxes = load("boxes.npy")
+        self.keypoints = load("keypoints.npy")
+        with open(os.path.join(split_dir, "names.json"), "r") as f:
+            self.names = json.load(f)
+
+    def __len__(self):
+        return len(self.names)
+
+    def encoded(self, i):
+        """Raw JPEG bytes of image i (a view into the memory map, no copy)."""
+        return self.blob[self.image_offsets[i]:self.image_offsets[i + 1]]
+
+    def image(self, i):
+        """Decoded BGR image i."""
+        return cv2.imdecode(self.encoded(i), cv2.IMREAD_COLOR)
+
+    def labels(self, i):
+        a, b = self.label_offsets[i], self.label_offsets[i + 1]
+        return {
+            "im_file": os.path.join(self.split_dir, self.names[i] + ".jpg"),
+            "shape": tuple(int(v) for v in self.image_shapes[i]),
+            "cls": np.asarray(self.classes[a:b], dtype=np.float32).reshape(-1, 1),
+            "bboxes": np.asarray(self.boxes[a:b], dtype=np.float32),
+            "keypoints": np.asarray(self.keypoints[a:b], dtype=np.float32),
+            "segments": [],
+            "normalized": True,
+            "bbox_format": "xywh",
+        }
+
+    def __getitem__(self, i):
+        item = self.labels(i)
+        item["img"] = self.image(i)
+        return item
+
+
+# --- ULTRALYTICS ADAPTER ---
+def shard_trainer():
+    """
+    Returns a PoseTrainer subclass whose datasets read from packed shards.
+    Usage:
+        model.train(data="datasets/judo_pose_shards/data.yaml", trainer=shard_trainer(), ...)
+    """
+    from ultralytics.data.dataset import YOLODataset
+    from ultralytics.models.yolo.pose import PoseTrainer
+
+    class ShardYOLODataset(YOLODataset):
+        def get_img_files(self, img_path):
+            self.shards = ShardDataset(img_path)
+            return [os.path.join(img_path, name + ".jpg") for name in self.shards.names]
+
+        def get_labels(self):
+            return [self.shards.labels(i) for i in range(len(self.shards))]
+
+        def load_image(self, i, rect_mode=True):
+            # Same resize + mosaic buffer handling as BaseDataset.load_image, decoding from the shard
+            im = self.ims[i]
+            if im is not None:
+                return im, self.im_hw0[i], self.im_hw[i]
+            im = self.shards.image(i)
+            h0, w0 = im.shape[:2]
+            if rect_mode:
+                r = self.imgsz / max(h0, w0)
+                if r != 1:
+                    w, h = (min(round(w0 * r), self.imgsz), min(round(h0 * r), self.imgsz))
+                    im = cv2.resize(im, (w, h), interpolation=cv2.INTER_LINEAR)
+            elif not (h0 == w0 == self.imgsz):
+                im = cv2.resize(im, (self.imgsz, self.imgsz), interpolation=cv2.INTER_LINEAR)
+            if self.augment:
+                self.ims[i], self.im_hw0[i], self.im_hw[i] = im, (h0, w0), im.shape[:2]
+                self.buffer.append(i)
+                if 1 < len(self.buffer) >= self.max_buffer_length:
+                    j = self.buffer.pop(0)
+                    if self.cache != "ram":
+                        self.ims[j], self.im_hw0[j], self.im_hw[j] = None, None, None
+            return im, (h0, w0), im.shape[:2]
+
+    class ShardPoseTrainer(PoseTrainer):
+        def build_dataset(self, img_path, mode="train", batch=None):
+            gs = max(int(self.model.stride.max() if self.model else 0), 32)
+            return ShardYOLODataset(
+                img_path=img_path, imgsz=self.args.imgsz, batch_size=batch,
+                augment=mode == "train", hyp=self.args, rect=mode == "val",
+                cache=self.args.cache or None, single_cls=self.args.single_cls or False,
+                stride=gs, pad=0.0 if mode == "train" else 0.5,
+                prefix=f"{mode}: ", task="pose", classes=self.args.classes,
+                data=self.data, fraction=self.args.fraction if mode == "train" else 1.0,
+            )
+
+    return ShardPoseTrainer
@@ -0,0 +1,87 @@
+import re
+import sys
+import time
+import argparse
+
+# Startup timing: named marks relative to process start, printed as one report.
+#   STARTUP_REPORT=1 python main.py                 -> marks (imports, window, first frame)
+#   python -X importtime main.py 2> importtime.log
+#   python startup_timing.py importtime.log         -> slowest imports, cumulative
+#
+# Marks are a list append each, so they stay in even when the report is off.
+
+_start = time.perf_counter()
+_marks = []
+
+
+def reset():
+    """Restarts the clock (call as early as possible in the entry script)."""
+    global _start
+    _start = time.perf_counter()
+    _marks.clear()
+
+
+def mark(name):
+    """Records a named milestone, once. Returns seconds since start."""
+    elapsed = time.perf_counter() - _start
+    if not any(n == name for n, _ in _marks):
+        _marks.append((name, elapsed))
+    return elapsed
+
+
+def marks():
+    return list(_marks)
+
+
+def report(file=None):
+    """Prints every mark with its delta from the previous one."""
+    file = file or sys.stdout
+    print("⏱️ Startup timing:", file=file)
+    prev = 0.0
+    for name, t in _marks:
+        print(f"   {t * 1000:8.1f} ms  (+{(t - prev) * 1000:7.1f})  {name}", file=file)
+        prev = t
+
+
+# --- IMPORTTIME SUMMARY ---
+IMPORT_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def parse_importtime(lines):
+    """
+    Parses `python -X importtime` output.
+    Returns a list of (module, self_us, cumulative_us, depth).
+    """
+    rows = []
+    for line in lines:
+        m = IMPORT_LINE.match(line)
+        if m:
+            depth = (len(m.group(3)) - 1) // 2
+            rows.append((m.group(4), int(m.group(1)), int(m.group(2)), depth))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize `python -X importtime` output.")
+    parser.add_argument("log", help="stderr of `python -X importtime main.py`")
+    parser.add_argument("--top", type=int, default=20, help="Rows to show")
+    parser.add_argument("--depth", type=int, default=0,
+                        help="Only show imports at most this deep (0 = top-level imports of the app)")
+    args = parser.parse_args()
+
+    with open(args.log, "r", errors="replace") as f:
+        rows = parse_importtime(f)
+    if not rows:
+        print("❌ No importtime lines found. Run: python -X importtime main.py 2> importtime.log")
+        return
+
+    total = sum(cum for _, _, cum, depth in rows if depth == 0)
+    print(f"🚀 {len(rows)} modules imported, {total / 1e6:.2f}s total at top level")
+    shown = sorted((r for r in rows if r[3] <= args.depth), key=lambda r: r[2], reverse=True)
+    print(f"   {'cumulative':>10}  {'self':>8}  module")
+    for name, self_us, cum_us, _ in shown[:args.top]:
+        print(f"   {cum_us / 1000:8.1f}ms  {self_us / 1000:6.1f}ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
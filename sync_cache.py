@@ -0,0 +1,324 @@
+import os
+import json
+import time
+import shutil
+import filecmp
+import threading
+
+# Local write-back cache for a slow, cloud-synced RAW_DATA_DIR (e.g. Google Drive).
+#
+# Each mirrored folder (the active video's labels/ and images/) gets a local twin under
+# RAW_CACHE_DIR. The GUI reads and writes only the local twin; one background thread per
+# folder syncs it with the remote folder:
+#   - local files created/edited/deleted since the last sync are pushed (in batches)
+#   - remote files changed by someone else are pulled (pull=True folders only)
+#   - a file changed on both sides since the last sync is a conflict: the remote version
+#     wins locally and ours is kept in RAW_CACHE_DIR/conflicts/. Write-back only folders
+#     (pull=False, e.g. images) never read the remote copy, so there ours wins and the
+#     remote version is the one kept in conflicts/
+# Sync state (remote and local mtime of every file at its last sync) is kept in a
+# .sync_state.json in the local folder, so pending writes survive a crash or restart.
+#
+#   RAW_CACHE_DIR=~/.judo_cache python main.py
+#   RAW_CACHE_LATENCY_MS=300 ...   -> adds latency to every remote operation (slow-drive stand-in)
+
+SYNC_INTERVAL = 5.0       # Seconds between sync passes (a save wakes the thread early)
+RETRY_INTERVAL = 15.0     # Seconds to wait after the remote folder was unreachable
+STATE_NAME = ".sync_state.json"
+CONFLICTS_DIR = "conflicts"
+
+
+class RemoteFS:
+    """All remote file operations go through here, so latency can be simulated."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def scan(self, folder):
+        """{name: (mtime_ns, size)} of regular files in folder."""
+        self._wait()
+        files = {}
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    st = entry.stat()
+                    files[entry.name] = (st.st_mtime_ns, st.st_size)
+        return files
+
+    def makedirs(self, folder, root):
+        """Creates folder, but only inside an existing root (an unmounted drive stays unmounted)."""
+        self._wait()
+        if not os.path.isdir(root):
+            raise FileNotFoundError(f"{root} is not reachable")
+        os.makedirs(folder, exist_ok=True)
+
+    def pull(self, src, dst):
+        self._wait()
+        shutil.copy2(src, dst)
+
+    def same_content(self, local_path, remote_path):
+        """Byte comparison in chunks (stops at the first difference; sizes are compared first)."""
+        self._wait()
+        return filecmp.cmp(local_path, remote_path, shallow=False)
+
+    def push(self, src, dst):
+        """Copies src over dst atomically (tmp + rename); returns the new remote mtime_ns."""
+        self._wait()
+        tmp_path = dst + ".tmp"
+        shutil.copy2(src, tmp_path)
+        os.replace(tmp_path, dst)
+        return os.stat(dst).st_mtime_ns
+
+    def remove(self, path):
+        self._wait()
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def local_scan(folder):
+    files = {}
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name != STATE_NAME and not entry.name.endswith(".tmp"):
+                files[entry.name] = entry.stat().st_mtime_ns
+    return files
+
+
+class FolderMirror:
+    """Keeps local_dir and remote_dir in sync on a background thread."""
+
+    def __init__(self, remote_dir, local_dir, conflicts_dir, pull=True, fs=None, remote_root=None):
+        self.remote_dir = remote_dir
+        self.remote_root = remote_root or os.path.dirname(remote_dir)
+        self.local_dir = local_dir
+        self.conflicts_dir = conflicts_dir
+        self.pull = pull
+        self.fs = fs or RemoteFS()
+        self.online = True
+        self.ready = threading.Event()   # Set after the first successful pass
+        self.pending = 0                 # Local changes not yet pushed (as of the last pass)
+        self.conflicts = 0
+        self.passes = 0                  # Completed (or failed) sync passes
+        self._running = False
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        os.makedirs(local_dir, exist_ok=True)
+        self.state = self._load_state()
+        if not os.path.exists(self._state_path()):
+            self._save_state()   # Lets resume_pending find this folder after a restart
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # --- STATE ---
+    def _state_path(self):
+        return os.path.join(self.local_dir, STATE_NAME)
+
+    def _load_state(self):
+        try:
+            with open(self._state_path(), "r") as f:
+                data = json.load(f)
+            if data.get("remote_dir") == self.remote_dir:
+                return data["files"]
+        except (OSError, ValueError, KeyError):
+            pass
+        return {}
+
+    def _save_state(self):
+        path = self._state_path()
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"remote_dir": self.remote_dir, "pull": self.pull, "files": self.state}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ Warning: Could not write sync state: {e}")
+
+    # --- PUBLIC ---
+    def poke(self):
+        """Asks for a sync pass now (e.g. right after a save)."""
+        self._wake.set()
+
+    def flush(self, timeout=None):
+        """Runs passes until nothing is pending or timeout (seconds) expires. Returns True if clean."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            # Wait for a pass that started after this call
+            target = self.passes + (2 if self._running else 1)
+            self.poke()
+            while self.passes < target:
+                if deadline is not None and time.monotonic() > deadline:
+                    return False
+                time.sleep(0.02)
+            if self.pending == 0 and self.online:
+                return True
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+
+    def close(self, timeout=10.0):
+        clean = self.flush(timeout)
+        self._stop.set()
+        self._wake.set()
+        return clean
+
+    # --- SYNC ---
+    def _run(self):
+        while not self._stop.is_set():
+            self._running = True
+            try:
+                self.sync_once()
+                self.online = True
+                self.ready.set()
+                interval = SYNC_INTERVAL
+            except OSError as e:
+                if self.online:
+                    print(f"⚠️ Warning: Sync folder unavailable ({e}); keeping changes locally")
+                self.online = False
+                interval = RETRY_INTERVAL
+            self._running = False
+            self.passes += 1
+            self._wake.wait(interval)
+            self._wake.clear()
+
+    def sync_once(self):
+        """One full reconciliation pass. Raises OSError if the remote folder is unreachable."""
+        self.fs.makedirs(self.remote_dir, self.remote_root)
+        remote = self.fs.scan(self.remote_dir)
+        local = local_scan(self.local_dir)
+        changed = False
+
+        for name in sorted(set(remote) | set(local) | set(self.state)):
+            known = self.state.get(name)          # {"remote": mtime_ns, "local": mtime_ns}
+            r = remote.get(name)
+            l = local.get(name)
+            remote_changed = (r[0] if r else None) != (known["remote"] if known else None)
+            local_changed = l != (known["local"] if known else None)
+            local_path = os.path.join(self.local_dir, name)
+            remote_path = os.path.join(self.remote_dir, name)
+
+            if not self.pull and not local_changed:
+                # Write-back only folder: nothing to do unless we changed it
+                continue
+            if local_changed and remote_changed and r is not None and l is not None and known is None \
+                    and r[1] == os.path.getsize(local_path) and self.fs.same_content(local_path, remote_path):
+                # Same file on both sides (first sync): just adopt it
+                self.state[name] = {"remote": r[0], "local": l}
+                changed = True
+            elif local_changed and remote_changed and self.pull and r is not None:
+                # Edited here and elsewhere: remote wins, ours goes to conflicts/
+                if l is not None:
+                    self._keep_conflict(name, local_path)
+                self.fs.pull(remote_path, local_path)
+                self.state[name] = {"remote": r[0], "local": os.stat(local_path).st_mtime_ns}
+                changed = True
+            elif local_changed and remote_changed and r is not None and l is not None:
+                # Write-back only folder, edited on both sides: ours wins, theirs goes to conflicts/
+                self._keep_conflict(name, remote_path, remote=True)
+                self.state[name] = {"remote": self.fs.push(local_path, remote_path), "local": l}
+                changed = True
+            elif local_changed:
+                if l is None:
+                    self.fs.remove(remote_path)
+                    self.state.pop(name, None)
+                else:
+                    self.state[name] = {"remote": self.fs.push(local_path, remote_path), "local": l}
+                changed = True
+            elif remote_changed:
+                if r is None:
+                    if l is not None:
+                        os.remove(local_path)
+                    self.state.pop(name, None)
+                else:
+                    self.fs.pull(remote_path, local_path)
+                    self.state[name] = {"remote": r[0], "local": os.stat(local_path).st_mtime_ns}
+                changed = True
+
+        if changed:
+            self._save_state()
+        # Anything edited locally while this pass ran is picked up by the next one
+        local = local_scan(self.local_dir)
+        self.pending = sum(1 for name in set(local) | set(self.state)
+                           if local.get(name) != self.state.get(name, {}).get("local"))
+
+    def _keep_conflict(self, name, path, remote=False):
+        """Copies the losing version of a conflicting file (ours, or the remote one) to conflicts/."""
+        os.makedirs(self.conflicts_dir, exist_ok=True)
+        stem, ext = os.path.splitext(name)
+        dst = os.path.join(self.conflicts_dir, f"{stem}.{time.strftime('%Y%m%d_%H%M%S')}{ext}")
+        if remote:
+            self.fs.pull(path, dst)
+            print(f"⚠️ Warning: {name} was changed elsewhere; kept our version, the remote one is in {dst}")
+        else:
+            shutil.copy2(path, dst)
+            print(f"⚠️ Warning: {name} was changed elsewhere; kept the remote version, ours is in {dst}")
+        self.conflicts += 1
+
+
+class SyncCache:
+    """Maps folders under the project root to local mirrors under cache_root."""
+
+    def __init__(self, project_root, cache_root, latency=0.0):
+        self.project_root = os.path.abspath(project_root)
+        self.cache_root = os.path.abspath(os.path.expanduser(cache_root))
+        self.fs = RemoteFS(latency)
+        self.mirrors = {}
+        self.resume_pending()
+
+    def resume_pending(self):
+        """Restarts mirrors that still had unpushed changes when the app last closed."""
+        if not os.path.isdir(self.cache_root):
+            return
+        for folder, _, files in os.walk(self.cache_root):
+            if STATE_NAME not in files:
+                continue
+            try:
+                with open(os.path.join(folder, STATE_NAME), "r") as f:
+                    data = json.load(f)
+                state = data["files"]
+                local = local_scan(folder)
+            except (OSError, ValueError, KeyError):
+                continue
+            if any(local.get(name) != state.get(name, {}).get("local") for name in set(local) | set(state)):
+                self.mirror(data["remote_dir"], data.get("pull", True))
+
+    def mirror(self, remote_dir, pull=True):
+        """Local folder to use instead of remote_dir (started on first use)."""
+        remote_dir = os.path.abspath(remote_dir)
+        if remote_dir not in self.mirrors:
+            rel = os.path.relpath(remote_dir, self.project_root)
+            if rel.startswith(".."):
+                rel = os.path.join("_external", remote_dir.strip(os.sep).replace(os.sep, "_"))
+            local_dir = os.path.join(self.cache_root, rel)
+            conflicts = os.path.join(self.cache_root, CONFLICTS_DIR, rel)
+            self.mirrors[remote_dir] = FolderMirror(remote_dir, local_dir, conflicts, pull, self.fs,
+                                                    self.project_root)
+        return self.mirrors[remote_dir]
+
+    def poke(self):
+        for m in self.mirrors.values():
+            m.poke()
+
+    def pending(self):
+        return sum(m.pending for m in self.mirrors.values())
+
+    def online(self):
+        return all(m.online for m in self.mirrors.values())
+
+    def close(self, timeout=10.0):
+        """Flushes every mirror. Returns False if something could not be pushed in time."""
+        deadline = time.monotonic() + timeout
+        return all([m.close(max(0.1, deadline - time.monotonic())) for m in self.mirrors.values()])
+
+
+def from_env(project_root):
+    """A SyncCache if RAW_CACHE_DIR is set, else None (direct access, as before)."""
+    cache_root = os.getenv("RAW_CACHE_DIR", "")
+    if not cache_root:
+        return None
+    latency = float(os.getenv("RAW_CACHE_LATENCY_MS", "0")) / 1000.0
+    return SyncCache(project_root, cache_root, latency)
@@ -0,0 +1,41 @@
+import random
+
+import dedup
+from active_learning import select_frames, WEIGHTS
+
+
+def drifting_video(samples, bits_per_step, stride=30, seed=0):
+    """Scores for a static-camera video: each sample's hash flips a few bits of the previous one."""
+    rng = random.Random(seed)
+    h = rng.getrandbits(64)
+    frames = {}
+    for i in range(samples):
+        for bit in rng.sample(range(64), bits_per_step):
+            h ^= 1 << bit
+        frames[i * stride] = {"hash": h, **{k: rng.random() for k in WEIGHTS}}
+    return frames
+
+
+def test_select_frames_fills_top_on_drifting_video(tmp_path):
+    # One hour sampled every 30 frames, hash drifting 3 bits per sample
+    scored = {"match1": drifting_video(3600, 3)}
+    picked = select_frames(scored, top=200, diversity_bits=10, min_gap=15, root=str(tmp_path))
+    assert len(picked) == 200
+    hashes = [scored["match1"][e["frame"]]["hash"] for e in picked]
+    for i in range(len(hashes)):
+        for j in range(i + 1, len(hashes)):
+            assert dedup.hamming(hashes[i], hashes[j]) > 10
+    priorities = [e["priority"] for e in picked]
+    assert priorities == sorted(priorities, reverse=True)
+
+
+def test_select_frames_skips_look_alikes_and_labeled(tmp_path):
+    def entry(h, score):
+        return {"hash": h, "confidence": score, "instability": 0.0, "disagreement": 0.0}
+
+    scored = {"match1": {0: entry(0, 0.9), 30: entry(1, 0.8), 60: entry((1 << 40) - 1, 0.7), 90: entry(2**64 - 1, 0.6)}}
+    labels = tmp_path / "match1" / "pose" / "labels"
+    labels.mkdir(parents=True)
+    (labels / "match1_000090.txt").write_text("")
+    picked = select_frames(scored, top=10, diversity_bits=10, min_gap=15, root=str(tmp_path))
+    assert [e["frame"] for e in picked] == [0, 60]
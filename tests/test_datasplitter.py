@@ -0,0 +1,28 @@
+import os
+
+import cv2
+import numpy as np
+
+from datasplitter import run_jobs
+
+
+def test_unreadable_image_does_not_abort_pooled_run(tmp_path):
+    src, dst = tmp_path / "src", tmp_path / "dst"
+    src.mkdir()
+    dst.mkdir()
+    jobs = []
+    for i in range(4):
+        img, lbl = src / f"f{i}.jpg", src / f"f{i}.txt"
+        if i == 2:
+            img.write_bytes(b"not a jpeg")
+        else:
+            cv2.imwrite(str(img), np.zeros((200, 400, 3), dtype=np.uint8))
+        lbl.write_text("0 0.5 0.5 0.2 0.2\n")
+        jobs.append((str(img), str(lbl), str(dst / img.name), str(dst / lbl.name), "copy", 100, None))
+
+    counts, hashes, dropped = run_jobs(jobs, workers=2)
+    assert counts == {"resized": 3, "unresized": 1}
+    assert len(hashes) == 4 and dropped == 0
+    assert cv2.imread(str(dst / "f0.jpg")).shape[:2] == (50, 100)
+    assert (dst / "f2.jpg").read_bytes() == b"not a jpeg"
+    assert sorted(os.listdir(dst)) == sorted(f"f{i}{ext}" for i in range(4) for ext in (".jpg", ".txt"))
@@ -0,0 +1,48 @@
+from dedup import cluster, components, dedup_pairs, hamming
+
+
+def drift(n, step=1):
+    """n hashes, each `step` more bits set than the previous one."""
+    return [(1 << (i * step)) - 1 for i in range(n)]
+
+
+def test_cluster_drift_is_not_chained():
+    hashes = drift(64)
+    ids = cluster(hashes, 4)
+    # Every member stays within threshold of its leader
+    for h, cid in zip(hashes, ids):
+        assert hamming(h, hashes[cid]) <= 4
+    assert len(set(ids)) >= 64 // 5
+
+
+def test_cluster_groups_exact_and_near_duplicates():
+    ids = cluster([0b0, 0b1, 0b11, 0xFFFF, 0xFFFE, None], 2)
+    assert ids[:3] == [0, 0, 0]
+    assert ids[3:5] == [3, 3]
+    assert ids[5] == 5
+
+
+def test_dedup_pairs_keeps_drifting_frames():
+    hashes = drift(64)
+    keys = [f"video/pose/images/video_{i:06d}.jpg" for i in range(64)]
+    keep, groups = dedup_pairs(keys, hashes, [1] * 64, 4)
+    assert len(keep) >= 64 // 5
+    # The drift is one connected chain, so it all goes to a single split
+    assert set(groups.values()) == {keys[0]}
+
+
+def test_components_are_transitive():
+    assert components(drift(64), 4) == [0] * 64
+    assert components([0b0, 0b1, 0xFFFF, None], 2) == [0, 0, 2, 3]
+
+
+def test_near_duplicates_share_a_split_group():
+    hashes = drift(64)
+    keys = [f"video/pose/images/video_{i:06d}.jpg" for i in range(64)]
+    weights = [10 if i in (4, 5) else 1 for i in range(64)]
+    keep, groups = dedup_pairs(keys, hashes, weights, 4)
+    assert {keys[4], keys[5]} <= keep
+    for a in keys:
+        for b in keys:
+            if hamming(hashes[keys.index(a)], hashes[keys.index(b)]) <= 4:
+                assert groups[a] == groups[b]
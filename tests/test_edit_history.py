@@ -0,0 +1,35 @@
+from edit_history import EditHistory
+from memory_budget import MemoryBudget
+
+
+def person(x):
+    return {'class_id': 0, 'bbox': [x, 0.5, 0.2, 0.2], 'keypoints': [[x, 0.5, 2]]}
+
+
+def test_undo_redo_add_and_move():
+    history = EditHistory(budget=MemoryBudget(2**20))
+    annotations = []
+    history.switch(("video", "pose", 0), annotations)
+    annotations.append(person(0.1))
+    history.record(annotations, ("add", 0, annotations[0]))
+    annotations[0]['bbox'] = [0.3, 0.5, 0.2, 0.2]
+    history.record(annotations, ("bbox", 0, (0.1, 0.5, 0.2, 0.2), (0.3, 0.5, 0.2, 0.2)))
+
+    assert history.undo(annotations) == 0 and annotations[0]['bbox'][0] == 0.1
+    assert history.undo(annotations) == 0 and annotations == []
+    assert history.undo(annotations) is None
+    assert history.redo(annotations) == 0 and len(annotations) == 1
+    assert history.counts() == (1, 1)
+
+
+def test_undo_after_annotations_were_cleared_is_ignored():
+    # e.g. the last review image was deleted and the list emptied without begin_frame
+    history = EditHistory(budget=MemoryBudget(2**20))
+    annotations = [person(0.1)]
+    history.switch(("review", "a.jpg"), annotations)
+    annotations[0]['bbox'] = [0.3, 0.5, 0.2, 0.2]
+    history.record(annotations, ("bbox", 0, (0.1, 0.5, 0.2, 0.2), (0.3, 0.5, 0.2, 0.2)))
+    annotations = []
+    assert history.undo(annotations) is None
+    assert history.redo(annotations) is None
+    assert history.counts() == (0, 0)
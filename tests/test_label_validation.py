@@ -0,0 +1,48 @@
+from datasplitter import clean_and_copy
+from label_validation import summarize, validate_files
+
+PERSON = "0 0.5 0.5 0.4 0.8 " + " ".join(["0.5 0.5 2"] * 17)
+OBJECT = "1 0.5 0.5 0.1 0.1"
+
+
+def write(path, lines):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+def test_issues_are_found_per_line(tmp_path):
+    path = write(tmp_path / "v" / "pose" / "labels" / "v_000000.txt", [
+        PERSON,
+        "0 0.5 0.5 0.1 0.1 0.2 0.2",                           # malformed (7 values)
+        "0 0.5 0.5 0.4 0.8 " + " ".join(["0.5 0.5 2"] * 16),   # wrong_kpt_count
+        "0 abc 0.5 0.1 0.1",                                   # malformed (not a number)
+        "0 0.5 0.5 0 0.1",                                     # zero_area
+    ])
+    summary = summarize(validate_files([path], workers=1))
+    assert summary["issues"]["malformed"] == 2
+    assert summary["issues"]["wrong_kpt_count"] == 1
+    assert summary["issues"]["zero_area"] == 1
+    assert summary["persons"] == 1
+
+
+def test_persons_per_frame_counts_pose_frames_only(tmp_path):
+    paths = [
+        write(tmp_path / "v" / "pose" / "labels" / "v_000000.txt", [PERSON, PERSON]),
+        write(tmp_path / "v" / "pose" / "labels" / "v_000001.txt", [""]),
+        write(tmp_path / "v" / "detect" / "labels" / "v_000000.txt", [OBJECT]),
+        write(tmp_path / "split" / "labels" / "w_000000.txt", [OBJECT]),   # Detect-only, mode unknown
+    ]
+    per_frame = summarize(validate_files(paths, workers=1))["persons_per_frame"]
+    assert per_frame["histogram"][:3] == [1, 0, 1]
+    assert per_frame["frames_without_persons"] == 1
+    assert per_frame["mean"] == 1.0
+
+
+def test_clean_and_copy_drops_unusable_lines(tmp_path):
+    src = write(tmp_path / "src.txt", [PERSON, "0 0.5 0.5 0.1", "0 nan 0.5 0.1 0.1", "0 1.5 0.5 0.1 0.1"])
+    dst = tmp_path / "dst.txt"
+    assert clean_and_copy(src, str(dst)) == 2
+    lines = dst.read_text().splitlines()
+    assert len(lines) == 2
+    assert lines[1].split()[1] == "1.0"   # Out of range is still clamped, not dropped
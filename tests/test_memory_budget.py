@@ -0,0 +1,113 @@
+import cv2
+import numpy as np
+import pytest
+
+import memory_budget
+from memory_budget import MemoryBudget, BudgetedLRU
+from edit_history import EditHistory
+from thumbnails import ThumbnailCache
+from video_engine import VideoEngine
+
+MB = 2**20
+
+
+def frame(mb=1):
+    return np.zeros(mb * MB, dtype=np.uint8)
+
+
+def test_lru_evicts_lowest_priority_first():
+    budget = MemoryBudget(10 * MB)
+    low = BudgetedLRU("low", 10, memory_budget.array_bytes, budget=budget)
+    high = BudgetedLRU("high", 50, memory_budget.array_bytes, budget=budget)
+    for i in range(6):
+        high.put(i, frame())
+    for i in range(20):
+        low.put(i, frame())
+        assert budget.used() <= budget.limit_bytes
+    # The low priority cache shrank to make room; the high one kept everything
+    assert len(high) == 6
+    assert len(low) == 4
+    assert low.get(19) is not None and low.get(0) is None
+
+
+def test_pinned_entries_are_never_evicted():
+    budget = MemoryBudget(8 * MB)
+    budget.register("model.main")
+    budget.set("model.main", 5 * MB)
+    cache = BudgetedLRU("frames", 30, memory_budget.array_bytes, budget=budget)
+    for i in range(10):
+        cache.put(i, frame())
+        assert budget.used() <= budget.limit_bytes
+    usage = {name: size for name, size, *_ in budget.usage()}
+    assert usage["model.main"] == 5 * MB
+    assert len(cache) == 3
+
+
+def test_enforce_reports_when_pinned_alone_exceed_budget():
+    budget = MemoryBudget(4 * MB)
+    budget.register("model.main")
+    budget.set("model.main", 6 * MB)
+    assert not budget.enforce()
+
+
+@pytest.fixture
+def small_default_budget():
+    budget = memory_budget.default
+    old_limit, old_accounts = budget.limit_bytes, dict(budget.accounts)
+    budget.limit_bytes = 4 * MB
+    budget.accounts.clear()
+    yield budget
+    budget.limit_bytes = old_limit
+    budget.accounts.clear()
+    budget.accounts.update(old_accounts)
+
+
+def write_video(path, frames=40, size=(320, 240)):
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30.0, size)
+    rng = np.random.default_rng(0)
+    for _ in range(frames):
+        writer.write(rng.integers(0, 255, (size[1], size[0], 3), dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def test_app_caches_hold_the_budget(tmp_path, small_default_budget):
+    budget = small_default_budget
+    budget.register("model.main")
+    budget.set("model.main", 1 * MB)
+
+    images = []
+    for i in range(40):
+        path = str(tmp_path / f"{i:03d}.jpg")
+        cv2.imwrite(path, np.full((480, 640, 3), i * 5, dtype=np.uint8))
+        images.append(path)
+    thumbs = ThumbnailCache(str(tmp_path), workers=2)
+    for path in images:
+        thumbs.request(path)
+    for future in list(thumbs.pending.values()):
+        future.result()
+    budget.enforce()   # Thumbnail workers only report; the owner's thread enforces
+    assert budget.used() <= budget.limit_bytes
+
+    history = EditHistory()
+    person = {'class_id': 0, 'bbox': [0.5, 0.5, 0.2, 0.2], 'keypoints': [[0.5, 0.5, 2]] * 17}
+    for f in range(200):
+        history.switch(("video", "pose", f), [])
+        for _ in range(20):
+            history.record([person], ("add", 0, person))
+    assert budget.used() <= budget.limit_bytes
+
+    engine = VideoEngine()
+    engine.load_video(write_video(str(tmp_path / "video.avi")))
+    for i in range(engine.total_frames):   # 230 KB per frame: several MB in total
+        assert engine.get_frame(i) is not None
+        assert budget.used() <= budget.limit_bytes
+
+    usage = {name: (size, evicted) for name, size, _, _, evicted in budget.usage()}
+    # Thumbnails (priority 20) went before frames (30); history (80) kept the most
+    assert usage["thumbnails"][0] == 0 and usage["thumbnails"][1] > 0
+    assert usage["frames"][0] > 0
+    assert usage["history"][0] > 0
+    assert usage["model.main"][0] == 1 * MB
+    thumbs.close()
+    engine.release()
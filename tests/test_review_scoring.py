@@ -0,0 +1,41 @@
+import os
+
+import review_scoring
+from dataset_scan import iter_review_pairs, load_label_mtimes
+
+
+def make_folder(tmp_path, n):
+    images, labels = tmp_path / "images", tmp_path / "labels"
+    images.mkdir()
+    labels.mkdir()
+    for i in range(n):
+        (images / f"f{i}.jpg").write_bytes(b"jpg")
+        (labels / f"f{i}.txt").write_text("0 0.5 0.5 0.2 0.2\n")
+    return str(images), str(labels)
+
+
+def test_stale_pairs_uses_scan_mtimes(tmp_path, monkeypatch):
+    images, labels = make_folder(tmp_path, 4)
+    pairs = sorted(p for chunk in iter_review_pairs(images, labels) for p in chunk)
+    mtimes = load_label_mtimes(images, labels)
+    assert set(mtimes) == {f"f{i}" for i in range(4)}
+
+    scores = {f"f{i}": {"label_mtime": mtimes[f"f{i}"], "priority": i} for i in range(3)}
+    scores["f1"]["label_mtime"] -= 1   # Edited since it was scored
+
+    def no_stat(path):
+        raise AssertionError(f"stat'ed {path}")
+    monkeypatch.setattr(review_scoring, "label_mtime", no_stat)
+    stale = review_scoring.stale_pairs(pairs, scores, mtimes)
+    assert [os.path.basename(txt) for _, txt in stale] == ["f1.txt", "f3.txt"]
+
+
+def test_mtimes_survive_cached_manifest(tmp_path):
+    images, labels = make_folder(tmp_path, 3)
+    list(iter_review_pairs(images, labels))
+    first = load_label_mtimes(images, labels)
+    # Second open reads the manifest instead of scanning
+    assert [p for chunk in iter_review_pairs(images, labels) for p in chunk]
+    assert load_label_mtimes(images, labels) == first
+    os.remove(os.path.join(labels, "f0.txt"))
+    assert load_label_mtimes(images, labels) is None
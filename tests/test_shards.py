@@ -0,0 +1,68 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from label_io import load_label_arrays
+from shards import ShardDataset, pack_dataset
+
+POSE_LINE = "0 0.5 0.5 0.4 0.6 " + " ".join(f"{0.3 + 0.02 * k:.2f} 0.5 {k % 3}" for k in range(17))
+
+
+def make_dataset(root, split, n):
+    images, labels = root / split / "images", root / split / "labels"
+    images.mkdir(parents=True)
+    labels.mkdir(parents=True)
+    rng = np.random.default_rng(len(split))
+    for i in range(n):
+        img = rng.integers(0, 255, (48 + i, 64, 3), dtype=np.uint8)
+        cv2.imwrite(str(images / f"{split}_{i:03d}.jpg"), img)
+        # Frames with 0, 1 and 2 persons
+        (labels / f"{split}_{i:03d}.txt").write_text((POSE_LINE + "\n") * (i % 3))
+
+
+def test_pack_round_trip(tmp_path):
+    make_dataset(tmp_path / "loose", "train", 5)
+    make_dataset(tmp_path / "loose", "val", 2)
+    counts, kept = pack_dataset(str(tmp_path / "loose"), str(tmp_path / "shards"))
+    assert counts == {"train": 5, "val": 2} and kept == []
+
+    for split, n in counts.items():
+        dataset = ShardDataset(str(tmp_path / "shards" / split))
+        assert len(dataset) == n
+        for i in range(n):
+            stem = f"{split}_{i:03d}"
+            img_path = tmp_path / "loose" / split / "images" / f"{stem}.jpg"
+            assert dataset.names[i] == stem
+            assert bytes(dataset.encoded(i)) == img_path.read_bytes()
+            item = dataset[i]
+            np.testing.assert_array_equal(item["img"], cv2.imread(str(img_path)))
+            assert item["shape"] == (48 + i, 64)
+            classes, boxes, kpts = load_label_arrays(str(tmp_path / "loose" / split / "labels" / f"{stem}.txt"))
+            np.testing.assert_array_equal(item["cls"].ravel(), classes)
+            np.testing.assert_array_equal(item["bboxes"], boxes)
+            np.testing.assert_array_equal(item["keypoints"], kpts)
+
+
+def test_unchanged_split_is_not_repacked(tmp_path):
+    make_dataset(tmp_path / "loose", "train", 3)
+    make_dataset(tmp_path / "loose", "val", 2)
+    loose, shards = str(tmp_path / "loose"), str(tmp_path / "shards")
+    pack_dataset(loose, shards, signatures={"train": "a", "val": "b"})
+    blob = os.path.join(shards, "train", "images.bin")
+    os.utime(blob, ns=(0, 0))
+
+    counts, kept = pack_dataset(loose, shards, signatures={"train": "a", "val": "c"})
+    assert counts == {"train": 3, "val": 2} and kept == ["train"]
+    assert os.stat(blob).st_mtime_ns == 0
+
+    counts, kept = pack_dataset(loose, shards, signatures={"train": "changed", "val": "c"})
+    assert kept == ["val"] and os.stat(blob).st_mtime_ns != 0
+
+
+def test_shard_trainer_builds():
+    pytest.importorskip("ultralytics")
+    from ultralytics.models.yolo.pose import PoseTrainer
+    from shards import shard_trainer
+    assert issubclass(shard_trainer(), PoseTrainer)
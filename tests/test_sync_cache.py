@@ -0,0 +1,106 @@
+import os
+import time
+
+import pytest
+
+from sync_cache import CONFLICTS_DIR, FolderMirror, RemoteFS
+
+LATENCY = 0.05   # Slow-drive stand-in: every remote operation waits this long
+
+
+def write(path, text, mtime_ns=None):
+    with open(path, "w") as f:
+        f.write(text)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def read(path):
+    with open(path) as f:
+        return f.read()
+
+
+@pytest.fixture
+def folders(tmp_path):
+    remote = tmp_path / "drive" / "video" / "labels"
+    remote.mkdir(parents=True)
+    return str(remote), str(tmp_path / "cache" / "video" / "labels"), str(tmp_path / "cache" / CONFLICTS_DIR)
+
+
+@pytest.fixture
+def mirrors():
+    started = []
+    yield started
+    for m in started:
+        m.close(timeout=5.0)
+
+
+def start(mirrors, folders, pull=True):
+    remote, local, conflicts = folders
+    m = FolderMirror(remote, local, conflicts, pull=pull, fs=RemoteFS(LATENCY))
+    mirrors.append(m)
+    assert m.flush(timeout=5.0)
+    return m
+
+
+def test_pull_remote_files(folders, mirrors):
+    remote, local, _ = folders
+    write(os.path.join(remote, "a.txt"), "remote")
+    m = start(mirrors, folders)
+    assert m.ready.is_set()
+    assert read(os.path.join(local, "a.txt")) == "remote"
+
+
+def test_flush_waits_for_write_back(folders, mirrors):
+    remote, local, _ = folders
+    m = start(mirrors, folders)
+    for i in range(5):
+        write(os.path.join(local, f"f{i}.txt"), str(i))
+    start_time = time.monotonic()
+    assert m.flush(timeout=5.0)
+    # Every push went through the slow remote before flush returned
+    assert time.monotonic() - start_time >= 5 * LATENCY
+    assert m.pending == 0
+    assert [read(os.path.join(remote, f"f{i}.txt")) for i in range(5)] == [str(i) for i in range(5)]
+
+    os.remove(os.path.join(local, "f0.txt"))
+    assert m.flush(timeout=5.0)
+    assert not os.path.exists(os.path.join(remote, "f0.txt"))
+
+
+def test_conflict_keeps_remote_and_copies_ours(folders, mirrors):
+    remote, local, conflicts = folders
+    write(os.path.join(remote, "a.txt"), "base")
+    m = start(mirrors, folders)
+    now = time.time_ns()
+    write(os.path.join(remote, "a.txt"), "theirs", now + 10**9)
+    write(os.path.join(local, "a.txt"), "ours", now + 2 * 10**9)
+    assert m.flush(timeout=5.0)
+    assert read(os.path.join(local, "a.txt")) == "theirs"
+    assert read(os.path.join(remote, "a.txt")) == "theirs"
+    kept = os.listdir(conflicts)
+    assert len(kept) == 1 and kept[0].startswith("a.") and read(os.path.join(conflicts, kept[0])) == "ours"
+    assert m.conflicts == 1
+
+
+def test_write_back_only_conflict_keeps_ours(folders, mirrors):
+    remote, local, conflicts = folders
+    m = start(mirrors, folders, pull=False)
+    write(os.path.join(local, "img.jpg"), "base")
+    assert m.flush(timeout=5.0)
+    now = time.time_ns()
+    write(os.path.join(remote, "img.jpg"), "theirs", now + 10**9)
+    write(os.path.join(local, "img.jpg"), "ours", now + 2 * 10**9)
+    assert m.flush(timeout=5.0)
+    assert read(os.path.join(remote, "img.jpg")) == "ours"
+    kept = os.listdir(conflicts)
+    assert len(kept) == 1 and read(os.path.join(conflicts, kept[0])) == "theirs"
+
+
+def test_same_file_on_both_sides_is_adopted(folders, mirrors):
+    remote, local, conflicts = folders
+    write(os.path.join(remote, "a.txt"), "same")
+    os.makedirs(local)
+    write(os.path.join(local, "a.txt"), "same")
+    m = start(mirrors, folders)
+    assert m.conflicts == 0 and not os.path.exists(conflicts)
@@ -0,0 +1,32 @@
+import os
+
+import cv2
+import numpy as np
+
+from memory_budget import MemoryBudget
+from thumbnails import ThumbnailCache
+
+
+def test_prune_drops_stale_and_orphan_thumbnails(tmp_path):
+    images = tmp_path / "images"
+    images.mkdir()
+    paths = [str(images / f"f{i}.jpg") for i in range(3)]
+    for path in paths:
+        cv2.imwrite(path, np.zeros((32, 32, 3), dtype=np.uint8))
+
+    cache = ThumbnailCache(str(tmp_path), workers=1, budget=MemoryBudget(2**30))
+    cache.pool.shutdown(wait=True)   # Let the opening prune finish
+    for path in paths:
+        cache._load(path, None)
+    assert len(os.listdir(cache.cache_dir)) == 3
+
+    # f0 edited (new mtime -> new key), f1 deleted
+    os.utime(paths[0], ns=(1, 1))
+    cache._load(paths[0], None)
+    os.remove(paths[1])
+    assert len(os.listdir(cache.cache_dir)) == 4
+
+    assert cache.prune(str(images)) == 2
+    assert sorted(os.listdir(cache.cache_dir)) == sorted(
+        os.path.basename(cache.thumb_path(p, os.stat(p).st_mtime_ns)) for p in (paths[0], paths[2]))
+    cache.close()
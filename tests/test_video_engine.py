@@ -0,0 +1,36 @@
+import threading
+
+import numpy as np
+
+import motion_index
+from video_engine import VideoEngine
+
+
+def test_stale_motion_run_is_ignored(monkeypatch):
+    release = {"old.mp4": threading.Event(), "new.mp4": threading.Event()}
+    finished = {path: threading.Event() for path in release}
+
+    def fake_scores(path, progress=None, stop_event=None):
+        release[path].wait(5)
+        progress(0.9 if path == "old.mp4" else 0.25)
+        finished[path].set()
+        return np.full(3, 1.0 if path == "old.mp4" else 2.0, np.float32), np.zeros(3, np.float32)
+
+    monkeypatch.setattr(motion_index, "compute_motion_scores", fake_scores)
+    monkeypatch.setattr(motion_index, "load_sidecar", lambda path: None)
+    engine = VideoEngine(cache_frames=False)
+    engine.start_motion_analysis("old.mp4")
+    engine.start_motion_analysis("new.mp4")
+
+    # The old worker reports after the new video was loaded: neither its progress nor its result count
+    release["old.mp4"].set()
+    assert finished["old.mp4"].wait(5)
+    assert engine.motion_progress == 0.0 and engine.motion is None
+
+    release["new.mp4"].set()
+    assert finished["new.mp4"].wait(5)
+    for _ in range(100):
+        if engine.motion is not None:
+            break
+        threading.Event().wait(0.01)
+    assert engine.motion_progress == 0.25 and engine.motion[0] == 2.0
@@ -0,0 +1,199 @@
+import os
+from PyQt6.QtWidgets import QAbstractScrollArea
+from PyQt6.QtCore import Qt, QRectF, QPointF, pyqtSignal
+from PyQt6.QtGui import QImage, QPixmap, QPainter, QPen, QColor, QBrush
+
+from annotator import SKELETON_CONNECTIONS
+from thumbnails import ThumbnailCache, THUMB_SIZE
+import memory_budget
+
+CELL_W = THUMB_SIZE + 8
+CELL_H = THUMB_SIZE + 24     # Room for the file name under the thumbnail
+
+
+class ThumbnailGrid(QAbstractScrollArea):
+    """
+    Virtualized contact sheet for review mode. Only the cells inside the viewport are
+    drawn and requested from the ThumbnailCache; everything else costs nothing.
+    Emits image_selected(index) when a cell is clicked.
+    """
+    image_selected = pyqtSignal(int)
+    thumbnail_ready = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Review Grid")
+        self.resize(5 * CELL_W + 40, 4 * CELL_H)
+        self.viewport().setStyleSheet("background-color: #222;")
+        self.verticalScrollBar().setSingleStep(CELL_H // 4)
+
+        self.pairs = []
+        self.current_index = -1
+        self.cache = None
+        self.folder = ""
+        self.pixmaps = memory_budget.BudgetedLRU("pixmaps", memory_budget.PRIORITY_PIXMAPS,
+                                                 memory_budget.pixmap_bytes)   # image_path -> QPixmap of recent cells
+
+        # Worker threads report through a queued signal so painting stays on the GUI thread
+        self.thumbnail_ready.connect(self.on_thumbnail_ready)
+
+    def set_pairs(self, folder, pairs, current_index=-1):
+        """
+        Args:
+            folder (str): Dataset folder (the thumbnail cache lives in <folder>/.thumbs).
+            pairs (list): (image_path, label_path) tuples, same order as review mode.
+            current_index (int): Cell to highlight.
+        """
+        if folder != self.folder:
+            if self.cache:
+                self.cache.close()
+            self.cache = ThumbnailCache(folder, on_ready=self.thumbnail_ready.emit)
+            self.folder = folder
+            self.pixmaps.clear()
+        self.pairs = pairs
+        self.current_index = current_index
+        self.update_scrollbar()
+        self.viewport().update()
+
+    def set_current(self, index):
+        self.current_index = index
+        self.scroll_to(index)
+        self.viewport().update()
+
+    def columns(self):
+        return max(1, self.viewport().width() // CELL_W)
+
+    def update_scrollbar(self):
+        rows = (len(self.pairs) + self.columns() - 1) // self.columns()
+        bar = self.verticalScrollBar()
+        bar.setPageStep(self.viewport().height())
+        bar.setRange(0, max(0, rows * CELL_H - self.viewport().height()))
+
+    def scroll_to(self, index):
+        if index < 0:
+            return
+        top = (index // self.columns()) * CELL_H
+        bar = self.verticalScrollBar()
+        if top < bar.value() or top + CELL_H > bar.value() + self.viewport().height():
+            bar.setValue(top)
+
+    def visible_range(self):
+        cols = self.columns()
+        top = self.verticalScrollBar().value()
+        first_row = top // CELL_H
+        last_row = (top + self.viewport().height()) // CELL_H
+        return first_row * cols, min(len(self.pairs), (last_row + 1) * cols)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_scrollbar()
+
+    def scrollContentsBy(self, dx, dy):
+        self.viewport().update()
+
+    def on_thumbnail_ready(self, img_path):
+        # Workers only report thumbnail sizes; evicting happens here, on the GUI thread
+        memory_budget.default.enforce()
+        self.viewport().update()
+
+    def paintEvent(self, event):
+        if not self.cache:
+            return
+        painter = QPainter(self.viewport())
+        cols = self.columns()
+        top = self.verticalScrollBar().value()
+        start, end = self.visible_range()
+        visible_paths = []
+
+        for idx in range(start, end):
+            img_path, txt_path = self.pairs[idx]
+            visible_paths.append(img_path)
+            x = (idx % cols) * CELL_W + 4
+            y = (idx // cols) * CELL_H - top + 4
+            cell = QRectF(x, y, THUMB_SIZE, THUMB_SIZE)
+
+            pixmap = self.pixmaps.get(img_path)
+            rows = None
+            entry = self.cache.get(img_path)
+            if entry is not None:
+                thumb, rows = entry
+                if pixmap is None:
+                    h, w, ch = thumb.shape
+                    pixmap = QPixmap.fromImage(QImage(thumb.data, w, h, ch * w, QImage.Format.Format_RGB888))
+                    self.pixmaps.put(img_path, pixmap)
+            else:
+                self.cache.request(img_path, txt_path)
+
+            if pixmap is not None:
+                # Fit the thumbnail inside the square cell
+                scale = THUMB_SIZE / max(pixmap.width(), pixmap.height())
+                dw, dh = pixmap.width() * scale, pixmap.height() * scale
+                target = QRectF(x + (THUMB_SIZE - dw) / 2, y + (THUMB_SIZE - dh) / 2, dw, dh)
+                painter.drawPixmap(target, pixmap, QRectF(pixmap.rect()))
+                if rows:
+                    self.draw_overlay(painter, target, rows)
+            else:
+                painter.fillRect(cell, QColor(50, 50, 50))
+
+            if idx == self.current_index:
+                painter.setPen(QPen(QColor(255, 255, 0), 3))
+                painter.setBrush(Qt.BrushStyle.NoBrush)
+                painter.drawRect(cell)
+
+            painter.setPen(QColor(200, 200, 200))
+            painter.drawText(QRectF(x, y + THUMB_SIZE, THUMB_SIZE, 18),
+                             Qt.AlignmentFlag.AlignCenter, os.path.basename(img_path))
+
+        painter.end()
+
+        # Keep only a couple of screens worth of pixmaps and drop queued off-screen work
+        self.pixmaps.trim(3 * max(1, end - start))
+        self.cache.retain(visible_paths)
+
+    def draw_overlay(self, painter, target, rows):
+        """Lightweight label overlay: boxes plus a thin skeleton, no handles or text."""
+        def to_pt(nx, ny):
+            return QPointF(target.x() + nx * target.width(), target.y() + ny * target.height())
+
+        for class_id, bbox, kpts in rows:
+            cx, cy, w, h = bbox
+            painter.setPen(QPen(QColor(255, 255, 0, 160), 1))
+            painter.setBrush(Qt.BrushStyle.NoBrush)
+            painter.drawRect(QRectF(to_pt(cx - w/2, cy - h/2), to_pt(cx + w/2, cy + h/2)))
+            if kpts and len(kpts) >= 17:
+                painter.setPen(QPen(QColor(0, 255, 255, 160), 1))
+                for i1, i2 in SKELETON_CONNECTIONS:
+                    if kpts[i1][2] > 0 and kpts[i2][2] > 0:
+                        painter.drawLine(to_pt(kpts[i1][0], kpts[i1][1]), to_pt(kpts[i2][0], kpts[i2][1]))
+                painter.setPen(Qt.PenStyle.NoPen)
+                for nx, ny, vis in kpts:
+                    if vis == 0: continue
+                    painter.setBrush(QBrush(QColor(0, 255, 0) if vis == 2 else QColor(255, 0, 0)))
+                    painter.drawEllipse(to_pt(nx, ny), 1.5, 1.5)
+
+    def mousePressEvent(self, event):
+        pos = event.position()
+        col = int(pos.x()) // CELL_W
+        row = int(pos.y() + self.verticalScrollBar().value()) // CELL_H
+        if col >= self.columns():
+            return
+        idx = row * self.columns() + col
+        if 0 <= idx < len(self.pairs):
+            self.current_index = idx
+            self.viewport().update()
+            self.image_selected.emit(idx)
+
+    def refresh_image(self, img_path):
+        """Forces a cell to reload (e.g. after its label was saved)."""
+        if self.cache:
+            self.cache.invalidate(img_path)
+        self.pixmaps.pop(img_path, None)
+        self.viewport().update()
+
+    def closeEvent(self, event):
+        if self.cache:
+            self.cache.close()
+            self.cache = None
+            self.folder = ""
+        self.pixmaps.clear()
+        super().closeEvent(event)
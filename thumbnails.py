@@ -0,0 +1,172 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+
+from label_io import read_label_file
+import memory_budget
+
+# --- CONFIG ---
+THUMB_DIR_NAME = ".thumbs"
+THUMB_SIZE = 192            # Long side of a thumbnail in pixels
+THUMB_QUALITY = 80          # JPEG quality of the on-disk thumbnails
+MEMORY_ITEMS = 2000         # Decoded thumbnails kept in RAM
+
+
+class ThumbnailCache:
+    """
+    Persistent thumbnail cache for one dataset folder.
+
+    Thumbnails are small JPEGs in <folder>/.thumbs keyed by image path + mtime, so an
+    edited or replaced image gets a fresh thumbnail automatically. Stale ones (and those
+    of deleted images) are pruned in the background when the folder is opened.
+    Generation runs on a background thread pool (cv2 releases the GIL while decoding);
+    the caller is notified through on_ready(image_path) from a worker thread.
+
+    In-memory thumbnails are accounted as "thumbnails" in the memory budget. Workers only
+    report their size; the owner enforces the budget on its own thread.
+    """
+
+    def __init__(self, folder, on_ready=None, workers=None, budget=None):
+        self.cache_dir = os.path.join(folder, THUMB_DIR_NAME)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.on_ready = on_ready
+        self.pool = ThreadPoolExecutor(max_workers=workers or min(8, os.cpu_count() or 1))
+        self.lock = threading.Lock()
+        self.memory = OrderedDict()   # image_path -> (rgb thumbnail, label rows)
+        self.pending = {}             # image_path -> Future
+        self.failed = set()           # Unreadable images, not retried until invalidated
+        self.visible = set()          # Last retain() set; never evicted (it would just be reloaded)
+        self.closed = False
+        self.budget = budget or memory_budget.default
+        self.budget.register("thumbnails", memory_budget.PRIORITY_THUMBNAILS, self._evict)
+        self.pool.submit(self.prune, os.path.join(folder, "images"))
+
+    def thumb_path(self, img_path, mtime_ns):
+        key = hashlib.sha1(f"{os.path.abspath(img_path)}|{mtime_ns}".encode()).hexdigest()[:24]
+        return os.path.join(self.cache_dir, key + ".jpg")
+
+    def get(self, img_path):
+        """Returns (thumbnail, label_rows) if it is in memory, else None."""
+        with self.lock:
+            entry = self.memory.get(img_path)
+            if entry is not None:
+                self.memory.move_to_end(img_path)
+            return entry
+
+    def request(self, img_path, label_path=None):
+        """Schedules a thumbnail load/generation unless it is cached or already queued."""
+        with self.lock:
+            if img_path in self.memory or img_path in self.pending or img_path in self.failed:
+                return
+            self.pending[img_path] = self.pool.submit(self._load, img_path, label_path)
+
+    def retain(self, img_paths):
+        """
+        Cancels queued work for images that are no longer visible, so scrolling
+        quickly through a large folder does not build a backlog. Visible thumbnails are
+        exempt from budget eviction.
+        """
+        keep = set(img_paths)
+        with self.lock:
+            self.visible = keep
+            for path in [p for p in self.pending if p not in keep]:
+                if self.pending[path].cancel():
+                    del self.pending[path]
+
+    def _load(self, img_path, label_path):
+        thumb = None
+        try:
+            mtime = os.stat(img_path).st_mtime_ns
+            cached = self.thumb_path(img_path, mtime)
+            bgr = cv2.imread(cached) if os.path.exists(cached) else None
+            if bgr is None:
+                # Reduced decode is much faster than decoding full size and resizing,
+                # but small images would end up below thumbnail size
+                bgr = cv2.imread(img_path, cv2.IMREAD_REDUCED_COLOR_4)
+                if bgr is not None and max(bgr.shape[:2]) < THUMB_SIZE:
+                    bgr = cv2.imread(img_path)
+                if bgr is not None:
+                    h, w = bgr.shape[:2]
+                    scale = THUMB_SIZE / max(h, w)
+                    if scale < 1:
+                        bgr = cv2.resize(bgr, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+                    cv2.imwrite(cached, bgr, [cv2.IMWRITE_JPEG_QUALITY, THUMB_QUALITY])
+            if bgr is not None:
+                thumb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+        except OSError:
+            pass
+
+        rows = []
+        if label_path:
+            try:
+                rows = read_label_file(label_path)
+            except (OSError, ValueError):
+                pass
+
+        delta = 0
+        with self.lock:
+            self.pending.pop(img_path, None)
+            if self.closed:
+                return
+            if thumb is None:
+                self.failed.add(img_path)
+            else:
+                self.memory[img_path] = (thumb, rows)
+                delta += thumb.nbytes
+                while len(self.memory) > MEMORY_ITEMS:
+                    delta -= self.memory.popitem(last=False)[1][0].nbytes
+        # Outside self.lock: the budget calls _evict (which takes it) while holding its own lock
+        self.budget.add("thumbnails", delta, enforce=False)
+
+        if thumb is not None and self.on_ready:
+            self.on_ready(img_path)
+
+    def invalidate(self, img_path):
+        """Drops the in-memory entry (e.g. after the label was edited)."""
+        with self.lock:
+            entry = self.memory.pop(img_path, None)
+            self.failed.discard(img_path)
+        if entry is not None:
+            self.budget.add("thumbnails", -entry[0].nbytes)
+
+    def _evict(self, nbytes):
+        freed = 0
+        with self.lock:
+            for path in [p for p in self.memory if p not in self.visible]:
+                if freed >= nbytes:
+                    break
+                freed += self.memory.pop(path)[0].nbytes
+        return freed
+
+    def prune(self, images_dir):
+        """Deletes thumbnails that match no current image (edited, replaced or deleted). Returns the count."""
+        live = set()
+        try:
+            with os.scandir(images_dir) as entries:
+                for entry in entries:
+                    if self.closed:
+                        return 0
+                    if entry.name.endswith(".jpg") and entry.is_file():
+                        live.add(os.path.basename(self.thumb_path(entry.path, entry.stat().st_mtime_ns)))
+        except OSError:
+            return 0   # Folder gone or unreadable: keep everything
+        removed = 0
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".jpg") and entry.name not in live:
+                    try:
+                        os.remove(entry.path)
+                        removed += 1
+                    except OSError:
+                        pass
+        return removed
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        with self.lock:
+            self.closed = True
+            self.memory.clear()
+        self.budget.set("thumbnails", 0)
@@ -0,0 +1,215 @@
+import os
+import gc
+import json
+import time
+import shutil
+import cv2
+import yaml
+
+# Picks batch / workers / cache for train_test.py on the machine it runs on.
+#
+#   python train_test.py --autotune      # tune, then train with the winner
+#   python train_test.py --tune-only     # just write TRAIN_PROJECT_DIR/autotune.json
+#
+# It probes cores, RAM (and GPU memory) and the train split, then runs short timed
+# trials on a fraction of the data: first batch size, then workers, then cache
+# (False / "ram" / "disk"), each stage keeping the winner of the one before. A trial
+# stops after a few measured batches, and images/sec counts only batches after warmup
+# (so dataset caching and model setup are excluded). A setting is only eligible if its
+# memory use, scaled up to the full dataset for the RAM cache, fits the headroom.
+# Note: "disk" trials leave ultralytics' .npy cache files next to the trial images.
+
+# --- CONFIG ---
+BATCH_CANDIDATES = (8, 16, 32)
+WORKER_CANDIDATES = (2, 4, 8)
+CACHE_CANDIDATES = (False, "ram", "disk")
+TUNE_FRACTION = 0.1       # Smallest share of the train split a trial loads
+WARMUP_BATCHES = 2        # Not timed (first batches pay for worker start-up)
+MEASURE_BATCHES = 6       # Timed batches per trial
+TRIAL_SECONDS = 180       # Stops a trial early on slow hardware (after at least one timed batch)
+MEMORY_HEADROOM = 0.8     # Share of available RAM / GPU memory a setting may use
+SAMPLE_IMAGES = 20        # Images decoded to estimate the RAM cache size
+REPORT_NAME = "autotune.json"
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+
+class TrialDone(Exception):
+    """Raised from a callback to end a trial once enough batches are timed."""
+
+
+# --- PROBES ---
+def probe_hardware():
+    import psutil   # ultralytics dependency
+    import torch
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    mem = psutil.virtual_memory()
+    info = {"cpus": cpus, "ram_total": mem.total, "ram_available": mem.available,
+            "device": "cuda" if torch.cuda.is_available() else "cpu", "gpu_memory": 0}
+    if info["device"] == "cuda":
+        info["gpu_memory"] = torch.cuda.get_device_properties(0).total_memory
+    return info
+
+
+def train_images_dir(data_yaml):
+    with open(data_yaml, "r") as f:
+        data = yaml.safe_load(f)
+    train = data["train"]
+    if isinstance(train, list):
+        train = train[0]
+    return os.path.join(data.get("path", ""), train)
+
+
+def probe_dataset(data_yaml, imgsz):
+    """Image count and bytes of the train split, plus the estimated size of ultralytics' RAM cache."""
+    images_dir = train_images_dir(data_yaml)
+    files = []
+    total_bytes = 0
+    with os.scandir(images_dir) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                files.append(entry.path)
+                total_bytes += entry.stat().st_size
+    # The cache holds decoded images resized so the long side is imgsz
+    step = max(1, len(files) // SAMPLE_IMAGES)
+    sizes = []
+    for path in files[::step][:SAMPLE_IMAGES]:
+        img = cv2.imread(path)
+        if img is not None:
+            h, w = img.shape[:2]
+            r = min(1.0, imgsz / max(h, w))
+            sizes.append(round(h * r) * round(w * r) * 3)
+    per_image = sum(sizes) / len(sizes) if sizes else imgsz * imgsz * 3
+    return {"images_dir": images_dir, "train_images": len(files), "train_bytes": total_bytes,
+            "cache_bytes_per_image": int(per_image), "cache_bytes": int(per_image * len(files))}
+
+
+# --- TRIALS ---
+def run_trial(model_path, train_args, project_dir, dataset, batch, workers, cache):
+    """Trains on a fraction of the data until MEASURE_BATCHES are timed. Returns the measurements."""
+    import psutil
+    import torch
+    from ultralytics import YOLO
+
+    needed = batch * (WARMUP_BATCHES + MEASURE_BATCHES)
+    fraction = min(1.0, max(TUNE_FRACTION, needed / max(dataset["train_images"], 1)))
+    trial = {"batch": batch, "workers": workers, "cache": cache, "fraction": round(fraction, 3),
+             "images_per_sec": 0.0, "memory_used": 0, "error": None}
+    timing = {"batches": 0, "start": None, "end": None, "min_available": psutil.virtual_memory().available}
+    available_before = timing["min_available"]
+
+    def on_batch_end(trainer):
+        timing["batches"] += 1
+        timing["min_available"] = min(timing["min_available"], psutil.virtual_memory().available)
+        now = time.perf_counter()
+        if timing["batches"] == WARMUP_BATCHES:
+            timing["start"] = now
+        elif timing["batches"] > WARMUP_BATCHES:
+            timing["end"] = now
+            timed = timing["batches"] - WARMUP_BATCHES
+            if timed >= MEASURE_BATCHES or now - timing["start"] > TRIAL_SECONDS:
+                raise TrialDone()
+
+    if torch.cuda.is_available():
+        torch.cuda.reset_peak_memory_stats()
+    args = dict(train_args, batch=batch, workers=workers, cache=cache, fraction=fraction, epochs=1,
+                val=False, plots=False, save=False, project=os.path.join(project_dir, "autotune"),
+                name="trial", exist_ok=True, verbose=False)
+    model = YOLO(model_path)
+    model.add_callback("on_train_batch_end", on_batch_end)
+    try:
+        model.train(**args)
+    except TrialDone:
+        pass
+    except (RuntimeError, MemoryError) as e:
+        # Out of (GPU) memory, or a dataloader worker killed by the OOM killer
+        trial["error"] = str(e).splitlines()[0] if str(e) else type(e).__name__
+    finally:
+        del model
+        gc.collect()
+
+    timed = timing["batches"] - WARMUP_BATCHES
+    if trial["error"] is None and timed > 0 and timing["end"]:
+        trial["images_per_sec"] = round(timed * batch / (timing["end"] - timing["start"]), 2)
+    elif trial["error"] is None:
+        trial["error"] = "not enough batches to time"
+    trial["memory_used"] = max(0, available_before - timing["min_available"])
+    if torch.cuda.is_available():
+        trial["gpu_memory_used"] = torch.cuda.max_memory_reserved()
+        torch.cuda.empty_cache()
+    return trial
+
+
+def fits(trial, hardware, dataset):
+    """True if the setting stays within MEMORY_HEADROOM once scaled to the full train split."""
+    used = trial["memory_used"]
+    if trial["cache"] == "ram":
+        # The trial only cached its fraction of the split
+        used += dataset["cache_bytes"] * (1.0 - trial["fraction"])
+    trial["projected_memory"] = int(used)
+    if used > hardware["ram_available"] * MEMORY_HEADROOM:
+        return False
+    if trial["cache"] == "disk":
+        free = shutil.disk_usage(dataset["images_dir"]).free
+        if dataset["cache_bytes"] > free * MEMORY_HEADROOM:
+            return False
+    if hardware["gpu_memory"] and trial.get("gpu_memory_used", 0) > hardware["gpu_memory"] * MEMORY_HEADROOM:
+        return False
+    return True
+
+
+def autotune(model_path, train_args, project_dir):
+    """
+    Runs the trials and writes TRAIN_PROJECT_DIR/autotune.json.
+    Returns the report; report["choice"] holds the batch/workers/cache to train with.
+    """
+    hardware = probe_hardware()
+    dataset = probe_dataset(train_args["data"], train_args.get("imgsz", 640))
+    print(f"🚀 Autotune: {hardware['cpus']} cores, {hardware['ram_available'] / 2**30:.1f} GB RAM free, "
+          f"{hardware['device']}, {dataset['train_images']} train images")
+    if not dataset["train_images"]:
+        raise FileNotFoundError(f"No train images in {dataset['images_dir']}")
+
+    choice = {"batch": train_args.get("batch", 16), "workers": train_args.get("workers", 4), "cache": False}
+    trials = []
+    workers_options = sorted({min(w, hardware["cpus"]) for w in WORKER_CANDIDATES})
+    batch_options = [b for b in BATCH_CANDIDATES if b <= dataset["train_images"]] or [min(BATCH_CANDIDATES)]
+    stages = [("batch", batch_options), ("workers", workers_options), ("cache", CACHE_CANDIDATES)]
+
+    for key, options in stages:
+        best = None
+        for value in options:
+            setting = dict(choice, **{key: value})
+            trial = next((t for t in trials if all(t[k] == setting[k] for k in setting)), None)
+            if trial is None:
+                trial = run_trial(model_path, train_args, project_dir, dataset, **setting)
+                trial["fits"] = trial["error"] is None and fits(trial, hardware, dataset)
+                trials.append(trial)
+                status = f"{trial['images_per_sec']:.1f} img/s" if trial["error"] is None else f"failed ({trial['error']})"
+                print(f"   batch={setting['batch']} workers={setting['workers']} cache={setting['cache']}: "
+                      f"{status}{'' if trial['fits'] or trial['error'] else ' (does not fit in memory)'}")
+            if trial["fits"] and (best is None or trial["images_per_sec"] > best["images_per_sec"]):
+                best = trial
+        if best is not None:
+            choice[key] = best[key]
+
+    report = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "model": model_path,
+              "hardware": hardware, "dataset": dataset, "trials": trials, "choice": choice}
+    save_report(report, project_dir)
+    print(f"✅ Autotune choice: batch={choice['batch']} workers={choice['workers']} cache={choice['cache']} "
+          f"(written to {os.path.join(project_dir, REPORT_NAME)})")
+    return report
+
+
+def save_report(report, folder):
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, REPORT_NAME)
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(report, f, indent=2)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️ Warning: Could not write autotune report: {e}")
@@ -0,0 +1,177 @@
+import os
+import csv
+import time
+
+# Per-epoch throughput telemetry for ultralytics training, to tell a compute-bound run
+# from one that is starved by the dataloader.
+#
+#   telemetry = TrainTelemetry()
+#   telemetry.attach(model)        # before model.train(...)
+#
+# Each step is split at on_train_batch_start (the batch has just come out of the
+# dataloader): the time since the previous step ended is waiting on data, the rest is
+# compute (preprocess, forward, backward, optimizer). One row per epoch goes to
+# telemetry.csv in the run folder; at the end a summary warns about epochs where data
+# loading took more than DATA_WAIT_WARN of step time.
+
+# --- CONFIG ---
+DATA_WAIT_WARN = 0.3      # Warn when waiting on data is more than this share of step time
+RSS_SAMPLE_EVERY = 10     # Batches between memory samples (walking the process tree isn't free)
+CSV_NAME = "telemetry.csv"
+FIELDS = ["epoch", "wall_s", "train_s", "val_s", "batches", "images", "images_per_sec",
+          "data_wait_s", "compute_s", "data_share", "peak_rss_mb", "cpu_util"]
+
+
+def process_tree():
+    """The training process plus its live dataloader workers."""
+    import psutil   # ultralytics dependency
+    proc = psutil.Process()
+    try:
+        return [proc] + proc.children(recursive=True)
+    except psutil.Error:
+        return [proc]
+
+
+def tree_cpu_seconds():
+    """{pid: user + system seconds} for the process tree."""
+    import psutil
+    seconds = {}
+    for p in process_tree():
+        try:
+            t = p.cpu_times()
+            seconds[p.pid] = t.user + t.system
+        except psutil.Error:
+            pass
+    return seconds
+
+
+def tree_rss():
+    """Resident memory of the process tree in bytes (shared pages counted once per process)."""
+    import psutil
+    total = 0
+    for p in process_tree():
+        try:
+            total += p.memory_info().rss
+        except psutil.Error:
+            pass
+    return total
+
+
+class TrainTelemetry:
+    def __init__(self, data_wait_warn=DATA_WAIT_WARN):
+        self.data_wait_warn = data_wait_warn
+        self.rows = []
+        self.cpus = os.cpu_count() or 1
+        self._reset_epoch()
+
+    def attach(self, model):
+        model.add_callback("on_train_epoch_start", self.on_train_epoch_start)
+        model.add_callback("on_train_batch_start", self.on_train_batch_start)
+        model.add_callback("on_train_batch_end", self.on_train_batch_end)
+        model.add_callback("on_train_epoch_end", self.on_train_epoch_end)
+        model.add_callback("on_fit_epoch_end", self.on_fit_epoch_end)
+        model.add_callback("on_train_end", self.on_train_end)
+        return self
+
+    def _reset_epoch(self):
+        self.epoch_start = None
+        self.train_end = None
+        self.step_end = None
+        self.batch_start = None
+        self.batches = 0
+        self.data_wait = 0.0
+        self.compute = 0.0
+        self.peak_rss = 0
+        self.cpu_start = {}
+
+    # --- CALLBACKS ---
+    def on_train_epoch_start(self, trainer):
+        self._reset_epoch()
+        self.cpu_start = tree_cpu_seconds()
+        self.peak_rss = tree_rss()
+        self.epoch_start = self.step_end = time.perf_counter()
+
+    def on_train_batch_start(self, trainer):
+        self.batch_start = time.perf_counter()
+        self.data_wait += self.batch_start - self.step_end
+
+    def on_train_batch_end(self, trainer):
+        self.step_end = time.perf_counter()
+        self.compute += self.step_end - self.batch_start
+        self.batches += 1
+        if self.batches % RSS_SAMPLE_EVERY == 0:
+            self.peak_rss = max(self.peak_rss, tree_rss())
+
+    def on_train_epoch_end(self, trainer):
+        self.train_end = time.perf_counter()
+        self.peak_rss = max(self.peak_rss, tree_rss())
+
+    def on_fit_epoch_end(self, trainer):
+        # Runs after validation, so wall time covers the whole epoch
+        if self.epoch_start is None:
+            return
+        now = time.perf_counter()
+        train_end = self.train_end or now
+        cpu_end = tree_cpu_seconds()
+        cpu_used = sum(max(0.0, s - self.cpu_start.get(pid, 0.0)) for pid, s in cpu_end.items())
+        wall = now - self.epoch_start
+        train = train_end - self.epoch_start
+        images = self.batches * trainer.batch_size
+        dataset = getattr(getattr(trainer, "train_loader", None), "dataset", None)
+        if dataset is not None:
+            images = min(images, len(dataset))
+        step = self.data_wait + self.compute
+        row = {
+            "epoch": trainer.epoch + 1,
+            "wall_s": round(wall, 3),
+            "train_s": round(train, 3),
+            "val_s": round(now - train_end, 3),
+            "batches": self.batches,
+            "images": images,
+            "images_per_sec": round(images / train, 2) if train > 0 else 0.0,
+            "data_wait_s": round(self.data_wait, 3),
+            "compute_s": round(self.compute, 3),
+            "data_share": round(self.data_wait / step, 3) if step > 0 else 0.0,
+            "peak_rss_mb": round(self.peak_rss / 2**20, 1),
+            "cpu_util": round(cpu_used / (wall * self.cpus), 3) if wall > 0 else 0.0,
+        }
+        self.rows.append(row)
+        self.write_csv(os.path.join(str(trainer.save_dir), CSV_NAME))
+        if row["data_share"] > self.data_wait_warn:
+            print(f"⚠️ Warning: Epoch {row['epoch']} spent {row['data_share']:.0%} of step time waiting on data "
+                  f"({row['images_per_sec']:.1f} img/s)")
+
+    def on_train_end(self, trainer):
+        print(self.summary())
+
+    # --- OUTPUT ---
+    def write_csv(self, path):
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=FIELDS)
+                writer.writeheader()
+                writer.writerows(self.rows)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ Warning: Could not write telemetry: {e}")
+
+    def summary(self):
+        if not self.rows:
+            return "⚠️ Warning: No training telemetry recorded."
+        data_wait = sum(r["data_wait_s"] for r in self.rows)
+        compute = sum(r["compute_s"] for r in self.rows)
+        share = data_wait / (data_wait + compute) if data_wait + compute > 0 else 0.0
+        slow = [r["epoch"] for r in self.rows if r["data_share"] > self.data_wait_warn]
+        ips = sum(r["images"] for r in self.rows) / max(sum(r["train_s"] for r in self.rows), 1e-9)
+        lines = [f"📈 Telemetry: {len(self.rows)} epochs, {ips:.1f} img/s, data wait {share:.0%} of step time, "
+                 f"peak RSS {max(r['peak_rss_mb'] for r in self.rows):.0f} MB, "
+                 f"CPU {sum(r['cpu_util'] for r in self.rows) / len(self.rows):.0%}"]
+        if slow:
+            lines.append(f"⚠️ Warning: Data loading exceeded {self.data_wait_warn:.0%} of step time in "
+                         f"{len(slow)}/{len(self.rows)} epochs ({', '.join(map(str, slow[:10]))}"
+                         f"{', ...' if len(slow) > 10 else ''}). Try more workers, cache=ram/disk, "
+                         f"pre-resized images (datasplitter --imgsz) or train_test.py --autotune.")
+        else:
+            lines.append("✅ Training was compute-bound (data loading stayed under the threshold).")
+        return "\n".join(lines)
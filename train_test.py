@@ -1,22 +1,50 @@
 import os
+import argparse
 from dotenv import load_dotenv
 from ultralytics import YOLO
+
+import train_autotune
+from train_telemetry import TrainTelemetry, DATA_WAIT_WARN
 load_dotenv()
 
+# --- CONFIG ---
+TRAIN_ARGS = dict(
+    data='judo_pose.yaml',
+    epochs=150,
+    patience=20,
+    batch=16,
+    workers=4,
+    imgsz=640,
+    dropout=0.1,
+    augment=True,
+)
+RUN_NAME = 'yolo26X-pose-judo'
+
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Train the pose model.")
+    parser.add_argument("--autotune", action="store_true",
+                        help="Time a few batch/workers/cache settings on this machine first and train with the fastest")
+    parser.add_argument("--tune-only", action="store_true", help="Only run the autotune trials and write the report")
+    parser.add_argument("--data-warn", type=float, default=DATA_WAIT_WARN,
+                        help="Warn when waiting on the dataloader exceeds this share of step time")
+    args = parser.parse_args()
+
     model_path = os.getenv("MODEL_TRAIN_BASE", "yolo26x-pose.pt")
     project_dir = os.getenv("TRAIN_PROJECT_DIR", "Largest")
+    train_args = dict(TRAIN_ARGS)
+
+    tuning = None
+    if args.autotune or args.tune_only:
+        tuning = train_autotune.autotune(model_path, train_args, project_dir)
+        if args.tune_only:
+            raise SystemExit(0)
+        train_args.update(tuning["choice"])
+
     model = YOLO(model_path)
+    # Per-epoch throughput, data wait vs compute, RSS and CPU -> <run>/telemetry.csv
+    TrainTelemetry(args.data_warn).attach(model)
+    results = model.train(**train_args, project=project_dir, name=RUN_NAME)
 
-    results = model.train(
-    data='judo_pose.yaml',
-    epochs=150,          
-    patience=20,         
-    batch=16,             
-    workers=4,
-    imgsz=640,
-    dropout=0.1,         
-    augment=True,         
-    project = project_dir,
-    name = 'yolo26X-pose-judo'
-)
\ No newline at end of file
+    if tuning:
+        # Keep the measurements next to the run they configured
+        train_autotune.save_report(tuning, str(model.trainer.save_dir))
@@ -1,35 +1,160 @@
+import threading
 import cv2
 
+import motion_index
+import perf_stats
+import memory_budget
+
+SEQUENTIAL_SKIP = 30      # Frames ahead that are reached with grab() instead of a seek
+DEFAULT_FPS = 30.0        # Used when the container reports no (or a bogus) frame rate
+
 class VideoEngine:
-    def __init__(self):
+    def __init__(self, cache_frames=True):
         self.cap = None
         self.total_frames = 0
         self.current_frame_index = 0
         self.original_width = 0
         self.original_height = 0
+        self.fps = DEFAULT_FPS
+        self._next_index = -1 # Frame the decoder returns on the next read() (-1 = unknown)
+        # Recently decoded frames (stepping back never re-seeks), bounded by the memory budget
+        self.frames = memory_budget.BudgetedLRU("frames", memory_budget.PRIORITY_FRAMES,
+                                                memory_budget.array_bytes) if cache_frames else None
+
+        # Motion index (filled by a background pass, see start_motion_analysis)
+        self.motion = None
+        self.scene = None
+        self.motion_progress = 0.0
+        self._motion_stop = None
+        self._motion_run = 0          # Bumped per analysis; callbacks of older runs are ignored
+        self._motion_lock = threading.Lock()
 
     def load_video(self, path):
-        """Initializes the video capture object."""
-        self.cap = cv2.VideoCapture(path)
-        if not self.cap.isOpened():
+        """Initializes the video capture object. On failure the current video stays open."""
+        cap = cv2.VideoCapture(path)
+        if not cap.isOpened():
             raise ValueError("Could not open video file")
+        self.stop_motion_analysis()
+        if self.frames is not None:
+            self.frames.clear()
+        if self.cap:
+            self.cap.release()
+        self.cap = cap
         
         self.total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
         self.original_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         self.original_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        fps = self.cap.get(cv2.CAP_PROP_FPS)
+        self.fps = fps if 1.0 <= fps <= 1000.0 else DEFAULT_FPS
         self.current_frame_index = 0
+        self._next_index = 0
         return self.total_frames
 
+    def swap_capture(self, path):
+        """
+        Reopens the same video from another file (e.g. its imported copy) without resetting
+        the position or the decoded-frame cache. The next get_frame() seeks as usual.
+        """
+        cap = cv2.VideoCapture(path)
+        if not cap.isOpened():
+            raise ValueError("Could not open video file")
+        if self.cap:
+            self.cap.release()
+        self.cap = cap
+        self._next_index = -1
+
     def get_frame(self, index):
-        """Retrieves a specific frame in RGB format."""
+        """
+        Retrieves a specific frame in RGB format.
+        Frames a little ahead of the decoder are reached by grabbing (decode without the
+        BGR copy) instead of seeking, so playback and Next never pay for a keyframe seek.
+        """
         if self.cap:
-            self.cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+            if self.frames is not None:
+                cached = self.frames.get(index)
+                if cached is not None:
+                    return cached
+            t0 = perf_stats.start()
+            ahead = index - self._next_index
+            if self._next_index >= 0 and 0 <= ahead <= SEQUENTIAL_SKIP:
+                for _ in range(ahead):
+                    self.cap.grab()
+            else:
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, index)
             ret, frame = self.cap.read()
+            self._next_index = index + 1 if ret else -1
+            perf_stats.stop("frame.decode", t0)
             if ret:
                 # Convert BGR (OpenCV standard) to RGB (Qt standard)
-                return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                t0 = perf_stats.start()
+                rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                perf_stats.stop("frame.convert", t0)
+                if self.frames is not None:
+                    self.frames.put(index, rgb)
+                return rgb
         return None
 
+    # --- MOTION INDEX ---
+    def start_motion_analysis(self, path):
+        """
+        Loads the motion sidecar for this video, or computes it on a background thread
+        with its own VideoCapture (the UI capture is never touched).
+        """
+        self.stop_motion_analysis()
+        cached = motion_index.load_sidecar(path)
+        if cached is not None:
+            self.motion, self.scene = cached
+            self.motion_progress = 1.0
+            return
+
+        stop = threading.Event()
+        self._motion_stop = stop
+        run = self._motion_run
+
+        def progress(fraction):
+            with self._motion_lock:
+                if run == self._motion_run:
+                    self.motion_progress = fraction
+
+        def worker():
+            try:
+                result = motion_index.compute_motion_scores(path, progress=progress, stop_event=stop)
+            except Exception as e:
+                print(f"⚠️ Warning: Motion analysis failed: {e}")
+                return
+            with self._motion_lock:
+                if result is not None and run == self._motion_run:
+                    self.motion, self.scene = result
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def stop_motion_analysis(self):
+        if self._motion_stop:
+            self._motion_stop.set()
+            self._motion_stop = None
+        with self._motion_lock:
+            self._motion_run += 1
+            self.motion = None
+            self.scene = None
+            self.motion_progress = 0.0
+
+    def motion_ready(self):
+        return self.motion is not None
+
+    def next_motion_frame(self, index):
+        """Next scene cut / high-motion frame after index, or None."""
+        if not self.motion_ready(): return None
+        return motion_index.next_high_motion(self.motion, self.scene, index)
+
+    def next_distinct_frame(self, index, steps=1):
+        """Skips near-identical frames: the Nth frame after index that differs visibly."""
+        if not self.motion_ready(): return None
+        return motion_index.next_distinct_frame(self.motion, index, steps=steps)
+
     def release(self):
+        self.stop_motion_analysis()
         if self.cap:
-            self.cap.release()
\ No newline at end of file
+            self.cap.release()
+        if self.frames is not None:
+            self.frames.clear()
+        self._next_index = -1
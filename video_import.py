@@ -0,0 +1,175 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+
+# Background video import into RAW_DATA_DIR/videos.
+#
+# Modes:
+#   copy      - streamed copy (to <name>.part, renamed when complete)
+#   hardlink  - os.link when source and videos/ share a filesystem, else copy
+#   reference - leave the file where it is and use it in place
+#
+# Every mode streams the file once through sha256, so caches can be keyed by content
+# rather than by file name. Results are recorded in videos/.video_index.json.
+
+IMPORT_MODES = ("copy", "hardlink", "reference")
+CHUNK_SIZE = 8 * 1024 * 1024
+INDEX_NAME = ".video_index.json"
+
+
+class ImportCancelled(Exception):
+    pass
+
+
+class ImportJob:
+    """
+    One import running on a daemon thread. The UI polls `done`, `progress`, `result`
+    and `error` (same pattern as VideoEngine's motion analysis).
+    """
+
+    def __init__(self, src, videos_dir, mode="copy"):
+        if mode not in IMPORT_MODES:
+            raise ValueError(f"Unknown import mode: {mode}")
+        self.src = src
+        self.videos_dir = videos_dir
+        self.mode = mode
+        self.dest = os.path.join(videos_dir, os.path.basename(src))
+        self.total = os.path.getsize(src)
+        self.copied = 0
+        self.done = False
+        self.result = None   # dict recorded in the index, once finished
+        self.error = None
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def progress(self):
+        return self.copied / self.total if self.total else 1.0
+
+    def _run(self):
+        try:
+            self.result = self._import()
+            record_import(self.videos_dir, self.result)
+        except ImportCancelled:
+            self.error = "cancelled"
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self.done = True
+
+    def _import(self):
+        mode = self.mode
+        if os.path.abspath(self.src) == os.path.abspath(self.dest):
+            mode = "reference"   # Already in videos/
+        if mode == "hardlink":
+            try:
+                if os.path.exists(self.dest):
+                    os.remove(self.dest)
+                os.link(self.src, self.dest)
+            except OSError:
+                mode = "copy"    # Different filesystem (or no link support)
+
+        if mode == "copy":
+            sha256 = self._copy()
+            path = self.dest
+        else:
+            sha256 = self._hash_only()
+            path = self.dest if mode == "hardlink" else self.src
+
+        st = os.stat(path)
+        return {"name": os.path.splitext(os.path.basename(path))[0], "path": os.path.abspath(path),
+                "source": os.path.abspath(self.src), "mode": mode, "sha256": sha256,
+                "size": st.st_size, "mtime_ns": st.st_mtime_ns, "imported": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+    def _copy(self):
+        part = self.dest + ".part"
+        digest = hashlib.sha256()
+        try:
+            with open(self.src, "rb") as fin, open(part, "wb") as fout:
+                while True:
+                    if self._cancel.is_set():
+                        raise ImportCancelled()
+                    chunk = fin.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    fout.write(chunk)
+                    self.copied += len(chunk)
+            shutil.copystat(self.src, part)
+            os.replace(part, self.dest)
+        except BaseException:
+            if os.path.exists(part):
+                os.remove(part)
+            raise
+        return digest.hexdigest()
+
+    def _hash_only(self):
+        digest = hashlib.sha256()
+        with open(self.src, "rb") as f:
+            while True:
+                if self._cancel.is_set():
+                    raise ImportCancelled()
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                self.copied += len(chunk)
+        return digest.hexdigest()
+
+
+# --- INDEX ---
+def _index_path(videos_dir):
+    return os.path.join(videos_dir, INDEX_NAME)
+
+
+def load_index(videos_dir):
+    try:
+        with open(_index_path(videos_dir), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def record_import(videos_dir, info):
+    """Adds/replaces one video in the index (written atomically)."""
+    index = load_index(videos_dir)
+    index[info["name"]] = info
+    path = _index_path(videos_dir)
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️ Warning: Could not write video index: {e}")
+
+
+def video_hash(videos_dir, path):
+    """sha256 recorded at import for this file, or None if unknown or changed since."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    for info in load_index(videos_dir).values():
+        if (os.path.abspath(path) == info.get("path") and st.st_size == info.get("size")
+                and st.st_mtime_ns == info.get("mtime_ns")):
+            return info.get("sha256")
+    return None
+
+
+def resolve_video(videos_dir, name):
+    """Path of an imported video by name (handles videos referenced in place), or None."""
+    info = load_index(videos_dir).get(name)
+    if info and os.path.exists(info["path"]):
+        return info["path"]
+    return None